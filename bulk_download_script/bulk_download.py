@@ -1,9 +1,28 @@
+import logging
+import logging.handlers
+import queue
+import sys
+
 from concurrent.futures.thread import ThreadPoolExecutor
 
 import unity_cloud as uc
 from pathlib import PurePath, Path
 from unity_cloud.models import *
 
+logger = logging.getLogger("bulk_download")
+
+
+def start_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """The download threads only queue their messages, a single listener thread writes them to the console."""
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    record_queue = queue.Queue()
+    logger.addHandler(logging.handlers.QueueHandler(record_queue))
+    logger.setLevel(level)
+    listener = logging.handlers.QueueListener(record_queue, console)
+    listener.start()
+    return listener
+
 
 def login_with_user_account():
     uc.identity.user_login.use()
@@ -16,6 +35,8 @@ def download_asset(organization_id: str, project_id: str, asset: Asset, download
     dataset = uc.assets.get_dataset_list(organization_id, project_id, asset.id, asset.version)[0]
     asset_files = uc.assets.get_file_list(organization_id, project_id, asset.id, asset.version, dataset.id)
 
+    futures = []
+    skipped_count = 0
     with ThreadPoolExecutor(max_workers=10) as executor:
         for file in asset_files:
             file_download_info = FileDownloadInformation(organization_id, project_id, asset.id, asset.version,
@@ -24,21 +45,33 @@ def download_asset(organization_id: str, project_id: str, asset: Asset, download
             target_file = Path(download_path) / file.path
 
             if not overwrite and target_file.exists():
-                print(f"Skipping download of {file.path} as it already exists", flush=True)
+                logger.debug(f"Skipping download of {file.path} as it already exists")
+                skipped_count += 1
                 continue
 
-            print(f"Downloading file: {file.path}", flush=True)
-            executor.submit(uc.assets.download_file, file_download_info)
+            logger.debug(f"Downloading file: {file.path}")
+            futures.append((file, executor.submit(uc.assets.download_file, file_download_info)))
+
+    # the files of an asset are reported in a single line, failures one by one
+    failed_count = 0
+    for file, future in futures:
+        if future.exception() is not None:
+            failed_count += 1
+            logger.error(f"Failed to download file: {file.path}: {future.exception()}")
+    logger.info(f"Downloaded {len(futures) - failed_count} files of asset {asset.name}, {skipped_count} skipped, "
+                f"{failed_count} failed")
 
 
 def download_assets(assets: [Asset], org_id: str, project_id: str, download_path: str, overwrite: bool = False):
     for asset in assets:
-        print(f"Downloading files for asset: {asset.name}", flush=True)
+        logger.debug(f"Downloading files for asset: {asset.name}")
         download_asset(org_id, project_id, asset, download_path, overwrite)
 
 
 if __name__ == '__main__':
 
+    # use logging.DEBUG to log every file
+    log_listener = start_logging(logging.INFO)
     uc.initialize()
     login_with_user_account()
 
@@ -63,3 +96,4 @@ if __name__ == '__main__':
     assets = uc.assets.search_assets_in_projects(org_id=org_id, project_ids=[project_id], include_filter=include_filter,
                                                  collections=collections)
     download_assets(assets, org_id, project_id, download_directory, overwrite=overwrite)
+    log_listener.stop()
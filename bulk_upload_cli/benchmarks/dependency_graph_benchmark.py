@@ -0,0 +1,78 @@
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from bulk_upload.dependency_graph import DependencyGraph
+from bulk_upload.models import AssetInfo
+
+
+def generate_assets(asset_count: int, dependencies_per_asset: int, intern: bool, seed: int = 0) -> [AssetInfo]:
+    rng = random.Random(seed)
+    guids = [f"{rng.getrandbits(128):032x}" for _ in range(asset_count)]
+    assets = []
+    for i in range(asset_count):
+        asset = AssetInfo(f"asset_{i}")
+        asset.unity_id = guids[i]
+        # the legacy mappers produced a new string for every regex match
+        dependencies = [(" " + guids[rng.randrange(asset_count)])[1:] for _ in range(dependencies_per_asset)]
+        asset.unresolved_dependencies = [sys.intern(guid) for guid in dependencies] if intern else dependencies
+        assets.append(asset)
+    return assets
+
+
+def build_legacy_representation(asset_count: int, dependencies_per_asset: int):
+    assets = generate_assets(asset_count, dependencies_per_asset, intern=False)
+    start = time.perf_counter()
+    asset_index = {}
+    for i in range(len(assets)):
+        asset_index[assets[i].unity_id] = i
+
+    for asset in assets:
+        for dependency in asset.unresolved_dependencies:
+            if dependency in asset_index:
+                asset.dependencies.append(asset_index[dependency])
+
+    return time.perf_counter() - start, (assets, asset_index)
+
+
+def build_graph_representation(asset_count: int, dependencies_per_asset: int):
+    assets = generate_assets(asset_count, dependencies_per_asset, intern=True)
+    start = time.perf_counter()
+    graph = DependencyGraph.from_assets(assets)
+    for i, asset in enumerate(assets):
+        asset.dependencies = graph.get_dependencies(i)
+
+    return time.perf_counter() - start, (assets, graph)
+
+
+def measure(name: str, function, *args):
+    """Memory is measured with the generated assets included since the GUID strings they hold are part of the cost."""
+    tracemalloc.start()
+    elapsed, result = function(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} resolution time: {elapsed:8.3f}s  retained: {retained / 1024 ** 2:9.1f} MiB  "
+          f"peak: {peak / 1024 ** 2:9.1f} MiB")
+    return result
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Compare the legacy dependency representation with DependencyGraph")
+    parser.add_argument("--assets", type=int, default=100_000, help="Number of assets to generate")
+    parser.add_argument("--dependencies", type=int, default=8, help="Number of dependencies per asset")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    print(f"Generating {arguments.assets} assets with {arguments.dependencies} dependencies each")
+
+    legacy_result = measure("legacy", build_legacy_representation, arguments.assets, arguments.dependencies)
+    del legacy_result
+    graph_result = measure("graph", build_graph_representation, arguments.assets, arguments.dependencies)
+
+    start = time.perf_counter()
+    components, _ = graph_result[1].get_strongly_connected_components()
+    print(f"Strongly connected components: {len(components)} in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,481 @@
+import copy
+import itertools
+import os
+import random
+import threading
+import time
+import types
+
+import unity_cloud as uc
+
+from collections import Counter
+from enum import Enum
+from pathlib import PurePosixPath
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class LatencyDistribution(object):
+    """Latency of a call in seconds, written on the command line as:
+    constant:<seconds>, uniform:<low>:<high> or lognormal:<median>:<sigma>."""
+
+    def __init__(self, kind: str = "constant", first: float = 0.0, second: float = 0.0):
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.first = first
+        self.second = second
+
+    @classmethod
+    def parse(cls, value: str) -> "LatencyDistribution":
+        parts = value.split(":")
+        return cls(parts[0], *[float(part) for part in parts[1:]])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.first, self.second)
+        if self.kind == "lognormal" and self.first > 0:
+            return rng.lognormvariate(0, self.second) * self.first
+        return self.first
+
+    def __str__(self):
+        return f"{self.kind}:{self.first}:{self.second}" if self.kind != "constant" else f"constant:{self.first}"
+
+
+class FakeCloudError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+
+
+class FakeThrottlingError(FakeCloudError):
+    def __init__(self, operation: str):
+        super().__init__(429, f"Too many requests ({operation})")
+
+
+class FakeAuthenticationState(Enum):
+    LOGGED_IN = 1
+    LOGGED_OUT = 2
+
+
+class TokenBucket(object):
+    """Refills rate tokens per second up to capacity. Reservations can take the bucket below zero, the caller then
+    waits for the time the bucket needs to refill, which keeps the throughput at the rate under contention."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Returns the time to wait before using the amount reserved."""
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def try_take(self, amount: float) -> bool:
+        with self.lock:
+            self._refill()
+            if self.tokens < amount:
+                return False
+            self.tokens -= amount
+            return True
+
+
+class FakeCloudSettings(object):
+    def __init__(self):
+        # latency of every operation, unless set for the operation in operation_latencies
+        self.latency = LatencyDistribution()
+        self.operation_latencies = {}
+        # time taken by the server-side transformations when a freeze waits on them
+        self.transformation_time = LatencyDistribution()
+        # requests accepted per second by the whole backend, 0 for unlimited
+        self.requests_per_second = 0
+        # delay: throttled requests wait their turn, reject: they fail with a 429 error
+        self.throttle_mode = "delay"
+        # probability of a call failing with a 503 error, on the operations listed or on every operation when None
+        self.error_rate = 0.0
+        self.error_operations = None
+        # upload bandwidth in bytes per second shared by every upload, 0 for unlimited
+        self.bandwidth = 0
+        self.field_definitions = []
+        self.seed = 0
+
+
+class FakeAssetVersion(object):
+    def __init__(self, version: str):
+        self.version = version
+        self.is_frozen = False
+        self.tags = []
+        self.description = ""
+        self.metadata = {}
+        self.preview_file = None
+        self.datasets = {}
+        self.references = set()
+
+
+class FakeAsset(object):
+    def __init__(self, asset_id: str, name: str, asset_type):
+        self.id = asset_id
+        self.name = name
+        self.type = asset_type
+        self.versions = {}
+        self.latest_version = None
+
+
+class FakeProject(object):
+    def __init__(self):
+        self.assets = {}
+        self.collections = {}
+
+
+class FakeUnityCloud(object):
+    """In-memory stand-in for the uc.assets and uc.identity functions called by the tool.
+
+    install() replaces the SDK functions until uninstall() is called, the models of the SDK are kept. Every call
+    goes through the throttling, latency and error injection of the settings before touching the in-memory state,
+    so a failed call has no effect. Uploads read the local file, limited by the shared bandwidth.
+    VCS integrations are not simulated.
+    """
+
+    ASSET_OPERATIONS = ["get_asset_list", "search_assets_in_projects", "create_asset", "create_unfrozen_asset_version",
+                        "get_asset_metadata", "update_asset", "freeze_asset_version", "get_dataset_list",
+                        "get_file_list", "get_file", "upload_file", "remove_file", "add_asset_reference",
+                        "list_collections", "create_collection", "link_assets_to_collection",
+                        "delete_collection", "unlink_assets_from_project", "list_field_definitions"]
+    IDENTITY_OPERATIONS = ["get_organization_list", "get_project_list"]
+
+    def __init__(self, settings: FakeCloudSettings = None):
+        self.settings = settings if settings is not None else FakeCloudSettings()
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.settings.seed)
+        self.ids = itertools.count(1)
+        self.projects = {}
+        self.calls = Counter()
+        self.errors = Counter()
+        self.throttled = 0
+        self.bytes_uploaded = 0
+        self.files_uploaded = 0
+        self.request_bucket = None
+        self.bandwidth_bucket = None
+        if self.settings.requests_per_second > 0:
+            self.request_bucket = TokenBucket(self.settings.requests_per_second, self.settings.requests_per_second)
+        if self.settings.bandwidth > 0:
+            self.bandwidth_bucket = TokenBucket(self.settings.bandwidth, max(self.settings.bandwidth, UPLOAD_CHUNK_SIZE))
+        self.originals = []
+
+    def install(self):
+        def patch(target, name, value):
+            self.originals.append((target, name, getattr(target, name, None)))
+            setattr(target, name, value)
+
+        for operation in self.ASSET_OPERATIONS:
+            patch(uc.assets, operation, getattr(self, operation))
+        for operation in self.IDENTITY_OPERATIONS:
+            patch(uc.identity, operation, getattr(self, operation))
+
+        service_account = getattr(uc.identity, "service_account", None)
+        if service_account is None:
+            service_account = types.SimpleNamespace()
+            patch(uc.identity, "service_account", service_account)
+        patch(service_account, "use", self.use_service_account)
+
+        user_login = getattr(uc.identity, "user_login", None)
+        if user_login is None:
+            user_login = types.SimpleNamespace()
+            patch(uc.identity, "user_login", user_login)
+        if getattr(user_login, "Authentication_State", None) is None:
+            patch(user_login, "Authentication_State", FakeAuthenticationState)
+        patch(user_login, "use", self.use_user_login)
+        patch(user_login, "login", self.use_user_login)
+        patch(user_login, "get_authentication_state", lambda: user_login.Authentication_State.LOGGED_IN)
+
+        for name in ["initialize", "uninitialize", "set_timeout", "set_app_information"]:
+            patch(uc, name, lambda *args, **kwargs: None)
+        return self
+
+    def uninstall(self):
+        while len(self.originals) > 0:
+            target, name, value = self.originals.pop()
+            setattr(target, name, value)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+
+    def get_summary(self) -> dict:
+        with self.lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "callsPerOperation": dict(self.calls),
+                "errors": dict(self.errors),
+                "throttled": self.throttled,
+                "filesUploaded": self.files_uploaded,
+                "bytesUploaded": self.bytes_uploaded,
+                "assets": sum(len(project.assets) for project in self.projects.values()),
+            }
+
+    def _call(self, operation: str):
+        with self.lock:
+            self.calls[operation] += 1
+            latency = self.settings.operation_latencies.get(operation, self.settings.latency).sample(self.rng)
+            failing = self.settings.error_rate > 0 and self.rng.random() < self.settings.error_rate \
+                and (self.settings.error_operations is None or operation in self.settings.error_operations)
+
+        if self.request_bucket is not None:
+            if self.settings.throttle_mode == "reject":
+                if not self.request_bucket.try_take(1):
+                    with self.lock:
+                        self.throttled += 1
+                    raise FakeThrottlingError(operation)
+            else:
+                wait_time = self.request_bucket.reserve(1)
+                if wait_time > 0:
+                    with self.lock:
+                        self.throttled += 1
+                    time.sleep(wait_time)
+
+        if latency > 0:
+            time.sleep(latency)
+
+        if failing:
+            with self.lock:
+                self.errors[operation] += 1
+            raise FakeCloudError(503, f"Injected error ({operation})")
+
+    def _get_project(self, org_id: str, project_id: str) -> FakeProject:
+        """Must be called with the lock held."""
+        return self.projects.setdefault((org_id, project_id), FakeProject())
+
+    def _get_version(self, org_id: str, project_id: str, asset_id: str, version: str) -> FakeAssetVersion:
+        """Must be called with the lock held."""
+        asset = self._get_project(org_id, project_id).assets.get(asset_id)
+        if asset is None or version not in asset.versions:
+            raise FakeCloudError(404, f"Asset version not found: {asset_id} {version}")
+        return asset.versions[version]
+
+    def _get_dataset(self, org_id: str, project_id: str, asset_id: str, version: str, dataset_id: str) -> dict:
+        """Must be called with the lock held."""
+        dataset = self._get_version(org_id, project_id, asset_id, version).datasets.get(dataset_id)
+        if dataset is None:
+            raise FakeCloudError(404, f"Dataset not found: {dataset_id}")
+        return dataset
+
+    def _new_id(self) -> str:
+        return f"{next(self.ids):024x}"
+
+    @staticmethod
+    def _asset_view(asset: FakeAsset, version: FakeAssetVersion):
+        return types.SimpleNamespace(id=asset.id, name=asset.name, type=asset.type, version=version.version,
+                                     is_frozen=version.is_frozen, tags=list(version.tags),
+                                     description=version.description)
+
+    # uc.assets
+
+    def get_asset_list(self, org_id: str, project_id: str):
+        self._call("get_asset_list")
+        with self.lock:
+            return [self._asset_view(asset, asset.versions[asset.latest_version])
+                    for asset in self._get_project(org_id, project_id).assets.values()]
+
+    def search_assets_in_projects(self, org_id: str, project_ids: [str], include_filter: dict = None,
+                                  collections: list = None, **kwargs):
+        self._call("search_assets_in_projects")
+        names = {str(value) for value in (include_filter or {}).values()}
+        with self.lock:
+            return [self._asset_view(asset, asset.versions[asset.latest_version])
+                    for project_id in project_ids
+                    for asset in self._get_project(org_id, project_id).assets.values()
+                    if len(names) == 0 or asset.name in names]
+
+    def create_asset(self, asset_creation, org_id: str, project_id: str):
+        self._call("create_asset")
+        with self.lock:
+            asset = FakeAsset(self._new_id(), asset_creation.name, getattr(asset_creation, "type", None))
+            version = FakeAssetVersion("1")
+            version.tags = list(getattr(asset_creation, "tags", None) or [])
+            version.description = getattr(asset_creation, "description", None) or ""
+            version.metadata = dict(getattr(asset_creation, "metadata", None) or {})
+            for dataset_name in ["Source", "Preview"]:
+                version.datasets[self._new_id()] = {"name": dataset_name, "files": {}}
+            asset.versions[version.version] = version
+            asset.latest_version = version.version
+            self._get_project(org_id, project_id).assets[asset.id] = asset
+            return self._asset_view(asset, version)
+
+    def create_unfrozen_asset_version(self, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        self._call("create_unfrozen_asset_version")
+        with self.lock:
+            parent = self._get_version(org_id, project_id, asset_id, asset_version)
+            asset = self._get_project(org_id, project_id).assets[asset_id]
+            version = copy.deepcopy(parent)
+            version.version = str(len(asset.versions) + 1)
+            version.is_frozen = False
+            asset.versions[version.version] = version
+            asset.latest_version = version.version
+            return types.SimpleNamespace(version=version.version)
+
+    def get_asset_metadata(self, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        self._call("get_asset_metadata")
+        with self.lock:
+            return dict(self._get_version(org_id, project_id, asset_id, asset_version).metadata)
+
+    def update_asset(self, asset_update, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        self._call("update_asset")
+        with self.lock:
+            version = self._get_version(org_id, project_id, asset_id, asset_version)
+            if version.is_frozen:
+                raise FakeCloudError(409, f"Asset version is frozen: {asset_id} {asset_version}")
+            if getattr(asset_update, "tags", None) is not None:
+                version.tags = list(asset_update.tags)
+            if getattr(asset_update, "description", None) is not None:
+                version.description = asset_update.description
+            if getattr(asset_update, "metadata", None):
+                version.metadata.update(asset_update.metadata)
+            if getattr(asset_update, "preview_file", None) is not None:
+                version.preview_file = asset_update.preview_file
+
+    def freeze_asset_version(self, org_id: str, project_id: str, asset_id: str, asset_version: str,
+                             changelog: str = "", freeze_type=None):
+        self._call("freeze_asset_version")
+        if getattr(freeze_type, "name", "") == "WAIT_ON_TRANSFORMATION":
+            with self.lock:
+                transformation_time = self.settings.transformation_time.sample(self.rng)
+            time.sleep(transformation_time)
+        with self.lock:
+            self._get_version(org_id, project_id, asset_id, asset_version).is_frozen = True
+
+    def get_dataset_list(self, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        self._call("get_dataset_list")
+        with self.lock:
+            datasets = self._get_version(org_id, project_id, asset_id, asset_version).datasets
+            return [types.SimpleNamespace(id=dataset_id, name=dataset["name"])
+                    for dataset_id, dataset in datasets.items()]
+
+    def get_file_list(self, org_id: str, project_id: str, asset_id: str, asset_version: str, dataset_id: str):
+        self._call("get_file_list")
+        with self.lock:
+            files = self._get_dataset(org_id, project_id, asset_id, asset_version, dataset_id)["files"]
+            return [types.SimpleNamespace(path=path, size_in_bytes=size) for path, size in files.items()]
+
+    def get_file(self, org_id: str, project_id: str, asset_id: str, asset_version: str, dataset_id: str, file_path):
+        self._call("get_file")
+        with self.lock:
+            files = self._get_dataset(org_id, project_id, asset_id, asset_version, dataset_id)["files"]
+            size = files.get(str(PurePosixPath(file_path)))
+            if size is None:
+                raise FakeCloudError(404, f"File not found: {file_path}")
+            return types.SimpleNamespace(path=str(PurePosixPath(file_path)), size_in_bytes=size)
+
+    def upload_file(self, file_upload, disable_automatic_transformations: bool = False):
+        self._call("upload_file")
+        with self.lock:
+            version = self._get_version(file_upload.organization_id, file_upload.project_id, file_upload.asset_id,
+                                        file_upload.asset_version)
+            if version.is_frozen:
+                raise FakeCloudError(409, f"Asset version is frozen: {file_upload.asset_id}")
+            self._get_dataset(file_upload.organization_id, file_upload.project_id, file_upload.asset_id,
+                              file_upload.asset_version, file_upload.dataset_id)
+
+        size = 0
+        with open(os.fspath(file_upload.upload_file_path), "rb") as f:
+            while True:
+                chunk = f.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if self.bandwidth_bucket is not None:
+                    wait_time = self.bandwidth_bucket.reserve(len(chunk))
+                    if wait_time > 0:
+                        time.sleep(wait_time)
+
+        with self.lock:
+            dataset = self._get_dataset(file_upload.organization_id, file_upload.project_id, file_upload.asset_id,
+                                        file_upload.asset_version, file_upload.dataset_id)
+            dataset["files"][str(PurePosixPath(file_upload.cloud_file_path))] = size
+            self.bytes_uploaded += size
+            self.files_uploaded += 1
+
+    def remove_file(self, org_id: str, project_id: str, asset_id: str, asset_version: str, dataset_id: str, file_path):
+        self._call("remove_file")
+        with self.lock:
+            files = self._get_dataset(org_id, project_id, asset_id, asset_version, dataset_id)["files"]
+            files.pop(str(PurePosixPath(file_path)), None)
+
+    def add_asset_reference(self, org_id: str, project_id: str, asset_id: str, asset_version: str,
+                            target_asset_id: str = None, target_asset_version: str = None):
+        self._call("add_asset_reference")
+        with self.lock:
+            self._get_version(org_id, project_id, asset_id, asset_version).references.add(
+                (target_asset_id, target_asset_version))
+
+    def list_collections(self, org_id: str, project_id: str):
+        self._call("list_collections")
+        with self.lock:
+            return [types.SimpleNamespace(parent_path=parent_path, name=name)
+                    for parent_path, name in self._get_project(org_id, project_id).collections.keys()]
+
+    def create_collection(self, collection_creation, org_id: str, project_id: str):
+        self._call("create_collection")
+        key = (collection_creation.parent_path or "", collection_creation.name)
+        with self.lock:
+            collections = self._get_project(org_id, project_id).collections
+            if key in collections:
+                raise FakeCloudError(409, f"Collection already exists: {key[0]}/{key[1]}")
+            collections[key] = set()
+
+    def link_assets_to_collection(self, org_id: str, project_id: str, collection_path: str, asset_ids: [str]):
+        self._call("link_assets_to_collection")
+        path = PurePosixPath(collection_path)
+        key = ("" if str(path.parent) in (".", "/") else str(path.parent).lstrip("/"), path.name)
+        with self.lock:
+            collection = self._get_project(org_id, project_id).collections.get(key)
+            if collection is None:
+                raise FakeCloudError(404, f"Collection not found: {collection_path}")
+            collection.update(asset_ids)
+
+    def delete_collection(self, org_id: str, project_id: str, collection_path: str):
+        self._call("delete_collection")
+        path = PurePosixPath(collection_path)
+        key = ("" if str(path.parent) in (".", "/") else str(path.parent).lstrip("/"), path.name)
+        with self.lock:
+            self._get_project(org_id, project_id).collections.pop(key, None)
+
+    def unlink_assets_from_project(self, org_id: str, project_id: str, asset_ids: [str]):
+        self._call("unlink_assets_from_project")
+        with self.lock:
+            assets = self._get_project(org_id, project_id).assets
+            for asset_id in asset_ids:
+                assets.pop(asset_id, None)
+
+    def list_field_definitions(self, org_id: str, project_id: str):
+        self._call("list_field_definitions")
+        return list(self.settings.field_definitions)
+
+    # uc.identity
+
+    def use_service_account(self, key_id: str, key: str):
+        pass
+
+    def use_user_login(self):
+        pass
+
+    def get_organization_list(self):
+        self._call("get_organization_list")
+        return [types.SimpleNamespace(id="fake-organization", name="Fake organization")]
+
+    def get_project_list(self, org_id: str):
+        self._call("get_project_list")
+        with self.lock:
+            project_ids = sorted({project_id for organization, project_id in self.projects if organization == org_id})
+        return [types.SimpleNamespace(id=project_id, name=project_id) for project_id in project_ids or ["fake-project"]]
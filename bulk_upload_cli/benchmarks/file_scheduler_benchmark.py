@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from bulk_upload.file_upload_scheduler import FileUploadScheduler
+from bulk_upload.models import AssetInfo
+
+
+def generate_file_counts(asset_count: int, large_asset_files: int, seed: int = 0) -> [int]:
+    """Skewed distribution: most assets have a single file, a few have many."""
+    rng = random.Random(seed)
+    file_counts = [1 if rng.random() < 0.8 else rng.randint(2, 10) for _ in range(asset_count)]
+    file_counts[rng.randrange(asset_count)] = large_asset_files
+    return file_counts
+
+
+def upload_file(latency: float):
+    time.sleep(latency)
+
+
+def run_nested_pools(file_counts: [int], latency: float, parallel_asset_upload: int, parallel_file_upload: int):
+    """Previous behavior: a pool of assets, each creating its own pool for its files."""
+
+    def upload_asset(file_count: int):
+        with ThreadPoolExecutor(max_workers=parallel_file_upload) as file_executor:
+            futures = [file_executor.submit(upload_file, latency) for _ in range(file_count)]
+        wait(futures)
+
+    with ThreadPoolExecutor(max_workers=parallel_asset_upload) as executor:
+        for file_count in file_counts:
+            executor.submit(upload_asset, file_count)
+
+
+def run_scheduler(file_counts: [int], latency: float, parallel_asset_upload: int, parallel_file_upload: int):
+    scheduler = FileUploadScheduler(parallel_asset_upload * parallel_file_upload)
+    scheduler.start()
+    for i, file_count in enumerate(file_counts):
+        scheduler.submit_asset(AssetInfo(f"asset_{i}"),
+                               lambda asset, count=file_count: [lambda: upload_file(latency)] * count)
+    scheduler.join()
+    print(f"  {scheduler.get_summary()}")
+
+
+def measure(name: str, function, file_counts: [int], *args):
+    start = time.perf_counter()
+    function(file_counts, *args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {elapsed:8.2f}s  {sum(file_counts) / elapsed:9.1f} files/s")
+    return elapsed
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Compare nested asset and file pools with the file upload scheduler")
+    parser.add_argument("--assets", type=int, default=500, help="Number of assets to generate")
+    parser.add_argument("--large-asset-files", type=int, default=2000, help="Number of files of the largest asset")
+    parser.add_argument("--latency", type=float, default=0.01, help="Simulated upload time of a file in seconds")
+    parser.add_argument("--parallel-asset-upload", type=int, default=5)
+    parser.add_argument("--parallel-file-upload", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    counts = generate_file_counts(arguments.assets, arguments.large_asset_files)
+    print(f"Uploading {sum(counts)} files of {len(counts)} assets, {arguments.latency * 1000:.0f}ms per file, "
+          f"{arguments.parallel_asset_upload}x{arguments.parallel_file_upload} workers")
+
+    nested_time = measure("nested pools", run_nested_pools, counts, arguments.latency,
+                          arguments.parallel_asset_upload, arguments.parallel_file_upload)
+    scheduler_time = measure("scheduler", run_scheduler, counts, arguments.latency,
+                             arguments.parallel_asset_upload, arguments.parallel_file_upload)
+    print(f"Speedup: {nested_time / scheduler_time:.2f}x")
@@ -0,0 +1,192 @@
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+import traceback
+
+import bulk_upload.assets_uploaders as assets_uploaders
+
+from benchmarks.fake_cloud import FakeUnityCloud, FakeCloudSettings, LatencyDistribution
+from benchmarks.synthetic_data import generate_folder_tree, generate_unity_project, generate_unity_package
+from bulk_upload.bulk_upload_pipeline import BulkUploadPipeline
+from bulk_upload.cloud_cache import cloud_cache
+from bulk_upload.metrics import instrument_sdk
+from bulk_upload.tracing import tracer
+from bulk_upload.models import AppSettings, ProjectUploaderConfig, Strategy, DependencyStrategy, UploadEngine
+from shared.log_backend import log_backend
+
+STRATEGIES = [Strategy.SINGLE_FILE_ASSET, Strategy.NAME_GROUPING, Strategy.FOLDER_GROUPING,
+              Strategy.SINGLE_FILE_ASSET_UNITY, Strategy.UNITY_PACKAGE]
+
+
+class SettleDelays(object):
+    """Stands in for the time module of the uploader: the fixed waits for the real backend to settle are skipped
+    and counted, the fake backend being consistent as soon as a call returns."""
+
+    def __init__(self):
+        self.skipped = 0.0
+        self.monotonic = time.monotonic
+        self.perf_counter = time.perf_counter
+        self.time = time.time
+
+    def sleep(self, seconds: float):
+        self.skipped += seconds
+
+
+def get_config(strategy: Strategy, data_folder: str, arguments) -> ProjectUploaderConfig:
+    config = ProjectUploaderConfig()
+    config.strategy = strategy
+    config.org_id = "fake-organization"
+    config.project_id = f"load-test-{strategy.value}"
+    config.key_id = "fake-key-id"
+    config.key = "fake-key"
+    config.tags = ["load-test"]
+
+    if strategy in (Strategy.SINGLE_FILE_ASSET, Strategy.NAME_GROUPING, Strategy.FOLDER_GROUPING):
+        generate_folder_tree(data_folder, arguments.assets, arguments.files_per_asset, arguments.file_size * 1024)
+        config.assets_path = data_folder
+        # the assets are the folders group_<g>/asset_<i>
+        config.hierarchical_level = 2
+    elif strategy == Strategy.SINGLE_FILE_ASSET_UNITY:
+        generate_unity_project(data_folder, arguments.assets, arguments.references, arguments.file_size * 1024)
+        config.assets_path = os.path.join(data_folder, "Assets")
+        config.dependency_strategy = DependencyStrategy.ASSET_REFERENCE
+    elif strategy == Strategy.UNITY_PACKAGE:
+        config.assets_path = os.path.join(data_folder, "generated.unitypackage")
+        generate_unity_package(config.assets_path, arguments.assets, arguments.references, arguments.file_size * 1024)
+        config.dependency_strategy = DependencyStrategy.ASSET_REFERENCE
+    return config
+
+
+def get_cloud_settings(arguments) -> FakeCloudSettings:
+    settings = FakeCloudSettings()
+    settings.latency = LatencyDistribution.parse(arguments.latency)
+    settings.operation_latencies["upload_file"] = LatencyDistribution.parse(arguments.upload_latency)
+    settings.transformation_time = LatencyDistribution.parse(arguments.transformation_time)
+    settings.requests_per_second = arguments.requests_per_second
+    settings.throttle_mode = arguments.throttle_mode
+    settings.error_rate = arguments.error_rate
+    settings.bandwidth = arguments.bandwidth * 1024 * 1024
+    settings.seed = arguments.seed
+    return settings
+
+
+def run_strategy(strategy: Strategy, arguments, app_settings: AppSettings) -> dict:
+    work_folder = tempfile.mkdtemp(prefix=f"load_test_{strategy.value}_")
+    current_folder = os.getcwd()
+    settle_delays = SettleDelays()
+    try:
+        config = get_config(strategy, os.path.join(work_folder, "data"), arguments)
+        os.chdir(work_folder)
+        assets_uploaders.time = settle_delays if not arguments.keep_settle_delays else time
+        with FakeUnityCloud(get_cloud_settings(arguments)) as cloud:
+            # the fake replaces the SDK functions, they are instrumented again as a run would
+            instrument_sdk()
+            output = None if arguments.verbose else open(os.devnull, "w")
+            with contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext():
+                if arguments.trace_folder:
+                    tracer.start(os.path.join(arguments.trace_folder, f"trace_{strategy.value}.json"))
+                start = time.perf_counter()
+                try:
+                    complete = BulkUploadPipeline().run_batch_config(config, app_settings, strategy.value)
+                except Exception:
+                    traceback.print_exc()
+                    complete = False
+                elapsed = time.perf_counter() - start
+                tracer.stop()
+                # the queued messages of the run are written before the output is restored
+                log_backend.flush()
+            if output is not None:
+                output.close()
+            summary = cloud.get_summary()
+    finally:
+        assets_uploaders.time = time
+        os.chdir(current_folder)
+        shutil.rmtree(work_folder, ignore_errors=True)
+        cloud_cache.cache.clear()
+
+    assets = max(1, summary["assets"])
+    return {
+        "strategy": strategy.value,
+        "complete": complete,
+        "assets": summary["assets"],
+        "files": summary["filesUploaded"],
+        "megabytes": summary["bytesUploaded"] / 1024 / 1024,
+        "seconds": elapsed,
+        "assetsPerSecond": summary["assets"] / elapsed,
+        "megabytesPerSecond": summary["bytesUploaded"] / 1024 / 1024 / elapsed,
+        "callsPerAsset": summary["calls"] / assets,
+        "errors": sum(summary["errors"].values()),
+        "throttled": summary["throttled"],
+        "settleDelaysSkipped": settle_delays.skipped,
+        "callsPerOperation": summary["callsPerOperation"],
+    }
+
+
+def print_result(result: dict, show_operations: bool):
+    print(f"  {result['strategy']:<22} {result['assets']:>7} {result['files']:>7} {result['megabytes']:>9.1f} "
+          f"{result['seconds']:>8.2f} {result['assetsPerSecond']:>9.1f} {result['megabytesPerSecond']:>8.2f} "
+          f"{result['callsPerAsset']:>11.2f} {result['errors']:>7} {result['throttled']:>9}"
+          + ("" if result["complete"] else "  (pipeline failed)"))
+    if show_operations:
+        for operation, count in sorted(result["callsPerOperation"].items(), key=lambda item: -item[1]):
+            print(f"      {operation:<32} {count:>8}  {count / max(1, result['assets']):.2f}/asset")
+
+
+def read_arguments(args: [str] = None):
+    parser = argparse.ArgumentParser(description="Run the upload pipeline end to end against an in-memory fake of "
+                                                 "Unity Cloud and report the throughput of every strategy")
+    parser.add_argument("--strategies", type=str, nargs="+", default=[strategy.value for strategy in STRATEGIES])
+    parser.add_argument("--assets", type=int, default=200, help="Number of assets generated for every strategy")
+    parser.add_argument("--files-per-asset", type=int, default=3)
+    parser.add_argument("--file-size", type=int, default=64, help="Size of every generated file in KiB")
+    parser.add_argument("--references", type=int, default=2, help="References per asset of the Unity strategies")
+    parser.add_argument("--latency", type=str, default="lognormal:0.02:0.5",
+                        help="Latency of the API calls: constant:<s>, uniform:<low>:<high> or lognormal:<median>:<sigma>")
+    parser.add_argument("--upload-latency", type=str, default="lognormal:0.05:0.5", help="Latency of the uploads")
+    parser.add_argument("--transformation-time", type=str, default="constant:0.1",
+                        help="Time of the server-side transformations awaited by the freezes")
+    parser.add_argument("--requests-per-second", type=float, default=0, help="Throttling limit, 0 for none")
+    parser.add_argument("--throttle-mode", type=str, choices=["delay", "reject"], default="delay")
+    parser.add_argument("--error-rate", type=float, default=0, help="Probability of a call failing")
+    parser.add_argument("--bandwidth", type=float, default=0, help="Upload bandwidth in MiB/s, 0 for unlimited")
+    parser.add_argument("--upload-engine", type=str, default=UploadEngine.THREADS.value,
+                        choices=[engine.value for engine in UploadEngine])
+    parser.add_argument("--streaming", action="store_true", help="Enable the streamingUpload setting")
+    parser.add_argument("--keep-settle-delays", action="store_true",
+                        help="Keep the fixed waits of the uploader for the backend to settle")
+    parser.add_argument("--operations", action="store_true", help="Print the calls per operation of every strategy")
+    parser.add_argument("--verbose", action="store_true", help="Print the output of the pipeline")
+    parser.add_argument("--trace-folder", type=str, default="",
+                        help="Folder where a trace of every strategy is written, no trace when empty")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    log_backend.configure()
+    if arguments.trace_folder:
+        arguments.trace_folder = os.path.abspath(arguments.trace_folder)
+        os.makedirs(arguments.trace_folder, exist_ok=True)
+    app_settings = AppSettings()
+    app_settings.upload_engine = UploadEngine(arguments.upload_engine)
+    app_settings.streaming_upload = arguments.streaming
+
+    print(f"{arguments.assets} assets of {arguments.files_per_asset} x {arguments.file_size} KiB files, "
+          f"latency {arguments.latency}, upload latency {arguments.upload_latency}, "
+          f"error rate {arguments.error_rate}, {arguments.requests_per_second or 'unlimited'} requests/s, "
+          f"bandwidth {arguments.bandwidth or 'unlimited'} MiB/s")
+    print(f"  {'strategy':<22} {'assets':>7} {'files':>7} {'MiB':>9} {'seconds':>8} {'assets/s':>9} {'MiB/s':>8} "
+          f"{'calls/asset':>11} {'errors':>7} {'throttled':>9}")
+
+    skipped = 0.0
+    for strategy_value in arguments.strategies:
+        result = run_strategy(Strategy(strategy_value), arguments, app_settings)
+        skipped += result["settleDelaysSkipped"]
+        print_result(result, arguments.operations)
+
+    if skipped > 0:
+        print(f"Fixed settle delays of the uploader skipped: {skipped:.1f}s, use --keep-settle-delays to include them")
@@ -0,0 +1,222 @@
+import argparse
+import gc
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_data import generate_folder_tree, generate_unity_project, generate_unity_package
+from bulk_upload.asset_mappers import NameGroupingAssetMapper, FolderGroupingAssetMapper, SingleFileAssetMapper, \
+    UnityProjectAssetMapper, UnityPackageAssetMapper
+from bulk_upload.dependency_resolving import EmbeddedDependencyResolver, AssetReferenceDependencyResolver
+from bulk_upload.file_explorers import LocalFileExplorer
+from bulk_upload.models import ProjectUploaderConfig, Strategy
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "mapper_baseline.json")
+SIZE_SUFFIXES = {"k": 1000, "M": 1000 * 1000}
+
+
+def parse_size(value: str) -> int:
+    if value[-1] in SIZE_SUFFIXES:
+        return int(value[:-1]) * SIZE_SUFFIXES[value[-1]]
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return str(size)
+
+
+def get_dataset(kind: str, size: int, data_folder: str, arguments) -> str:
+    """Datasets are generated once per kind and size and reused by the following runs."""
+    path = os.path.join(data_folder, f"{kind}_{format_size(size)}")
+    if os.path.exists(os.path.join(path, ".complete")):
+        return path
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    print(f"Generating {kind} with {format_size(size)} items in {path}", flush=True)
+    if kind == "folderTree":
+        generate_folder_tree(path, size, arguments.files_per_asset, arguments.file_size)
+    elif kind == "unityProject":
+        generate_unity_project(path, size, arguments.references, arguments.file_size)
+    elif kind == "unityPackage":
+        generate_unity_package(os.path.join(path, "generated.unitypackage"), size, arguments.references,
+                               arguments.file_size)
+    open(os.path.join(path, ".complete"), "w").close()
+    return path
+
+
+def get_config(strategy: Strategy, assets_path: str, hierarchical_level: int = 0) -> ProjectUploaderConfig:
+    config = ProjectUploaderConfig()
+    config.strategy = strategy
+    config.assets_path = assets_path
+    config.hierarchical_level = hierarchical_level
+    return config
+
+
+class BenchmarkCase(object):
+    """setup returns the input of run, only run is measured."""
+
+    def __init__(self, name: str, dataset: str, setup, run):
+        self.name = name
+        self.dataset = dataset
+        self.setup = setup
+        self.run = run
+
+
+def map_unity_project(path: str):
+    return UnityProjectAssetMapper(LocalFileExplorer()).map_assets(
+        get_config(Strategy.SINGLE_FILE_ASSET_UNITY, os.path.join(path, "Assets")))
+
+
+def map_unity_package(path: str):
+    mapper = UnityPackageAssetMapper()
+    try:
+        return mapper.map_assets(get_config(Strategy.UNITY_PACKAGE, os.path.join(path, "generated.unitypackage")))
+    finally:
+        # the package is extracted in the working directory, see run_in_work_folder
+        shutil.rmtree("tempo", ignore_errors=True)
+
+
+CASES = [
+    BenchmarkCase("nameGrouping", "folderTree", lambda path: path, lambda path: NameGroupingAssetMapper(
+        LocalFileExplorer()).map_assets(get_config(Strategy.NAME_GROUPING, path))),
+    BenchmarkCase("folderGrouping", "folderTree", lambda path: path, lambda path: FolderGroupingAssetMapper(
+        LocalFileExplorer()).map_assets(get_config(Strategy.FOLDER_GROUPING, path, hierarchical_level=2))),
+    BenchmarkCase("singleFile", "folderTree", lambda path: path, lambda path: SingleFileAssetMapper(
+        LocalFileExplorer()).map_assets(get_config(Strategy.SINGLE_FILE_ASSET, path))),
+    BenchmarkCase("unityProject", "unityProject", lambda path: path, map_unity_project),
+    BenchmarkCase("unityPackage", "unityPackage", lambda path: path, map_unity_package),
+    BenchmarkCase("embeddedResolver", "unityProject", map_unity_project,
+                  lambda assets: EmbeddedDependencyResolver().resolve_dependencies(assets)),
+    BenchmarkCase("referenceResolver", "unityProject", map_unity_project,
+                  lambda assets: AssetReferenceDependencyResolver().resolve_dependencies(assets)),
+]
+
+
+def run_in_work_folder(function, *args):
+    """Mappers may write in the working directory, they run in a temporary one."""
+    current_folder = os.getcwd()
+    work_folder = tempfile.mkdtemp(prefix="mapper_benchmark_")
+    os.chdir(work_folder)
+    try:
+        return function(*args)
+    finally:
+        os.chdir(current_folder)
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+
+def measure_case(case: BenchmarkCase, path: str, repeat: int) -> dict:
+    """The time is the best of the repeats. The peak memory is measured on a separate run since tracing allocations
+    slows the code down, it only covers the allocations made by run, not its input."""
+    times = []
+    for _ in range(repeat):
+        value = run_in_work_folder(case.setup, path)
+        gc.collect()
+        start = time.perf_counter()
+        run_in_work_folder(case.run, value)
+        times.append(time.perf_counter() - start)
+        del value
+
+    value = run_in_work_folder(case.setup, path)
+    gc.collect()
+    tracemalloc.start()
+    run_in_work_folder(case.run, value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peakMiB": peak / 1024 ** 2}
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_seconds: float, min_mib: float) -> [str]:
+    """Returns the regressions of the result, small absolute differences are ignored as noise."""
+    regressions = []
+    for metric, floor in [("seconds", min_seconds), ("peakMiB", min_mib)]:
+        expected = baseline.get(metric)
+        if expected is None:
+            continue
+        if result[metric] > expected * (1 + tolerance) and result[metric] - expected > floor:
+            regressions.append(metric)
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(path: str, baseline: dict):
+    rounded = {key: {metric: round(value, 4) for metric, value in result.items()} for key, result in baseline.items()}
+    with open(path, "w") as f:
+        json.dump(rounded, f, indent=4, sort_keys=True)
+        f.write("\n")
+    print(f"Baseline written to {path}")
+
+
+def format_change(value: float, expected: float) -> str:
+    if expected is None or expected == 0:
+        return "     n/a"
+    return f"{(value / expected - 1) * 100:+7.1f}%"
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Time the asset mappers and dependency resolvers on synthetic data "
+                                                 "and compare them to a stored baseline")
+    parser.add_argument("--sizes", type=str, nargs="+", default=["1k"], help="Number of items, for example 1k 100k 1M")
+    parser.add_argument("--cases", type=str, nargs="+", default=[case.name for case in CASES])
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs of every case, the best is kept")
+    parser.add_argument("--files-per-asset", type=int, default=2, help="Files per asset of the folder trees")
+    parser.add_argument("--file-size", type=int, default=256, help="Size of every generated file in bytes")
+    parser.add_argument("--references", type=int, default=2, help="GUID references per Unity asset")
+    parser.add_argument("--data-folder", type=str,
+                        default=os.path.join(tempfile.gettempdir(), "bulk_upload_benchmark_data"),
+                        help="Folder where the generated datasets are kept between runs")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative increase over the baseline reported as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.01,
+                        help="Time increases below this are never reported as regressions")
+    parser.add_argument("--min-mib", type=float, default=1.0,
+                        help="Memory increases below this are never reported as regressions")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    baseline = load_baseline(arguments.baseline)
+    cases = [case for case in CASES if case.name in arguments.cases]
+    results = {}
+    regressions = []
+
+    print(f"{'case':<30} {'seconds':>9} {'change':>8} {'peak MiB':>9} {'change':>8}")
+    for size in [parse_size(value) for value in arguments.sizes]:
+        for case in cases:
+            key = f"{case.name}/{format_size(size)}"
+            path = get_dataset(case.dataset, size, os.path.abspath(arguments.data_folder), arguments)
+            result = measure_case(case, path, arguments.repeat)
+            results[key] = result
+
+            expected = baseline.get(key, {})
+            case_regressions = compare(result, expected, arguments.tolerance, arguments.min_seconds,
+                                       arguments.min_mib)
+            regressions.extend(f"{key} {metric}" for metric in case_regressions)
+            status = "no baseline" if len(expected) == 0 else \
+                ("REGRESSION" if len(case_regressions) > 0 else "ok")
+            print(f"{key:<30} {result['seconds']:9.3f} {format_change(result['seconds'], expected.get('seconds'))} "
+                  f"{result['peakMiB']:9.1f} {format_change(result['peakMiB'], expected.get('peakMiB'))}  {status}",
+                  flush=True)
+
+    if arguments.update_baseline:
+        baseline.update(results)
+        write_baseline(arguments.baseline, baseline)
+    elif len(regressions) > 0:
+        print(f"{len(regressions)} regressions over {arguments.tolerance * 100:.0f}% of the baseline: "
+              f"{', '.join(regressions)}")
+        exit(1)
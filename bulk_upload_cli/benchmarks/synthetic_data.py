@@ -0,0 +1,98 @@
+import io
+import os
+import random
+import tarfile
+
+FILE_EXTENSIONS = [".fbx", ".png", ".mat", ".wav", ".txt"]
+
+
+def generate_guid(rng: random.Random) -> str:
+    return "%032x" % rng.getrandbits(128)
+
+
+def get_payload(size: int, header: bytes = b"") -> bytes:
+    return header + b"x" * max(0, size - len(header))
+
+
+def generate_folder_tree(root: str, asset_count: int, files_per_asset: int = 3, file_size: int = 1024,
+                         assets_per_folder: int = 100) -> int:
+    """Writes root/group_<g>/asset_<i>/asset_<i>.<ext>, files_per_asset files per asset.
+
+    The files of an asset share their name and their folder, so the tree maps to asset_count assets when grouping by
+    name or by folder at level 2, and to asset_count * files_per_asset assets with one file per asset.
+    Returns the number of files written.
+    """
+    payload = get_payload(file_size)
+    for i in range(asset_count):
+        folder = os.path.join(root, f"group_{i // assets_per_folder}", f"asset_{i}")
+        os.makedirs(folder, exist_ok=True)
+        for j in range(files_per_asset):
+            with open(os.path.join(folder, f"asset_{i}{FILE_EXTENSIONS[j % len(FILE_EXTENSIONS)]}"), "wb") as f:
+                f.write(payload)
+    return asset_count * files_per_asset
+
+
+def get_unity_references(i: int, asset_count: int, references_per_asset: int, rng: random.Random) -> [int]:
+    """Layered like a real project: half of the assets are textures without references, a quarter are materials
+    referencing textures and a quarter are prefabs referencing materials."""
+    layer = i % 4
+    if layer < 2 or asset_count < 4:
+        return []
+    targets = range(0, asset_count - 3, 4) if layer == 2 else range(2, asset_count - 1, 4)
+    return [targets[rng.randrange(len(targets))] for _ in range(references_per_asset)]
+
+
+def get_unity_asset_content(i: int, guids: [str], references_per_asset: int, file_size: int,
+                            rng: random.Random) -> bytes:
+    lines = ["%YAML 1.1", "--- !u!1 &100000", "GameObject:", "  m_Name: Generated"]
+    for k, target in enumerate(get_unity_references(i, len(guids), references_per_asset, rng)):
+        lines.append(f"  m_Reference{k}: {{fileID: 11400000, guid: {guids[target]}, type: 2}}")
+    return get_payload(file_size, ("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def get_unity_meta_content(guid: str) -> bytes:
+    return f"fileFormatVersion: 2\nguid: {guid}\nNativeFormatImporter:\n  userData: \n".encode("utf-8")
+
+
+def get_unity_asset_path(i: int, assets_per_folder: int) -> str:
+    return f"Assets/Folder_{i // assets_per_folder}/Asset_{i}.prefab"
+
+
+def generate_unity_project(root: str, asset_count: int, references_per_asset: int = 2, file_size: int = 1024,
+                           assets_per_folder: int = 100, seed: int = 0) -> [str]:
+    """Writes root/Assets/Folder_<f>/Asset_<i>.prefab with its .meta file, assets referencing others by GUID the way
+    serialized Unity assets do. Returns the GUIDs of the assets."""
+    rng = random.Random(seed)
+    guids = [generate_guid(rng) for _ in range(asset_count)]
+    for i, guid in enumerate(guids):
+        path = os.path.join(root, *get_unity_asset_path(i, assets_per_folder).split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(get_unity_asset_content(i, guids, references_per_asset, file_size, rng))
+        with open(path + ".meta", "wb") as f:
+            f.write(get_unity_meta_content(guid))
+    return guids
+
+
+def add_tar_file(tar: tarfile.TarFile, name: str, content: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    tar.addfile(info, io.BytesIO(content))
+
+
+def generate_unity_package(path: str, asset_count: int, references_per_asset: int = 2, file_size: int = 1024,
+                           assets_per_folder: int = 100, seed: int = 0) -> [str]:
+    """Writes a .unitypackage: a gzipped tar with a <guid>/ folder per asset holding asset, asset.meta and pathname.
+    Returns the GUIDs of the assets."""
+    rng = random.Random(seed)
+    guids = [generate_guid(rng) for _ in range(asset_count)]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with tarfile.open(path, "w:gz", compresslevel=1) as tar:
+        for i, guid in enumerate(guids):
+            folder = tarfile.TarInfo(guid)
+            folder.type = tarfile.DIRTYPE
+            tar.addfile(folder)
+            add_tar_file(tar, f"{guid}/asset", get_unity_asset_content(i, guids, references_per_asset, file_size, rng))
+            add_tar_file(tar, f"{guid}/asset.meta", get_unity_meta_content(guid))
+            add_tar_file(tar, f"{guid}/pathname", get_unity_asset_path(i, assets_per_folder).encode("utf-8"))
+    return guids
@@ -0,0 +1,93 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import load_test
+from bulk_upload.metrics import instrument_function
+from bulk_upload.models import AppSettings, Strategy
+from bulk_upload.tracing import tracer
+
+
+def time_calls(function, count: int) -> float:
+    """Returns the time of a call in nanoseconds."""
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        function()
+    return (time.perf_counter_ns() - start) / count
+
+
+def span():
+    with tracer.span("span", "benchmark"):
+        pass
+
+
+def measure_calls(count: int, trace_folder: str) -> dict:
+    """Cost of a span and of an instrumented SDK call, with tracing disabled and enabled."""
+    instrumented = instrument_function("no_op", lambda: None)
+    results = {
+        "empty function": time_calls(lambda: None, count),
+        "span, disabled": time_calls(span, count),
+        "sdk call, tracing disabled": time_calls(instrumented, count),
+    }
+    tracer.start(os.path.join(trace_folder, "calls.json"))
+    try:
+        results["span, enabled"] = time_calls(span, count)
+        results["sdk call, tracing enabled"] = time_calls(instrumented, count)
+    finally:
+        tracer.stop()
+    return results
+
+
+def measure_run(arguments, strategy: Strategy, repeat: int, trace_folder: str) -> (float, float, int):
+    """Best time of the load test run without and with tracing, the runs alternating to share the noise."""
+    app_settings = AppSettings()
+    untraced = []
+    traced = []
+    for _ in range(repeat):
+        arguments.trace_folder = ""
+        untraced.append(load_test.run_strategy(strategy, arguments, app_settings)["seconds"])
+        arguments.trace_folder = trace_folder
+        traced.append(load_test.run_strategy(strategy, arguments, app_settings)["seconds"])
+
+    trace_size = os.path.getsize(os.path.join(trace_folder, f"trace_{strategy.value}.json"))
+    return min(untraced), min(traced), trace_size
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Measure the overhead of tracing on single calls and on an upload "
+                                                 "run against the fake Unity Cloud")
+    parser.add_argument("--calls", type=int, default=200000, help="Number of calls timed for the single call costs")
+    parser.add_argument("--strategy", type=str, default=Strategy.SINGLE_FILE_ASSET_UNITY.value)
+    parser.add_argument("--assets", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs with and without tracing, the best are kept")
+    parser.add_argument("--max-overhead", type=float, default=0.05,
+                        help="Relative slowdown of the traced run reported as a failure")
+    arguments, remaining = parser.parse_known_args()
+    # the remaining arguments configure the fake cloud and the generated data, see load_test.py
+    run_arguments = load_test.read_arguments(remaining)
+    run_arguments.assets = arguments.assets
+    return arguments, run_arguments
+
+
+if __name__ == "__main__":
+    arguments, run_arguments = read_arguments()
+    trace_folder = tempfile.mkdtemp(prefix="tracing_overhead_")
+    try:
+        print(f"Single calls, {arguments.calls} each:")
+        for name, nanoseconds in measure_calls(arguments.calls, trace_folder).items():
+            print(f"  {name:<28} {nanoseconds:>8.0f} ns")
+
+        untraced, traced, trace_size = measure_run(run_arguments, Strategy(arguments.strategy), arguments.repeat,
+                                                   trace_folder)
+        overhead = traced / untraced - 1
+        print(f"Upload of {run_arguments.assets} assets ({arguments.strategy}), best of {arguments.repeat}:")
+        print(f"  without tracing {untraced:.2f}s, with tracing {traced:.2f}s, overhead {overhead * 100:+.1f}%, "
+              f"trace of {trace_size / 1024 ** 2:.1f} MiB")
+    finally:
+        shutil.rmtree(trace_folder, ignore_errors=True)
+
+    if overhead > arguments.max_overhead:
+        print(f"Tracing overhead above {arguments.max_overhead * 100:.0f}%")
+        exit(1)
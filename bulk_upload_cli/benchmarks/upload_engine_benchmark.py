@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import http.client
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from bulk_upload.async_upload_engine import AsyncUploadEngine
+
+
+class LocalHttpStandIn(object):
+    """HTTP server on localhost answering every upload after a fixed latency, standing in for the cloud backend."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.ready.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=2048))
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        content_length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                content_length = int(line.split(b":")[1])
+        await reader.readexactly(content_length)
+        await asyncio.sleep(self.latency)
+        writer.write(b"HTTP/1.1 201 Created\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+
+def upload_blocking(port: int, payload: bytes):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        connection.request("PUT", "/upload", body=payload)
+        connection.getresponse().read()
+    finally:
+        connection.close()
+
+
+async def upload_native(port: int, payload: bytes):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"PUT /upload HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: %d\r\n\r\n" % len(payload) + payload)
+    await writer.drain()
+    await reader.read()
+    writer.close()
+
+
+def run_threads(port: int, payload: bytes, uploads: int, concurrency: int):
+    """Thread engine: one thread blocked on every request in flight."""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(uploads):
+            executor.submit(upload_blocking, port, payload)
+
+
+def run_async_executor(port: int, payload: bytes, uploads: int, concurrency: int, executor_size: int):
+    """Async engine calling the blocking SDK: the executor bounds the number of threads."""
+    engine = AsyncUploadEngine(min(executor_size, concurrency), {"upload": concurrency})
+    engine.run(engine.map("upload", upload_blocking, [(port, payload)] * uploads))
+
+
+def run_async_native(port: int, payload: bytes, uploads: int, concurrency: int):
+    """Async engine on a natively async HTTP path, no thread per request."""
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upload():
+            async with semaphore:
+                await upload_native(port, payload)
+
+        await asyncio.gather(*(upload() for _ in range(uploads)))
+
+    asyncio.run(run())
+
+
+def measure(name: str, function, *args):
+    peak_threads = [threading.active_count()]
+    stopping = threading.Event()
+
+    def sample_threads():
+        while not stopping.is_set():
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    stopping.set()
+    sampler.join()
+    uploads = args[2]
+    print(f"  {name:<16} {elapsed:7.2f}s  {uploads / elapsed:8.1f} uploads/s  peak threads: {peak_threads[0]}")
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Compare the thread and asyncio upload engines on a local HTTP stand-in")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--uploads-per-slot", type=int, default=5, help="Number of uploads per concurrent slot")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server response latency in seconds")
+    parser.add_argument("--payload", type=int, default=64, help="Size of every upload in KiB")
+    parser.add_argument("--executor-size", type=int, default=64, help="Executor size of the async engine")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    stand_in = LocalHttpStandIn(arguments.latency)
+    stand_in.start()
+    body = b"x" * arguments.payload * 1024
+
+    for concurrency in arguments.concurrency:
+        count = concurrency * arguments.uploads_per_slot
+        print(f"{concurrency} concurrent uploads, {count} uploads of {arguments.payload} KiB, "
+              f"{arguments.latency * 1000:.0f}ms latency")
+        measure("threads", run_threads, stand_in.port, body, count, concurrency)
+        measure("asyncio+executor", run_async_executor, stand_in.port, body, count, concurrency,
+                arguments.executor_size)
+        measure("asyncio native", run_async_native, stand_in.port, body, count, concurrency)
@@ -0,0 +1,86 @@
+import argparse
+import functools
+import random
+import threading
+import time
+
+from pathlib import PurePath, PurePosixPath
+from bulk_upload.file_upload_scheduler import FileUploadScheduler
+from bulk_upload.models import AssetInfo, FileInfo, UploadOrder
+from bulk_upload.upload_ordering import order_assets, order_files
+
+
+class SimulatedBackend(object):
+    """Upload time of a file is a fixed request latency plus its size over the bandwidth of a single connection."""
+
+    def __init__(self, latency: float, bandwidth: float):
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def upload_file(self, size: int):
+        time.sleep(self.latency + size / self.bandwidth)
+
+
+def generate_assets(small_assets: int, large_assets: int, large_size: int, seed: int = 0) -> ([AssetInfo], dict):
+    """Mostly small assets, with the large ones produced last by the mapper as in the worst case."""
+    rng = random.Random(seed)
+    assets = []
+    sizes = {}
+    for i in range(small_assets + large_assets):
+        asset = AssetInfo(f"asset_{i}")
+        file_count = 1 if i >= small_assets else rng.randint(1, 4)
+        for j in range(file_count):
+            file = FileInfo(PurePath(f"asset_{i}/file_{j}"), PurePosixPath(f"file_{j}"))
+            sizes[str(file.path)] = large_size if i >= small_assets else rng.randint(1, 20) * 1024 ** 2
+            asset.files.append(file)
+        assets.append(asset)
+    return assets, sizes
+
+
+def run_policy(upload_order: UploadOrder, assets: [AssetInfo], sizes: dict, backend: SimulatedBackend, workers: int):
+    get_file_size = lambda file: sizes[str(file.path)]
+    completion_times = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def get_tasks(asset: AssetInfo):
+        return [functools.partial(backend.upload_file, get_file_size(file))
+                for file in order_files(asset.files, upload_order, get_file_size)]
+
+    def on_complete(asset: AssetInfo, errors: list):
+        with lock:
+            completion_times.append(time.perf_counter() - start)
+
+    scheduler = FileUploadScheduler(workers)
+    scheduler.start()
+    for asset, worker in order_assets(assets, upload_order, get_file_size, workers):
+        scheduler.submit_asset(asset, get_tasks, on_complete, worker)
+    scheduler.join()
+
+    makespan = time.perf_counter() - start
+    completion_times.sort()
+    return makespan, completion_times[0], completion_times[len(completion_times) // 2]
+
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Compare the upload order policies on a simulated backend")
+    parser.add_argument("--small-assets", type=int, default=500, help="Number of assets of 1 to 4 small files")
+    parser.add_argument("--large-assets", type=int, default=3, help="Number of assets of a single large file")
+    parser.add_argument("--large-size", type=int, default=5120, help="Size of the large files in MiB")
+    parser.add_argument("--workers", type=int, default=4, help="Number of upload workers")
+    parser.add_argument("--latency", type=float, default=0.001, help="Simulated request latency in seconds")
+    parser.add_argument("--bandwidth", type=float, default=2560, help="Simulated bandwidth per connection in MiB/s")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = read_arguments()
+    generated_assets, file_sizes = generate_assets(arguments.small_assets, arguments.large_assets,
+                                                   arguments.large_size * 1024 ** 2)
+    simulated_backend = SimulatedBackend(arguments.latency, arguments.bandwidth * 1024 ** 2)
+    print(f"Uploading {len(generated_assets)} assets ({sum(file_sizes.values()) / 1024 ** 3:.1f} GiB) "
+          f"with {arguments.workers} workers")
+
+    for policy in UploadOrder:
+        total, first, median = run_policy(policy, generated_assets, file_sizes, simulated_backend, arguments.workers)
+        print(f"{policy.value:<14} makespan: {total:6.2f}s  first asset: {first:6.3f}s  half of the assets: {median:6.2f}s")
@@ -2,6 +2,7 @@ import argparse
 import platform
 import json
 
+from shared.log_backend import log_backend
 from shared.utils import OperationSystem, pip_install_requirements, \
     check_install_requirements, check_python_version
 import os
@@ -16,7 +17,22 @@ def read_arguments():
     parser.add_argument("--create", action="store_true", help="Bulk create assets in the cloud")
     parser.add_argument("--config-select", action="store_true",help="Select a configuration file to run. Use with --create.", default=False)
     parser.add_argument("--config", type=str, help="Path to the configuration file. Use with --create.", default=None)
+    parser.add_argument("--config-batch", type=str, nargs="+", help="Run several configuration files, or folders of "
+                                                                     "configuration files, at the same time. Use with --create.",
+                        default=None)
     parser.add_argument("--delete", action="store_true", help="Delete assets in a specific project.")
+    parser.add_argument("--shard", type=str, help="Process only the shard i of N of the assets, for example 0/4. "
+                                                  "Use with --create and --config.", default=None)
+    parser.add_argument("--merge-manifests", type=str, nargs="+", help="Merge the manifests written by the shards of a run.",
+                        default=None)
+    parser.add_argument("--output", type=str, help="Path of the merged manifest. Use with --merge-manifests.",
+                        default="manifest.json")
+    parser.add_argument("--profile", type=str, nargs="?", const="profile", help="Profile every step of the run and "
+                                                                              "write the profiles to this folder, "
+                                                                              "profile by default. Use with --create.",
+                        default=None)
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace the memory allocations of every "
+                                                                     "step, slowing them down. Use with --profile.")
 
     args = parser.parse_args()
     return args
@@ -39,14 +55,31 @@ def install_requirements():
     pip_install_requirements()
 
 
-def run_bulk_assets_creation(config=None, select_config=False):
+def run_batch_assets_creation(config_paths):
+    from bulk_upload.batch_runner import BatchUploadRunner
+    from bulk_upload.models import AppSettings
+    app_settings = AppSettings()
+    app_settings.load_from_json()
+    return BatchUploadRunner(app_settings).run(config_paths)
+
+
+def run_bulk_assets_creation(config=None, select_config=False, shard=None, profile_folder=None, profile_memory=False):
     from bulk_upload import bulk_upload_pipeline
+    from bulk_upload.profiling import profiler
+    if profile_folder is not None:
+        profiler.start(profile_folder, memory=profile_memory)
+
     pipeline = bulk_upload_pipeline.BulkUploadPipeline()
-    pipeline.run(config, select_config)
+    try:
+        pipeline.run(config, select_config, shard)
+    finally:
+        profiler.stop()
 
 
 if __name__ == "__main__":
     arguments = read_arguments()
+    # configured with the defaults until the app settings are loaded, so that nothing logged before is lost
+    log_backend.configure()
 
     config = arguments.config
     config_select = arguments.config_select
@@ -63,6 +96,11 @@ if __name__ == "__main__":
         print("Requirements installed.")
         exit(0)
 
+    if arguments.merge_manifests is not None:
+        from bulk_upload.sharding import merge_manifests
+        merge_manifests(arguments.merge_manifests, arguments.output)
+        exit(0)
+
     if not check_install_requirements():
         print("It seems that the requirements are not installed. Please run the script with --install first")
         exit(1)
@@ -79,7 +117,30 @@ if __name__ == "__main__":
     if config is not None and not os.path.exists(config):
         raise Exception("Configuration file not found.")
 
+    if arguments.profile_memory and arguments.profile is None:
+        print("--profile-memory can only be used with --profile.")
+        exit(1)
+
+    if arguments.config_batch is not None:
+        if arguments.shard is not None or config is not None or config_select or arguments.profile is not None:
+            print("--config-batch can't be used with --config, --config-select, --shard or --profile.")
+            exit(1)
+        if not arguments.create:
+            print("No action specified. Use --create to start a bulk creation.")
+            exit(1)
+
+        exit(0 if run_batch_assets_creation(arguments.config_batch) else 1)
+
+    shard = None
+    if arguments.shard is not None:
+        if config is None and not config_select:
+            print("Sharding is only available in headless mode. Use --shard with --config.")
+            exit(1)
+
+        from bulk_upload.sharding import Shard
+        shard = Shard.parse(arguments.shard)
+
     if arguments.create:
-        run_bulk_assets_creation(config, config_select)
+        run_bulk_assets_creation(config, config_select, shard, arguments.profile, arguments.profile_memory)
     else:
         print("No action specified. Use --create to start a bulk creation.")
\ No newline at end of file
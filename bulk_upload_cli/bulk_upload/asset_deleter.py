@@ -1,8 +1,9 @@
 from InquirerPy import inquirer
-from shared.utils import execute_prompt
+from shared.utils import log_error, log_info, execute_prompt
 from pathlib import PurePosixPath
 
 import unity_cloud as uc
+from bulk_upload.cloud_cache import cloud_cache
 
 
 def ask_for_login():
@@ -27,7 +28,7 @@ def login(key_id=None, key=None):
     if key is not None and key_id != "" and key_id is not None and key != "":
         uc.identity.service_account.use(key_id, key)
     else:
-        print("Logging in with user account in progress", flush=True)
+        log_info("Logging in with user account in progress")
         login_with_user_account()
 
 
@@ -44,7 +45,7 @@ def delete_assets_in_project():
 
     organizations = uc.identity.get_organization_list()
     if len(organizations) == 0:
-        print("No organizations found. Please create an organization first.")
+        log_error("No organizations found. Please create an organization first.")
         exit(1)
     org_selected = execute_prompt(inquirer.select(message="Select an organization:",
                                    choices=[org.name for org in organizations]))
@@ -52,27 +53,28 @@ def delete_assets_in_project():
 
     projects = uc.identity.get_project_list(org_id)
     if len(projects) == 0:
-        print("No projects found. Please create a project first.")
+        log_error("No projects found. Please create a project first.")
         exit(1)
 
     selected_project = execute_prompt(inquirer.select(message="Select a project:",
                                        choices=[project.name for project in projects]))
     project_id = [project.id for project in projects if project.name == selected_project][0]
 
-    project_assets = uc.assets.get_asset_list(org_id, project_id)
+    project_assets = cloud_cache.get_asset_list(org_id, project_id)
     confirm = execute_prompt(inquirer.confirm(message=f"Are you sure you want to delete {len(project_assets)} assets?"))
     if not confirm:
-        print("Deletion canceled. Program will exit.")
+        log_info("Deletion canceled. Program will exit.")
         exit(0)
 
     assets_chunks = [project_assets[i:i + 50] for i in range(0, len(project_assets), 50)]
 
     for chunk in assets_chunks:
         uc.assets.unlink_assets_from_project(org_id, project_id, [asset.id for asset in chunk])
+    cloud_cache.invalidate_assets(org_id, project_id)
 
-    print(f"Deleted {len(project_assets)} assets.")
+    log_info(f"Deleted {len(project_assets)} assets.")
 
-    collections = uc.assets.list_collections(org_id, project_id)
+    collections = cloud_cache.list_collections(org_id, project_id)
     if len(collections) == 0:
         exit(0)
 
@@ -84,4 +86,5 @@ def delete_assets_in_project():
     # order by parent path parts length to delete sub collections first
     collections = sorted(collections, key=lambda x: len(PurePosixPath(x.parent_path).parts), reverse=True)
     for collection in collections:
-        uc.assets.delete_collection(org_id, project_id, collection.parent_path + "/" + collection.name)
\ No newline at end of file
+        uc.assets.delete_collection(org_id, project_id, collection.parent_path + "/" + collection.name)
+    cloud_cache.reset_collection_index(org_id, project_id)
\ No newline at end of file
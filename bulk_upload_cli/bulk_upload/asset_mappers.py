@@ -1,14 +1,20 @@
 import os
+import sys
 import tarfile
 import re
 import shutil
 import csv
+import logging
 import unity_cloud as uc
 
 from abc import ABC, abstractmethod
+from typing import Iterator
 from pathlib import PurePath, PurePosixPath, Path
 from bulk_upload.models import AssetInfo, FileInfo, ProjectUploaderConfig, Strategy, Metadata
 from bulk_upload.file_explorers import FileExplorer
+from bulk_upload.cloud_cache import cloud_cache
+
+logger = logging.getLogger(__name__)
 
 
 def is_directory_path(file_path) -> bool:
@@ -20,6 +26,11 @@ class AssetMapper(ABC):
     def map_assets(self, config: ProjectUploaderConfig) -> [AssetInfo]:
         pass
 
+    def iter_assets(self, config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
+        """Yields the assets as soon as they are mapped. Mappers that need every file before creating the first asset
+        map them all before yielding."""
+        yield from self.map_assets(config)
+
     @abstractmethod
     def clean_up(self):
         pass
@@ -34,6 +45,7 @@ class UnityProjectAssetMapper(AssetMapper):
         files = self.file_explorer.list_files(config.assets_path)
         # remove files with excluded extensions
         files = [f for f in files if not any(f.suffix.endswith(ext) for ext in config.excluded_file_extensions)]
+        file_set = set(files)
 
         assets = dict()
         for f in files:
@@ -48,7 +60,7 @@ class UnityProjectAssetMapper(AssetMapper):
             file = get_file_info(PurePath(f), config.assets_path)
             assets[file_name].files.append(file)
 
-            if meta_file_exists(file.path, files):
+            if meta_file_exists(file.path, file_set):
                 meta_file = get_meta_file(file.path, config.assets_path)
                 assets[file_name].files.append(meta_file)
                 dependencies = []
@@ -65,7 +77,7 @@ class UnityProjectAssetMapper(AssetMapper):
         return list(assets.values())
 
     def clean_up(self):
-        print("No clean up needed")
+        logger.debug("No clean up needed")
 
     @staticmethod
     def is_directory_path(file_path) -> bool:
@@ -101,14 +113,15 @@ class NameGroupingAssetMapper(AssetMapper):
             assets[base_name].files.append(file)
 
         for common_file in config.files_common_to_every_assets:
-            common_file = PurePath(common_file)
+            # the same FileInfo is shared by every asset, the content index will only read it once
+            common_file_info = get_file_info(PurePath(common_file), config.assets_path)
             for asset in assets.values():
-                asset.files.append(get_file_info(common_file, config.assets_path))
+                asset.files.append(common_file_info)
 
         return list(assets.values())
 
     def clean_up(self):
-        print("No clean up needed")
+        logger.debug("No clean up needed")
 
 
 class FolderGroupingAssetMapper(AssetMapper):
@@ -122,7 +135,7 @@ class FolderGroupingAssetMapper(AssetMapper):
         folders = self.file_explorer.get_folders_at_hierarchy_level(abs_path, int(config.hierarchical_level))
 
         if len(folders) == 0:
-            print(f"No folders found in the assets path. Only the root folder will be considered as an asset")
+            logger.warning("No folders found in the assets path. Only the root folder will be considered as an asset")
             folders = [config.assets_path]
 
         assets = dict()
@@ -162,37 +175,40 @@ class FolderGroupingAssetMapper(AssetMapper):
         return is_picture_file and file_name_is_preview or is_picture_file and parent_folder_is_preview
 
     def clean_up(self):
-        print("No clean up needed")
+        logger.debug("No clean up needed")
 
 
 class UnityPackageAssetMapper(AssetMapper):
 
     def map_assets(self, config: ProjectUploaderConfig) -> [AssetInfo]:
+        return list(self.iter_assets(config))
+
+    def iter_assets(self, config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
         if config.assets_path == "":
-            print("No unity package path provided. Please provide a unityPackagePath in the config file. Exiting...")
+            logger.error("No unity package path provided. Please provide a unityPackagePath in the config file. "
+                         "Exiting...")
             return
 
-        assets = []
         os.makedirs("tempo", exist_ok=True)
         with tarfile.open(config.assets_path, 'r:gz') as tar:
-            tar_names = tar.getnames()
-            for name in tar_names:
-                member = tar.getmember(name)
+            # looking members up by name in the archive is linear, they are indexed once
+            members = {member.name: member for member in tar.getmembers()}
+            for name, member in members.items():
                 if member.isdir():
                     asset_file_name = name + "/asset"
                     meta_file_name = name + "/asset.meta"
                     path_file = name + "/pathname"
-                    if asset_file_name in tar_names and meta_file_name in tar_names and path_file in tar_names:
-                        tar.extract(asset_file_name, path="tempo")
-                        tar.extract(meta_file_name, path="tempo")
+                    if asset_file_name in members and meta_file_name in members and path_file in members:
+                        tar.extract(members[asset_file_name], path="tempo")
+                        tar.extract(members[meta_file_name], path="tempo")
 
-                        asset_path = self.get_path_from_pathname_file(tar, path_file)
+                        asset_path = self.get_path_from_pathname_file(tar, members[path_file])
                         asset = AssetInfo(asset_path.name)
                         asset_file = PurePath("tempo").joinpath(asset_file_name)
                         asset.files.append(FileInfo(asset_file, PurePosixPath(asset_path.as_posix())))
                         meta_file = PurePath("tempo").joinpath(meta_file_name)
                         asset.files.append(FileInfo(meta_file, PurePosixPath(asset_path.as_posix().__str__() + ".meta")))
-                        asset.unity_id = PurePath(name).as_posix()
+                        asset.unity_id = sys.intern(PurePath(name).as_posix())
 
                         # Get dependencies
                         dependencies = []
@@ -204,22 +220,20 @@ class UnityPackageAssetMapper(AssetMapper):
                         asset.unresolved_dependencies = list(set(dependencies))
 
                         preview_file = name + "/preview.png"
-                        if preview_file in tar_names:
-                            tar.extract(preview_file, path="tempo")
+                        if preview_file in members:
+                            tar.extract(members[preview_file], path="tempo")
                             asset.preview_files = [FileInfo(PurePosixPath(PurePath("tempo").joinpath(preview_file).__str__()),
                                                            PurePosixPath("preview.png"))]
 
-                        assets.append(asset)
-
-        return assets
+                        yield asset
 
     def clean_up(self):
         shutil.rmtree("tempo")
-        print("Extracted files have been deleted")
+        logger.info("Extracted files have been deleted")
 
 
     @staticmethod
-    def get_path_from_pathname_file(tar, path_file):
+    def get_path_from_pathname_file(tar, path_file: tarfile.TarInfo):
         file = tar.extractfile(path_file)
         if file:
             #read only the first line of the path file
@@ -233,15 +247,16 @@ class SingleFileAssetMapper(AssetMapper):
         self.file_explorer = file_explorer
 
     def clean_up(self):
-        print("No clean up needed")
+        logger.debug("No clean up needed")
 
     def map_assets(self, config: ProjectUploaderConfig) -> [AssetInfo]:
+        return list(self.iter_assets(config))
+
+    def iter_assets(self, config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
         files = self.file_explorer.list_files(config.assets_path)
         # remove files with excluded extensions
         files = [f for f in files if not any(f.suffix.endswith(ext) for ext in config.excluded_file_extensions)]
 
-        assets = []
-
         potential_previews = {}
         if config.preview_detection:
             for file in files:
@@ -267,15 +282,13 @@ class SingleFileAssetMapper(AssetMapper):
                 asset.preview_files.append(preview_file)
                 del potential_previews[file.stem.lower()]
 
-            assets.append(asset)
+            yield asset
 
         # Add the remaining preview files as assets
         for preview_file in potential_previews.values():
             asset = AssetInfo(preview_file.path.stem + "_preview")
             asset.preview_files.append(preview_file)
-            assets.append(asset)
-
-        return assets
+            yield asset
 
     @staticmethod
     def is_preview_file(file_path) -> bool:
@@ -314,12 +327,14 @@ class CsvAssetMapper(AssetMapper):
     def clean_up(self):
         if self.sub_strategy == "unityPackage":
             shutil.rmtree("tempo")
-            print("Extracted files have been deleted")
+            logger.info("Extracted files have been deleted")
         else:
-            print("No clean up needed")
+            logger.debug("No clean up needed")
 
     def map_assets(self, config: ProjectUploaderConfig) -> [AssetInfo]:
-        assets = []
+        return list(self.iter_assets(config))
+
+    def iter_assets(self, config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
         with open(config.assets_path, 'r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             input_row = next(reader)
@@ -336,36 +351,34 @@ class CsvAssetMapper(AssetMapper):
             for row in reader:
                 asset = AssetInfo(row.get("Name"))
                 asset.from_csv(row)
-                assets.append(asset)
-
-        return assets
+                yield asset
 
     @staticmethod
     def extract_unity_package(unity_package_path):
 
         os.makedirs("tempo", exist_ok=True)
         with tarfile.open(unity_package_path, 'r:gz') as tar:
-            tar_names = tar.getnames()
-            for name in tar_names:
-                member = tar.getmember(name)
+            # looking members up by name in the archive is linear, they are indexed once
+            members = {member.name: member for member in tar.getmembers()}
+            for name, member in members.items():
                 if member.isdir():
                     asset_file_name = name + "/asset"
                     meta_file_name = name + "/asset.meta"
                     path_file = name + "/pathname"
-                    if asset_file_name in tar_names and meta_file_name in tar_names and path_file in tar_names:
-                        tar.extract(asset_file_name, path="tempo")
-                        tar.extract(meta_file_name, path="tempo")
+                    if asset_file_name in members and meta_file_name in members and path_file in members:
+                        tar.extract(members[asset_file_name], path="tempo")
+                        tar.extract(members[meta_file_name], path="tempo")
 
                         preview_file = name + "/preview.png"
-                        if preview_file in tar_names:
-                            tar.extract(preview_file, path="tempo")
+                        if preview_file in members:
+                            tar.extract(members[preview_file], path="tempo")
 
 
 class CloudAssetMapper(AssetMapper):
 
     def map_assets(self, config: ProjectUploaderConfig) -> [AssetInfo]:
-        print("Fetching assets from Unity Cloud...")
-        cloud_assets = uc.assets.get_asset_list(config.org_id, config.project_id)
+        logger.info("Fetching assets from Unity Cloud...")
+        cloud_assets = cloud_cache.get_asset_list(config.org_id, config.project_id)
         asset_infos = []
         for ca in cloud_assets:
             asset_info = AssetInfo(ca.name)
@@ -384,18 +397,18 @@ class CloudAssetMapper(AssetMapper):
 
             asset_infos.append(asset_info)
 
-        print(f"Found {len(asset_infos)} assets in your project")
+        logger.info(f"Found {len(asset_infos)} assets in your project")
 
         return asset_infos
 
     def clean_up(self):
-        print("No clean up needed")
+        logger.debug("No clean up needed")
 
 
 def get_unity_id_from_meta_file(meta_file_content) -> str:
     guid_regex = r"\nguid: ([a-f0-9]{32})"
     pattern = re.compile(guid_regex)
-    return pattern.findall(meta_file_content)[0]
+    return sys.intern(pattern.findall(meta_file_content)[0])
 
 
 def get_file_info(file: PurePath, root_folder: str) -> FileInfo:
@@ -425,4 +438,5 @@ def get_dependencies_from_file(file) -> []:
 def get_dependencies_from_string(file_content: str) -> []:
     guid_regex = r"fileID:.*guid: ([a-f0-9]{32})"
     pattern = re.compile(guid_regex)
-    return pattern.findall(file_content)
\ No newline at end of file
+    # GUIDs are interned so that assets referencing the same dependency share a single string
+    return [sys.intern(guid) for guid in pattern.findall(file_content)]
\ No newline at end of file
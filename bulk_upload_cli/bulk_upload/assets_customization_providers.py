@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
 from bulk_upload.models import AssetCustomization, AssetInfo, ProjectUploaderConfig, Strategy, CollectionInfo, DependencyStrategy
 from pathlib import PurePath, PurePosixPath
-from shared.utils import execute_prompt
+from shared.utils import log_info, log_warning, execute_prompt
+from bulk_upload.cloud_cache import cloud_cache
 import unity_cloud as uc
 
 
@@ -11,6 +13,13 @@ class AssetCustomizationProvider(ABC):
     def apply_asset_customization(self, assets: [AssetInfo], config: ProjectUploaderConfig) -> AssetCustomization:
         pass
 
+    def is_barrier(self, config: ProjectUploaderConfig) -> bool:
+        """Barrier customizers need every asset before customizing the first one."""
+        return True
+
+    def iter_asset_customization(self, assets: Iterable[AssetInfo], config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
+        yield from self.apply_asset_customization(list(assets), config)
+
 
 class InteractiveAssetCustomizer(AssetCustomizationProvider):
 
@@ -24,10 +33,10 @@ class InteractiveAssetCustomizer(AssetCustomizationProvider):
         if supports_folder_to_collections(config):
             config.path_to_collection = self.get_assets_organization()
         else:
-            print("Folder structure to collections mapping is not supported for the selected strategy and/or dependency strategy.")
+            log_warning("Folder structure to collections mapping is not supported for the selected strategy and/or dependency strategy.")
 
         if config.path_to_collection:
-            print("Mapping folder structure to collections...")
+            log_info("Mapping folder structure to collections...")
             config.collections = get_folder_collections(config, assets)
 
         global_collection_name = ""
@@ -77,12 +86,13 @@ class InteractiveAssetCustomizer(AssetCustomizationProvider):
                                                       mandatory_message="Cannot go back here."))
 
             if collection == "":
-                print("Collection name cannot be empty. No collection will be linked to the assets.")
+                log_warning("Collection name cannot be empty. No collection will be linked to the assets.")
                 return ""
 
             collection_creation = uc.models.CollectionCreation(name=collection, parent_path="",
                                                                description=collection)
             uc.assets.create_collection(collection_creation, org_id, project_id)
+            cloud_cache.add_collection(org_id, project_id, "", collection)
 
         if collection == "No collection":
             return ""
@@ -97,40 +107,52 @@ class InteractiveAssetCustomizer(AssetCustomizationProvider):
 
 class HeadlessAssetCustomizer(AssetCustomizationProvider):
     def apply_asset_customization(self, assets: [AssetInfo], config: ProjectUploaderConfig) -> AssetCustomization:
+        return list(self.iter_asset_customization(assets, config))
+
+    def is_barrier(self, config: ProjectUploaderConfig) -> bool:
+        # the folder collections are computed once every asset went through, they are set after the uploads
+        return False
+
+    def iter_asset_customization(self, assets: Iterable[AssetInfo], config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
         asset_customization = AssetCustomization()
         asset_customization.tags = config.tags
 
         if config.strategy == Strategy.UNITY_PACKAGE:
             asset_customization.tags.append(PurePath(config.assets_path).name.replace(".unitypackage", ""))
 
-        for asset in assets:
-            asset.customization.tags = asset_customization.tags
-
         if not supports_folder_to_collections(config):
             config.path_to_collection = False
-            print("Folder structure to collections mapping is not supported for the selected strategy and/or dependency strategy.")
+            log_warning("Folder structure to collections mapping is not supported for the selected strategy and/or dependency strategy.")
 
         if config.path_to_collection:
-            print("Global collection not supported when mapping folder structure to collections.")
+            log_warning("Global collection not supported when mapping folder structure to collections.")
             config.collection = ""
-            print("Mapping folder structure to collections...")
-            config.collections = get_folder_collections(config, assets)
 
+        global_collection = None
         global_collection_name = config.collection
         if global_collection_name != "":
             global_collection = CollectionInfo(PurePosixPath(global_collection_name))
-            for asset in assets:
-                global_collection.add_asset(asset)
             global_collection.exists_in_cloud = check_if_collection_exist_in_cloud(config.org_id, config.project_id, global_collection_name)
             config.collections.append(global_collection)
             config.collection = global_collection_name
 
-        return assets
+        customized_assets = []
+        for asset in assets:
+            asset.customization.tags = asset_customization.tags
+            if global_collection is not None:
+                global_collection.add_asset(asset)
+            if config.path_to_collection:
+                customized_assets.append(asset)
+            yield asset
+
+        if config.path_to_collection:
+            log_info("Mapping folder structure to collections...")
+            config.collections = get_folder_collections(config, customized_assets)
 
 
 class CsvAssetCustomizer(AssetCustomizationProvider):
     def apply_asset_customization(self, assets: [AssetInfo], config: ProjectUploaderConfig) -> AssetCustomization:
-        print("Parsing collections from csv file...")
+        log_info("Parsing collections from csv file...")
         collections = {}
         for asset in assets:
             for asset_collection in asset.customization.collections:
@@ -157,9 +179,15 @@ class DefaultCustomizationProvider(AssetCustomizationProvider):
     def apply_asset_customization(self, assets: [AssetInfo], config: ProjectUploaderConfig) -> AssetCustomization:
         return assets
 
+    def is_barrier(self, config: ProjectUploaderConfig) -> bool:
+        return False
+
+    def iter_asset_customization(self, assets: Iterable[AssetInfo], config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
+        yield from assets
+
 
 def get_cloud_collections(org_id: str, project_id: str):
-    collections = uc.assets.list_collections(org_id, project_id)
+    collections = cloud_cache.list_collections(org_id, project_id)
     collections_choices = []
     for collection in collections:
         if collection.parent_path == "":
@@ -234,22 +262,18 @@ def parse_parent_paths_collections(config, collections: dict, parent_path: PureP
 
 
 def check_if_collections_exists_in_cloud(org_id, project_id, collections: [CollectionInfo]):
-    cloud_collections = uc.assets.list_collections(org_id, project_id)
+    collection_index = cloud_cache.get_collection_index(org_id, project_id)
 
     for collection in collections:
-        name = collection.get_name()
-        parent_path = collection.get_parent()
-
-        if any(cloud_collection.name == name and cloud_collection.parent_path == parent_path for cloud_collection in
-               cloud_collections):
+        if collection_index.contains(collection.get_parent(), collection.get_name()):
             collection.exists_in_cloud = True
 
 
 def check_if_collection_exist_in_cloud(org_id, project_id, collection_path: str) -> bool:
     try:
-        uc.assets.get_collection(org_id, project_id, collection_path)
-        return True
+        return cloud_cache.get_collection_index(org_id, project_id).contains_path(collection_path)
     except Exception as e:
+        log_warning(f"Failed to list the collections of the project: {e}")
         return False
 
 
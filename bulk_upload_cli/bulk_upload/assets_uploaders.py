@@ -1,183 +1,696 @@
+import asyncio
+import functools
 import logging
+import queue
+import threading
 import time
 
+from typing import Iterable
+
 import unity_cloud.assets.asset_reference
 
 from bulk_upload.asset_mappers import *
 from bulk_upload.models import *
+from bulk_upload.content_index import ContentIndex
+from bulk_upload.freeze_poller import FreezePoller
+from bulk_upload.file_upload_scheduler import FileUploadScheduler
+from bulk_upload.upload_ordering import order_assets, order_files
+from bulk_upload.read_scheduler import LocalReadScheduler
+from bulk_upload.async_upload_engine import AsyncUploadEngine
+from bulk_upload.cloud_cache import cloud_cache
+from bulk_upload.concurrency_budget import concurrency_budget
+from bulk_upload.metrics import metrics
+from bulk_upload.tracing import traced
 from concurrent.futures import ThreadPoolExecutor, wait
 from unity_cloud.models import *
+from shared.utils import log_progress
 
 logger = logging.getLogger(__name__)
 
+# share of the project's assets above which listing the whole project is preferred to searching every name
+TARGETED_LOOKUP_MAX_SHARE = 0.1
+
+
+def is_timeout_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, (TimeoutError, ConnectionError)) or "timeout" in message or "timed out" in message
+
 
 class AssetUploader(ABC):
     @abstractmethod
     def upload_assets(self, asset_infos: [AssetInfo], config: ProjectUploaderConfig, app_settings: AppSettings):
         pass
 
+    def upload_assets_streaming(self, assets: Iterable[AssetInfo], config: ProjectUploaderConfig,
+                                app_settings: AppSettings) -> [AssetInfo]:
+        asset_infos = list(assets)
+        self.upload_assets(asset_infos, config, app_settings)
+        return asset_infos
+
 
 class CloudAssetUploader(AssetUploader):
 
     def __init__(self):
         self.config = None
         self.futures = list()
+        self.content_index = ContentIndex()
+        self.freeze_poller = None
+        self.upload_order = UploadOrder.MAPPER
+        self.read_scheduler = None
+        self.cloud_assets_by_name = {}
+        self.cloud_assets_indexed = False
+        self.matched_cloud_assets = {}
+        self.created_asset_ids = set()
+        # ids of the cloud assets listed before the creations, None when the listing failed
+        self.listed_asset_ids = None
+        self.matching_lock = threading.Lock()
 
     def upload_assets(self, asset_infos: [AssetInfo], config: ProjectUploaderConfig, app_settings: AppSettings):
         self.config = config
-
-        cloud_assets = []
-        if config.strategy != Strategy.CLOUD_ASSET:
-            try:
-                cloud_assets = uc.assets.get_asset_list(self.config.org_id, self.config.project_id)
-            except Exception as e:
-                logger.exception(f"Failed to get cloud assets: {e}")
-                logger.warning("====== WARNING ====")
-                logger.warning("Upload will continue, but no update can be made, only creation. /n")
+        self.upload_order = app_settings.upload_order
 
         if asset_infos is None:
             return
 
         if any(collection.exists_in_cloud is False for collection in config.collections):
-            print("Creating collections", flush=True)
+            logger.info("Creating collections")
             self.create_collections(config.collections)
 
-        for asset in asset_infos:
-            for project_asset in cloud_assets:
-                if asset.name == project_asset.name or (
-                        asset.name.lower() == project_asset.name.lower() and not self.config.case_sensitive):
-                    asset.am_id = project_asset.id
-                    asset.version = project_asset.version
-                    asset.already_in_cloud = True
-                    asset.is_frozen_in_cloud = project_asset.is_frozen
-                    cloud_assets.remove(project_asset) # prevent using the same asset again if the names are the same
-                    break
+        self.create_assets(asset_infos, app_settings)
 
-        if config.vcs_integration is not None:
+        # sleep for 12 seconds to allow the asset to be created with their dataset
+        self.wait_for_backend(10)
+
+        if self.config.vcs_integration is None:
+            logger.info("Setting asset dependencies")
+            self.set_asset_references(asset_infos, app_settings)
+
+        # sleep for 10 seconds to allow back-end to finish processing
+        self.wait_for_backend(10)
+        logger.info("Setting collections")
+        self.set_collections(config.collections)
+
+        # sleep for 5 seconds to allow back-end to finish processing
+        self.wait_for_backend(5)
+
+        self.upload_files(asset_infos, app_settings)
+
+        if self.config.vcs_integration is None:
+            self.decorate_assets(asset_infos, app_settings)
+            logger.info(self.content_index.get_summary())
+
+        action = "indexing" if self.config.vcs_integration is not None else "uploading"
+        logger.info(f"Done {action} assets")
+
+    def create_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings):
+        """Matches the assets with the cloud assets, then creates the new ones and new versions of the changed ones."""
+        self.match_assets(asset_infos, app_settings)
+        self.create_matched_assets(asset_infos, app_settings)
+
+    def match_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings):
+        """Looks the assets up in the cloud and detects the changes of the existing ones."""
+        self.match_cloud_assets(asset_infos, self.fetch_cloud_assets(asset_infos, app_settings))
+
+        if self.config.vcs_integration is not None:
             asset_to_remove = [asset for asset in asset_infos if asset.already_in_cloud]
 
             if len(asset_to_remove) > 0:
-                print("Removing assets that already exist to recreate VCS integration", flush=True)
+                logger.info("Removing assets that already exist to recreate VCS integration")
 
-                self.remove_assets(asset_to_remove, config)
+                self.remove_assets(asset_to_remove, self.config)
                 for asset in asset_to_remove:
                     asset.already_in_cloud = False
                     asset.is_frozen_in_cloud = False
                     asset.am_id = None
                     asset.version = None
 
+        if self.config.vcs_integration is None and len(self.matched_cloud_assets) > 0:
+            logger.info("Comparing existing assets with their cloud state")
+            with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
+                for asset, cloud_asset in self.get_matched_assets(asset_infos):
+                    self.futures.append(executor.submit(self.detect_changes, asset, cloud_asset))
+
+            wait(self.futures)
+            self.futures = list()
+            self.log_detected_changes(asset_infos)
+
+    def create_matched_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings):
         with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
-            for asset in asset_infos:
-                if not asset.already_in_cloud:
-                    self.futures.append(executor.submit(self.create_asset, asset))
-                elif config.vcs_integration is None and asset.is_frozen_in_cloud:
-                    self.futures.append(executor.submit(self.create_new_version, asset))
+            for task in self.get_creation_tasks(asset_infos):
+                self.futures.append(executor.submit(task))
 
         wait(self.futures)
         self.futures = list()
+        cloud_cache.invalidate_assets(self.config.org_id, self.config.project_id)
 
-        # sleep for 12 seconds to allow the asset to be created with their dataset
-        time.sleep(10)
+    def fetch_cloud_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings) -> list:
+        if self.config.strategy == Strategy.CLOUD_ASSET:
+            return []
 
-        if self.config.vcs_integration is None:
-            print("Setting asset dependencies", flush=True)
-            with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
+        try:
+            cloud_assets = self.get_cloud_assets(asset_infos, app_settings)
+        except Exception as e:
+            logger.exception(f"Failed to get cloud assets: {e}")
+            logger.warning("====== WARNING ====")
+            logger.warning("Upload will continue, but no update can be made, only creation.")
+            return []
+
+        self.listed_asset_ids = {cloud_asset.id for cloud_asset in cloud_assets}
+        return cloud_assets
+
+    def match_cloud_assets(self, asset_infos: [AssetInfo], cloud_assets: list):
+        self.cloud_assets_by_name = self.get_name_index(cloud_assets)
+        for asset in asset_infos:
+            self.match_cloud_asset(asset)
+
+    def get_matched_assets(self, asset_infos: [AssetInfo]) -> list:
+        return [(asset, self.matched_cloud_assets[asset.am_id]) for asset in asset_infos
+                if asset.already_in_cloud and asset.am_id in self.matched_cloud_assets]
+
+    @staticmethod
+    def log_detected_changes(asset_infos: [AssetInfo]):
+        up_to_date_count = len([asset for asset in asset_infos if asset.is_up_to_date])
+        decorations_only_count = len([asset for asset in asset_infos if asset.already_in_cloud
+                                      and not asset.is_up_to_date and asset.files_up_to_date])
+        logger.info(f"{up_to_date_count} assets are up to date and will be skipped, "
+                    f"{decorations_only_count} assets only need new decorations")
+
+    def get_creation_tasks(self, asset_infos: [AssetInfo]) -> list:
+        """Creations of the new assets and new versions of the changed frozen ones, as calls without arguments."""
+        tasks = []
+        for asset in asset_infos:
+            if not asset.already_in_cloud:
+                tasks.append(functools.partial(self.create_asset, asset))
+            elif self.config.vcs_integration is None and asset.is_frozen_in_cloud and not asset.is_up_to_date:
+                tasks.append(functools.partial(self.create_new_version, asset))
+        return tasks
+
+    @staticmethod
+    def wait_for_backend(seconds: float):
+        """Fixed wait for the backend to process the previous step, skipped by the load test patching time."""
+        time.sleep(seconds)
+
+    def upload_files(self, asset_infos: [AssetInfo], app_settings: AppSettings):
+        self.check_file_update_support()
+
+        if self.config.vcs_integration is not None:
+            with ThreadPoolExecutor(max_workers=app_settings.parallel_asset_upload) as executor:
                 for asset in asset_infos:
-                    self.futures.append(executor.submit(self.set_asset_references, asset, asset_infos))
+                    self.futures.append(executor.submit(self.create_vcs_mappings, asset))
 
-            wait(self.futures)
             self.futures = list()
+            return
 
-        # sleep for 10 seconds to allow back-end to finish processing
-        time.sleep(10)
-        print("Setting collections", flush=True)
-        self.set_collections(config.collections)
+        assets_to_upload = self.prepare_file_uploads(asset_infos)
+        file_scheduler = self.get_file_scheduler(app_settings)
+        file_scheduler.start()
+        self.start_read_scheduler(app_settings)
+        for asset, worker in order_assets(assets_to_upload, self.upload_order, self.content_index.get_file_size,
+                                          file_scheduler.max_workers):
+            file_scheduler.submit_asset(asset, self.get_file_upload_tasks, self.on_asset_files_uploaded, worker)
 
-        # sleep for 5 seconds to allow back-end to finish processing
-        time.sleep(5)
+        file_scheduler.join()
+        self.stop_read_scheduler()
+        logger.info(file_scheduler.get_summary())
 
+    def check_file_update_support(self):
         if self.config.update_files and self.config.strategy == Strategy.CLOUD_ASSET:
             self.config.update_files = False
-            print("File update not supported for cloud assets, skipping file upload", flush=True)
-        with ThreadPoolExecutor(max_workers=app_settings.parallel_asset_upload) as executor:
+            logger.info("File update not supported for cloud assets, skipping file upload")
+
+    def prepare_file_uploads(self, asset_infos: [AssetInfo]) -> [AssetInfo]:
+        """Selects the assets whose files are uploaded and adds them to the content index and the upload totals."""
+        assets_to_upload = [asset for asset in asset_infos if self.must_upload_files(asset)]
+        self.content_index.index_assets(assets_to_upload)
+        self.add_upload_totals(assets_to_upload)
+        return assets_to_upload
+
+    def decorate_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings):
+        logger.info("Setting tags and metadata for assets")
+        self.start_freeze_poller(app_settings)
+        with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
             for asset in asset_infos:
-                if self.config.vcs_integration is not None:
-                    self.futures.append(executor.submit(self.create_vcs_mappings, asset))
-                elif not asset.already_in_cloud or self.config.update_files:
-                    self.futures.append(executor.submit(self.upload_asset_files, asset, app_settings))
+                if not asset.is_up_to_date:
+                    self.futures.append(executor.submit(self.set_asset_decorations, asset))
 
+        wait(self.futures)
         self.futures = list()
+        self.wait_for_freezes()
 
-        if self.config.vcs_integration is None:
-            print("Setting tags and metadata for assets", flush=True)
+    def start_freeze_poller(self, app_settings: AppSettings):
+        self.freeze_poller = FreezePoller(app_settings.parallel_freeze)
+        self.freeze_poller.start()
+
+    def wait_for_freezes(self):
+        self.freeze_poller.wait_for_completion()
+        logger.info(self.freeze_poller.get_summary())
+
+    def upload_assets_streaming(self, assets: Iterable[AssetInfo], config: ProjectUploaderConfig,
+                                app_settings: AppSettings) -> [AssetInfo]:
+        """Uploads the assets while they are produced by the previous steps.
+
+        A producer thread pulls the assets into a bounded queue, so mapping is paused when the upload falls behind.
+        Every asset is created, uploaded and decorated on its own. References and collections need every asset to be
+        created and are set once the stream is exhausted. Assets with references are decorated and frozen after them.
+        The upload order only applies to the files of each asset since assets arrive one at a time.
+        """
+        self.config = config
+        self.upload_order = app_settings.upload_order
+        self.check_file_update_support()
+
+        # the project listing runs while the first assets are being mapped
+        listing_executor = ThreadPoolExecutor(max_workers=1)
+        cloud_assets_future = None
+        if config.strategy != Strategy.CLOUD_ASSET:
+            cloud_assets_future = listing_executor.submit(cloud_cache.get_asset_list, self.config.org_id,
+                                                          self.config.project_id)
+
+        defer_decorations = config.dependency_strategy == DependencyStrategy.ASSET_REFERENCE
+        self.start_freeze_poller(app_settings)
+        # assets waiting for their files hold the consumers, keeping the backpressure up to the mapping
+        file_scheduler = self.get_file_scheduler(app_settings, max_pending_assets=app_settings.streaming_queue_size)
+        file_scheduler.start()
+        self.start_read_scheduler(app_settings)
+
+        asset_queue = queue.Queue(maxsize=app_settings.streaming_queue_size)
+        metrics.register_queue("streaming_assets", asset_queue.qsize)
+        streamed_assets = []
+        producer_errors = []
+        end_of_stream = object()
+
+        consumers = []
+
+        def put(item) -> bool:
+            """Waits for room in the queue as long as a consumer is left to take the item."""
+            while True:
+                try:
+                    asset_queue.put(item, timeout=1.0)
+                    return True
+                except queue.Full:
+                    if all(consumer.done() for consumer in consumers):
+                        return False
+
+        def produce():
+            try:
+                for streamed_asset in assets:
+                    streamed_assets.append(streamed_asset)
+                    if not put(streamed_asset):
+                        raise RuntimeError("Every upload worker stopped, the stream of assets is interrupted")
+            except Exception as e:
+                producer_errors.append(e)
+            finally:
+                for _ in range(app_settings.parallel_asset_upload):
+                    if not put(end_of_stream):
+                        break
+
+        def consume():
+            while True:
+                streamed_asset = asset_queue.get()
+                if streamed_asset is end_of_stream:
+                    return
+                if cloud_assets_future is not None:
+                    self.index_streamed_cloud_assets(cloud_assets_future)
+                self.upload_streamed_asset(streamed_asset, defer_decorations, file_scheduler)
+
+        producer = threading.Thread(target=produce, name="asset-producer", daemon=True)
+        with ThreadPoolExecutor(max_workers=app_settings.parallel_asset_upload) as executor:
+            consumers.extend(executor.submit(consume) for _ in range(app_settings.parallel_asset_upload))
+            producer.start()
+        producer.join()
+        metrics.unregister_queue("streaming_assets", asset_queue.qsize)
+        file_scheduler.join()
+        self.stop_read_scheduler()
+        listing_executor.shutdown(wait=False)
+
+        for consumer in consumers:
+            if consumer.exception() is not None:
+                raise consumer.exception()
+        if len(producer_errors) > 0:
+            raise producer_errors[0]
+
+        logger.info(f"Streamed {len(streamed_assets)} assets")
+        logger.info(file_scheduler.get_summary())
+        cloud_assets_future = None
+        cloud_cache.invalidate_assets(self.config.org_id, self.config.project_id)
+
+        # barrier: every asset must exist before setting references and collections
+        if any(len(asset.dependencies) > 0 for asset in streamed_assets):
+            logger.info("Setting asset dependencies")
+            self.set_asset_references(streamed_assets, app_settings)
+
+        if any(collection.exists_in_cloud is False for collection in config.collections):
+            logger.info("Creating collections")
+            self.create_collections(config.collections)
+        logger.info("Setting collections")
+        self.set_collections(config.collections)
+
+        if defer_decorations:
+            logger.info("Setting tags and metadata for assets")
             with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
-                for asset in asset_infos:
-                    self.futures.append(executor.submit(self.set_asset_decorations, asset))
+                for asset in streamed_assets:
+                    if not asset.is_up_to_date and asset.am_id:
+                        self.futures.append(executor.submit(self.set_asset_decorations, asset))
 
             wait(self.futures)
+            self.futures = list()
 
-        action = "indexing" if self.config.vcs_integration is not None else "uploading"
-        print(f"Done {action} assets")
+        self.wait_for_freezes()
+        logger.info(self.content_index.get_summary())
+        logger.info("Done uploading assets")
+
+        return streamed_assets
+
+    def index_streamed_cloud_assets(self, cloud_assets_future):
+        with self.matching_lock:
+            if self.cloud_assets_indexed:
+                return
+            try:
+                cloud_assets = cloud_assets_future.result()
+                self.listed_asset_ids = {cloud_asset.id for cloud_asset in cloud_assets}
+            except Exception as e:
+                logger.exception(f"Failed to get cloud assets: {e}")
+                logger.warning("Upload will continue, but no update can be made, only creation.")
+                cloud_assets = []
+            self.cloud_assets_by_name = self.get_name_index(cloud_assets)
+            self.cloud_assets_indexed = True
+
+    def upload_streamed_asset(self, asset: AssetInfo, defer_decorations: bool, file_scheduler: FileUploadScheduler):
+        project_asset = self.match_cloud_asset(asset)
+        if project_asset is not None:
+            self.detect_changes(asset, project_asset)
+
+        if not asset.already_in_cloud:
+            self.create_asset(asset)
+        elif asset.is_frozen_in_cloud and not asset.is_up_to_date:
+            self.create_new_version(asset)
+
+        if asset.am_id is None or asset.am_id == "":
+            return
+
+        decorate = not defer_decorations and not asset.is_up_to_date
+        if self.must_upload_files(asset):
+            self.content_index.index_assets([asset])
+            self.add_upload_totals([asset])
+            on_complete = self.on_streamed_asset_files_uploaded if decorate else self.on_asset_files_uploaded
+            file_scheduler.submit_asset(asset, self.get_file_upload_tasks, on_complete)
+        elif decorate:
+            self.set_asset_decorations(asset)
+
+    def add_upload_totals(self, assets: [AssetInfo]):
+        """Totals of the progress display, the content index knows the size of the files once it indexed them."""
+        files = [file for asset in assets for file in asset.files]
+        metrics.increment("assets_to_upload", len(assets))
+        metrics.increment("files_to_upload", len(files))
+        metrics.increment("bytes_to_upload", sum(self.content_index.get_file_size(file) for file in files))
+
+    def on_streamed_asset_files_uploaded(self, asset: AssetInfo, errors: list):
+        self.on_asset_files_uploaded(asset, errors)
+        self.set_asset_decorations(asset)
+
+    def get_name_index(self, cloud_assets: list) -> dict:
+        cloud_assets_by_name = {}
+        for project_asset in cloud_assets:
+            cloud_assets_by_name.setdefault(self.get_name_key(project_asset.name), []).append(project_asset)
+        return cloud_assets_by_name
+
+    def match_cloud_asset(self, asset: AssetInfo):
+        with self.matching_lock:
+            candidates = self.cloud_assets_by_name.get(self.get_name_key(asset.name))
+            if not candidates:
+                return None
+            # prevent using the same asset again if the names are the same
+            project_asset = candidates.pop(0)
+            asset.am_id = project_asset.id
+            asset.version = project_asset.version
+            asset.already_in_cloud = True
+            asset.is_frozen_in_cloud = project_asset.is_frozen
+            self.matched_cloud_assets[asset.am_id] = project_asset
+            return project_asset
+
+    def get_cloud_assets(self, asset_infos: [AssetInfo], app_settings: AppSettings) -> list:
+        """Lists the whole project for large uploads, otherwise only searches the names being uploaded.
+
+        The SDK lists a project in a single call, its size is only known once listed: a listing still cached, or the
+        size of the project at its last listing, decide between the two before the absolute targetedLookupMaxAssets.
+        """
+        cached_assets = cloud_cache.get_cached_asset_list(self.config.org_id, self.config.project_id)
+        if cached_assets is not None:
+            return cached_assets
+
+        names = list({self.get_name_key(asset.name): asset.name for asset in asset_infos}.values())
+        project_size = cloud_cache.get_known_asset_count(self.config.org_id, self.config.project_id)
+        if len(names) > app_settings.targeted_lookup_max_assets \
+                or (project_size is not None and len(names) > project_size * TARGETED_LOOKUP_MAX_SHARE):
+            return cloud_cache.get_asset_list(self.config.org_id, self.config.project_id)
+
+        logger.info(f"Looking up {len(names)} asset names in the cloud")
+        try:
+            cloud_assets = {}
+            # the searches run in parallel, on as many workers as the creations
+            with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
+                for name, found_assets in zip(names, executor.map(self.search_assets_by_name, names)):
+                    for found_asset in found_assets:
+                        # the search is not an exact match
+                        if self.get_name_key(found_asset.name) == self.get_name_key(name):
+                            cloud_assets[found_asset.id] = found_asset
+            return list(cloud_assets.values())
+        except Exception as e:
+            logger.error(f"Failed to search assets by name, listing the whole project instead: {e}")
+            return cloud_cache.get_asset_list(self.config.org_id, self.config.project_id)
+
+    def search_assets_by_name(self, name: str) -> list:
+        with concurrency_budget.slot():
+            return uc.assets.search_assets_in_projects(org_id=self.config.org_id,
+                                                       project_ids=[self.config.project_id],
+                                                       include_filter={SearchableProperties.NAME: name},
+                                                       collections=[])
+
+    def get_name_key(self, name: str) -> str:
+        return name if self.config.case_sensitive else name.lower()
 
     def validate_config(self):
-        print("Validating configuration..", flush=True)
-        metadata_keys = uc.assets.list_field_definitions(self.config.org_id, self.config.project_id)
+        logger.info("Validating configuration..")
+        metadata_keys = cloud_cache.list_field_definitions(self.config.org_id, self.config.project_id)
         for key in self.config.metadata.keys():
             if key not in metadata_keys:
-                print("Key: " + key + " is not a valid metadata key. It will be ignored.")
+                logger.warning(f"Key: {key} is not a valid metadata key. It will be ignored.")
                 self.config.metadata.pop(key)
 
+    @traced("asset")
     def create_asset(self, asset: AssetInfo):
+        asset_type = AssetType.OTHER if len(asset.files) == 0 else self.get_asset_type(asset.files[0].cloud_path)
+        # decorations known at creation time are sent with the creation to save the update call
+        decorations = self.get_decorations(asset)
+        log_progress("asset creations", f"Creating asset: {asset.name}", asset=asset.name)
+        try:
+            self.send_asset_creation(asset, AssetCreation(name=asset.name, type=asset_type, **decorations))
+            asset.cloud_customization_signature = asset.customization.get_signature()
+            return
+        except Exception as e:
+            error = e
+
+        # a timeout says nothing about the decorations, other errors come from validating them
+        with_decorations = is_timeout_error(error)
+        if with_decorations:
+            # the creation may have been done by the server after the client gave up
+            try:
+                if self.match_created_asset(asset):
+                    logger.warning(f"Asset created despite the timeout of its creation: {asset.name}: {error}")
+                    return
+            except Exception as e:
+                logger.error(f"Creation of asset timed out: {asset.name}: {error}, and checking whether it exists "
+                             f"failed: {e}")
+                return
+
+            logger.error(f"Creation of asset timed out: {asset.name}, retrying: {error}")
+        elif len(decorations) > 0:
+            logger.error(f"Failed to create asset with its decorations: {asset.name}, retrying without them: {error}")
+        else:
+            logger.error(f"Failed to create asset: {asset.name}: {error}")
+            return
+
+        metrics.increment("retries")
         try:
-            print(f"Creating asset: {asset.name}", flush=True)
-            asset_creation = AssetCreation(name=asset.name,
-                                           type=AssetType.OTHER if len(asset.files) == 0 else self.get_asset_type(
-                                               asset.files[0].cloud_path))
+            self.send_asset_creation(asset, AssetCreation(name=asset.name, type=asset_type,
+                                                          **(decorations if with_decorations else {})))
+            if with_decorations:
+                asset.cloud_customization_signature = asset.customization.get_signature()
+        except Exception as e:
+            logger.error(f"Failed to create asset: {asset.name}: {e}")
+
+    def send_asset_creation(self, asset: AssetInfo, asset_creation: AssetCreation):
+        with concurrency_budget.slot():
             created_asset = uc.assets.create_asset(asset_creation, self.config.org_id, self.config.project_id)
-            asset.am_id = created_asset.id
-            asset.version = created_asset.version
+        asset.am_id = created_asset.id
+        asset.version = created_asset.version
+        with self.matching_lock:
+            self.created_asset_ids.add(asset.am_id)
+        metrics.increment("assets_created")
+
+    def match_created_asset(self, asset: AssetInfo) -> bool:
+        """Looks the asset up by name, its decorations are set by the update of the decoration step when found.
+
+        Only an asset absent from the listing made before the creations can be the one created by the run. Without
+        that listing, or when the found asset is already frozen, it may be an unrelated asset and is left alone.
+        """
+        if self.listed_asset_ids is None:
+            return False
+
+        found_assets = self.search_assets_by_name(asset.name)
+        with self.matching_lock:
+            for found_asset in found_assets:
+                # the search is not an exact match, and assets of the same name may already be used by other assets
+                if self.get_name_key(found_asset.name) != self.get_name_key(asset.name) \
+                        or found_asset.id in self.listed_asset_ids or found_asset.is_frozen \
+                        or found_asset.id in self.matched_cloud_assets or found_asset.id in self.created_asset_ids:
+                    continue
+                asset.am_id = found_asset.id
+                asset.version = found_asset.version
+                self.created_asset_ids.add(asset.am_id)
+                return True
+        return False
+
+    @staticmethod
+    def get_decorations(asset: AssetInfo) -> dict:
+        decorations = {}
+        if len(asset.customization.tags) > 0:
+            decorations["tags"] = asset.customization.tags
+
+        if len(asset.customization.metadata) > 0:
+            decorations["metadata"] = {metadata_field.field_definition: metadata_field.field_value
+                                       for metadata_field in asset.customization.metadata}
+
+        if asset.customization.description is not None and asset.customization.description != "":
+            decorations["description"] = asset.customization.description
+
+        return decorations
+
+    def must_upload_files(self, asset: AssetInfo) -> bool:
+        return not asset.already_in_cloud or (self.config.update_files and not asset.files_up_to_date)
+
+    @traced("asset")
+    def detect_changes(self, asset: AssetInfo, cloud_asset):
+        """Compares the desired decorations of an existing asset with its cloud state.
+
+        Assets whose decorations are already applied don't get updated. Frozen assets without any difference are skipped
+        entirely, unless their files are updated.
+        """
+        try:
+            cloud_customization = AssetCustomization()
+            cloud_customization.tags = list(cloud_asset.tags) if cloud_asset.tags is not None else []
+            # the description is not part of the asset listing of the SDK, a description to set is always sent
+            cloud_customization.description = None
+            cloud_metadata = uc.assets.get_asset_metadata(self.config.org_id, self.config.project_id, asset.am_id,
+                                                          asset.version)
+            for metadata_key, metadata_value in cloud_metadata.items():
+                metadata = Metadata()
+                metadata.field_definition = metadata_key
+                metadata.field_value = metadata_value
+                cloud_customization.metadata.append(metadata)
+
+            decorations_applied = asset.customization.is_applied_to(cloud_customization)
+            if decorations_applied:
+                asset.cloud_customization_signature = asset.customization.get_signature()
+
+            # the SDK gives no content hash of the cloud files, they are always uploaded again when updating files
+            asset.files_up_to_date = not self.config.update_files
+            asset.is_up_to_date = asset.is_frozen_in_cloud and decorations_applied and asset.files_up_to_date
 
         except Exception as e:
-            print(f'Failed to create asset: {asset.name}', flush=True)
-            print(e, flush=True)
+            logger.error(f"Failed to compare asset with its cloud state: {asset.name}: {e}")
+            asset.files_up_to_date = False
+            asset.is_up_to_date = False
 
+    @traced("asset")
     def create_new_version(self, asset: AssetInfo):
         try:
-            print(f"Creating new version for asset: {asset.name}", flush=True)
+            log_progress("new versions", f"Creating new version for asset: {asset.name}", asset=asset.name)
             new_version = uc.assets.create_unfrozen_asset_version(self.config.org_id, self.config.project_id,
                                                                   asset.am_id, asset.version)
             asset.version = new_version.version
+            metrics.increment("versions_created")
         except Exception as e:
-            print(f'Failed to create new version for asset: {asset.name}', flush=True)
-            print(e, flush=True)
-
-    def upload_asset_files(self, asset: AssetInfo, app_settings: AppSettings):
-        try:
-
-            dataset_id = \
-            uc.assets.get_dataset_list(self.config.org_id, self.config.project_id, asset.am_id, asset.version)[0].id
+            logger.error(f"Failed to create new version for asset: {asset.name}: {e}")
 
-            if self.config.update_files:
-                self.delete_existing_files(asset, dataset_id)
+    @staticmethod
+    def get_file_scheduler(app_settings: AppSettings, max_pending_assets: int = 0) -> FileUploadScheduler:
+        # the files of every asset share the budget the nested pools had at most
+        max_workers = app_settings.parallel_asset_upload * app_settings.parallel_file_upload_per_asset
+        return FileUploadScheduler(max_workers, max_pending_assets)
 
-            print(f"Uploading files for asset: {asset.name}", flush=True)
-            files_upload_futures = []
-            with ThreadPoolExecutor(max_workers=app_settings.parallel_file_upload_per_asset) as executor:
-                for file in asset.files:
-                    files_upload_futures.append(executor.submit(self.upload_file, asset, dataset_id, file))
+    def start_read_scheduler(self, app_settings: AppSettings):
+        if not app_settings.locality_aware_reads or self.config.strategy == Strategy.CLOUD_ASSET:
+            return
 
-                if asset.preview_files is not None and len(asset.preview_files) > 0:
-                    files_upload_futures.append(executor.submit(self.upload_preview_files, asset))
+        self.read_scheduler = LocalReadScheduler(app_settings.max_reads_per_device,
+                                                 app_settings.prefetch_buffer_size * 1024 ** 2,
+                                                 workers=2 * app_settings.max_reads_per_device)
+        self.read_scheduler.start()
 
-            wait(files_upload_futures)
+    def stop_read_scheduler(self):
+        if self.read_scheduler is None:
+            return
 
-        except Exception as e:
-            print(f'Failed to upload files for asset: {asset.name}', flush=True)
-            logger.exception(e)
+        self.read_scheduler.stop()
+        logger.info(self.read_scheduler.get_summary())
+        self.read_scheduler = None
 
+    @traced("asset")
+    def get_file_upload_tasks(self, asset: AssetInfo) -> list:
+        try:
+            dataset_id = self.get_dataset_id(asset)
+        except Exception:
+            # none of the files of the asset gets uploaded
+            metrics.increment("files_failed", len(asset.files))
+            metrics.increment("bytes_failed", sum(self.content_index.get_file_size(file) for file in asset.files))
+            raise
+
+        if self.config.update_files:
+            self.delete_existing_files(asset, dataset_id)
+
+        log_progress("assets uploading files", f"Uploading files for asset: {asset.name}", asset=asset.name)
+        unique_files = self.content_index.get_unique_files(asset)
+        if len(unique_files) < len(asset.files):
+            # the duplicates are part of the totals of the progress display
+            unique_ids = {id(file) for file in unique_files}
+            duplicates = [file for file in asset.files if id(file) not in unique_ids]
+            metrics.increment("files_deduplicated", len(duplicates))
+            metrics.increment("bytes_deduplicated", sum(self.content_index.get_file_size(file) for file in duplicates))
+        files = order_files(unique_files, self.upload_order, self.content_index.get_file_size)
+        if self.read_scheduler is not None:
+            self.read_scheduler.prefetch(files)
+        tasks = [functools.partial(self.upload_file, asset, dataset_id, file) for file in files]
+
+        if asset.preview_files is not None and len(asset.preview_files) > 0:
+            tasks.append(functools.partial(self.upload_preview_files, asset))
+
+        return tasks
+
+    @staticmethod
+    def on_asset_files_uploaded(asset: AssetInfo, errors: list):
+        metrics.increment("assets_uploaded")
+        if len(errors) > 0:
+            logger.error(f"Failed to upload files for asset: {asset.name}")
+            for error in errors:
+                logger.error(error, exc_info=error)
+
+    def get_dataset_id(self, asset: AssetInfo, attempts: int = 5, delay: float = 2) -> str:
+        # the dataset of a version created a moment ago might not be listed yet
+        for attempt in range(attempts):
+            datasets = cloud_cache.get_dataset_list(self.config.org_id, self.config.project_id, asset.am_id,
+                                                    asset.version)
+            if len(datasets) > 0:
+                return datasets[0].id
+            if attempt < attempts - 1:
+                metrics.increment("retries")
+                time.sleep(delay)
+
+        raise Exception(f"No dataset found for asset: {asset.name}")
+
+    @traced("asset")
     def create_vcs_mappings(self, asset: AssetInfo):
         import unity_cloud.assets
-        print("Creating VCS mappings for asset: " + asset.name, flush=True)
+        log_progress("VCS mappings", f"Creating VCS mappings for asset: {asset.name}", asset=asset.name)
         try:
             self.set_asset_decorations(asset, skip_freeze=True)
 
@@ -192,9 +705,8 @@ class CloudAssetUploader(AssetUploader):
 
             uc.assets.create_vcs_mapping(vcs_mapping_creation, self.config.project_id)
 
-        except Exception as e:
-            print(f'Failed to create VCS mapping for asset: {asset.name}', flush=True)
-            logger.exception(e)
+        except Exception:
+            logger.exception(f"Failed to create VCS mapping for asset: {asset.name}")
 
     def delete_existing_files(self, asset: AssetInfo, dataset_id: str):
         file_list = uc.assets.get_file_list(self.config.org_id, self.config.project_id, asset.am_id, asset.version,
@@ -203,6 +715,7 @@ class CloudAssetUploader(AssetUploader):
             uc.assets.remove_file(self.config.org_id, self.config.project_id, asset.am_id, asset.version, dataset_id,
                                   file.path)
 
+    @traced("file")
     def upload_file(self, asset: AssetInfo, dataset_id: str, file: FileInfo):
         try:
             if not self.config.update_files:
@@ -215,24 +728,37 @@ class CloudAssetUploader(AssetUploader):
                     pass
 
                 if file_in_cloud is not None:
-                    print(f"File already in cloud: {file.cloud_path}", flush=True)
+                    log_progress("files already in cloud", f"File already in cloud: {file.cloud_path}",
+                                 asset=asset.name, file=str(file.cloud_path))
+                    metrics.increment("files_skipped")
+                    metrics.increment("bytes_skipped", self.content_index.get_file_size(file))
                     return
 
             file_upload = FileUploadInformation(organization_id=self.config.org_id, project_id=self.config.project_id,
                                                 asset_id=asset.am_id, asset_version=asset.version,
                                                 dataset_id=dataset_id,
                                                 upload_file_path=file.path, cloud_file_path=file.cloud_path)
-            uc.assets.upload_file(file_upload, disable_automatic_transformations=False)
-
-        except Exception as e:
-            print(f'Failed to upload file: {file.path}', flush=True)
-            logger.exception(e)
-
+            with concurrency_budget.slot():
+                uc.assets.upload_file(file_upload, disable_automatic_transformations=False)
+            log_progress("files uploaded", f"File uploaded: {file.cloud_path}", asset=asset.name,
+                         file=str(file.cloud_path))
+            metrics.increment("files_uploaded")
+            metrics.increment("bytes_uploaded", self.content_index.get_file_size(file))
+
+        except Exception:
+            logger.exception(f"Failed to upload file: {file.path}")
+            metrics.increment("files_failed")
+            metrics.increment("bytes_failed", self.content_index.get_file_size(file))
+        finally:
+            if self.read_scheduler is not None:
+                self.read_scheduler.release(file)
+
+    @traced("file")
     def upload_preview_files(self, asset: AssetInfo):
         try:
-            print(f"Uploading preview files for asset: {asset.name}", flush=True)
-            datasets = uc.assets.get_dataset_list(self.config.org_id, self.config.project_id, asset.am_id,
-                                                  asset.version)
+            log_progress("preview uploads", f"Uploading preview files for asset: {asset.name}", asset=asset.name)
+            datasets = cloud_cache.get_dataset_list(self.config.org_id, self.config.project_id, asset.am_id,
+                                                    asset.version)
             preview_dataset = next((dataset for dataset in datasets if dataset.name == "Preview"), None)
 
             for preview_file in asset.preview_files:
@@ -243,67 +769,125 @@ class CloudAssetUploader(AssetUploader):
                                                             upload_file_path=preview_file.path,
                                                             cloud_file_path=preview_file.cloud_path)
 
-                uc.assets.upload_file(preview_file_upload, disable_automatic_transformations=True)
+                with concurrency_budget.slot():
+                    uc.assets.upload_file(preview_file_upload, disable_automatic_transformations=True)
 
-        except Exception as e:
-            print(f'Failed to upload preview file for asset: {asset.name}', flush=True)
-            logger.exception(e)
+        except Exception:
+            logger.exception(f"Failed to upload preview file for asset: {asset.name}")
 
-    def set_asset_references(self, asset: AssetInfo, assets: [AssetInfo]):
-        try:
+    def set_asset_references(self, asset_infos: [AssetInfo], app_settings: AppSettings):
+        self.add_reference_edges(self.get_reference_edges(asset_infos), app_settings)
+
+    def add_reference_edges(self, edges: [(AssetInfo, AssetInfo)], app_settings: AppSettings):
+        if len(edges) == 0:
+            return
+
+        # the SDK can't list the references of an asset, the edges of existing assets are added again
+        logger.info(f"Adding {len(edges)} asset references")
+
+        with ThreadPoolExecutor(max_workers=app_settings.parallel_creation_edit) as executor:
+            for source, target in edges:
+                self.futures.append(executor.submit(self.add_asset_reference, source, target))
+
+        wait(self.futures)
+        self.futures = list()
+
+    @staticmethod
+    def get_reference_edges(asset_infos: [AssetInfo]) -> [(AssetInfo, AssetInfo)]:
+        edges = {}
+        for asset in asset_infos:
+            if asset.am_id is None or asset.am_id == "":
+                continue
             for dependence_index in asset.dependencies:
-                asset_referenced = assets[dependence_index]
+                asset_referenced = asset_infos[dependence_index]
+                if asset_referenced.am_id is None or asset_referenced.am_id == "" \
+                        or asset_referenced.am_id == asset.am_id:
+                    continue
+                edges.setdefault((asset.am_id, asset_referenced.am_id), (asset, asset_referenced))
+        return list(edges.values())
+
+    @traced("asset")
+    def add_asset_reference(self, asset: AssetInfo, asset_referenced: AssetInfo):
+        try:
+            with concurrency_budget.slot():
                 unity_cloud.assets.add_asset_reference(self.config.org_id, self.config.project_id, asset.am_id,
                                                        asset.version,
                                                        target_asset_id=asset_referenced.am_id,
                                                        target_asset_version=asset_referenced.version)
 
-        except Exception as e:
-            print(f'Failed to set references for asset: {asset.name}', flush=True)
-            logger.exception(e)
+        except Exception:
+            logger.exception(f"Failed to set reference from asset: {asset.name} to asset: {asset_referenced.name}")
 
+    @traced("asset")
     def set_asset_decorations(self, asset: AssetInfo, skip_freeze: bool = False):
-        asset_update = AssetUpdate(name=asset.name)
-
-        if len(asset.customization.tags) > 0:
-            asset_update.tags = asset.customization.tags
-
-        if len(asset.customization.metadata) > 0:
-            for metadata_field in asset.customization.metadata:
-                asset_update.metadata[metadata_field.field_definition] = metadata_field.field_value
-
-        if asset.customization.description is not None and asset.customization.description != "":
-            print(asset.customization.description)
-            asset_update.description = asset.customization.description
+        needs_audio_preview = len(asset.preview_files) == 0 and asset.is_audio_asset()
+        decorations_changed = asset.cloud_customization_signature != asset.customization.get_signature()
 
-        if len(asset.preview_files) == 0 and asset.is_audio_asset():
+        # the decorations sent at creation are not sent again, the update is skipped when there is nothing to change
+        asset_update = None
+        if needs_audio_preview:
             asset_update = AssetUpdate(name=asset.name, preview_file=asset.files[0].cloud_path)
-
-        try:
-            uc.assets.update_asset(asset_update, self.config.org_id, self.config.project_id, asset.am_id, asset.version)
-        except Exception as e:
-            print(f'Failed to update asset: {asset.name}', flush=True)
-            print(e, flush=True)
+        elif decorations_changed:
+            asset_update = AssetUpdate(name=asset.name)
+
+        if asset_update is not None and decorations_changed:
+            decorations = self.get_decorations(asset)
+            if "tags" in decorations:
+                asset_update.tags = decorations["tags"]
+            if "metadata" in decorations:
+                asset_update.metadata.update(decorations["metadata"])
+            if "description" in decorations:
+                asset_update.description = decorations["description"]
+
+        if asset_update is not None:
+            try:
+                with concurrency_budget.slot():
+                    uc.assets.update_asset(asset_update, self.config.org_id, self.config.project_id, asset.am_id,
+                                           asset.version)
+                asset.cloud_customization_signature = asset.customization.get_signature()
+            except Exception as e:
+                logger.error(f"Failed to update asset: {asset.name}: {e}")
 
         if not skip_freeze:
-            uc.assets.freeze_asset_version(self.config.org_id, self.config.project_id, asset.am_id, asset.version,
-                                           "new version", uc.models.FreezeType.WAIT_ON_TRANSFORMATION)
+            self.freeze_poller.request_freeze(asset, self.freeze_asset)
+
+    @traced("asset")
+    def freeze_asset(self, asset: AssetInfo):
+        uc.assets.freeze_asset_version(self.config.org_id, self.config.project_id, asset.am_id, asset.version,
+                                       "new version", uc.models.FreezeType.WAIT_ON_TRANSFORMATION)
 
     def create_collections(self, collections: [CollectionInfo]):
         for collection in collections:
             try:
+                collection_index = cloud_cache.get_collection_index(self.config.org_id, self.config.project_id)
+                if collection_index.contains(collection.get_parent(), collection.get_name()):
+                    collection.exists_in_cloud = True
+
                 if not collection.exists_in_cloud:
                     collection_creation = CollectionCreation(name=collection.get_name(),
                                                              parent_path=collection.get_parent(),
                                                              description=collection.get_name())
                     uc.assets.create_collection(collection_creation, self.config.org_id, self.config.project_id)
+                    cloud_cache.add_collection(self.config.org_id, self.config.project_id, collection.get_parent(),
+                                               collection.get_name())
                     # wait for the collection to be created since this can cause unauthorized errors if the collection is not ready
                     time.sleep(0.5)
                     collection.exists_in_cloud = True
 
             except Exception as e:
-                print(f'Failed to create collection: {collection.path.__str__()}', flush=True)
-                print(e, flush=True)
+                # another run, such as another shard, may have created it in the meantime
+                if self.is_collection_in_cloud(collection):
+                    collection.exists_in_cloud = True
+                    continue
+                logger.error(f"Failed to create collection: {collection.path.__str__()}: {e}")
+
+    def is_collection_in_cloud(self, collection: CollectionInfo) -> bool:
+        try:
+            cloud_cache.reset_collection_index(self.config.org_id, self.config.project_id)
+            collection_index = cloud_cache.get_collection_index(self.config.org_id, self.config.project_id)
+            return collection_index.contains(collection.get_parent(), collection.get_name())
+        except Exception:
+            return False
 
     def set_collections(self, collections: [CollectionInfo]):
         for collection in collections:
@@ -313,8 +897,7 @@ class CloudAssetUploader(AssetUploader):
                                                         collection.path.__str__(),
                                                         [asset.am_id for asset in collection.assets])
             except Exception as e:
-                print(f'Failed to set assets to collection : {collection.path.__str__()}', flush=True)
-                print(e, flush=True)
+                logger.error(f"Failed to set assets to collection : {collection.path.__str__()}: {e}")
 
     def get_asset_type(self, cloud_path: PurePosixPath) -> AssetType:
         suffix = cloud_path.suffix.lower()
@@ -347,9 +930,97 @@ class CloudAssetUploader(AssetUploader):
 
             for chunk in assets_chunks:
                 uc.assets.unlink_assets_from_project(config.org_id, config.project_id, [asset.am_id for asset in chunk])
+            cloud_cache.invalidate_assets(config.org_id, config.project_id)
+        except Exception:
+            logger.exception("Failed to remove assets")
+
+
+class AsyncCloudAssetUploader(CloudAssetUploader):
+    """Same steps as CloudAssetUploader, driven by an asyncio event loop instead of a thread pool per step.
+
+    Indexing with VCS integration and streaming runs keep the thread based implementation.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.engine = None
+
+    def upload_assets(self, asset_infos: [AssetInfo], config: ProjectUploaderConfig, app_settings: AppSettings):
+        if config.vcs_integration is not None:
+            super().upload_assets(asset_infos, config, app_settings)
+            return
+
+        self.engine = AsyncUploadEngine(app_settings.async_executor_size, {
+            "edit": app_settings.parallel_creation_edit,
+            "upload": app_settings.parallel_asset_upload * app_settings.parallel_file_upload_per_asset,
+        })
+        self.engine.run(self.upload_assets_async(asset_infos, config, app_settings))
+        logger.info(self.engine.get_summary())
+
+    async def upload_assets_async(self, asset_infos: [AssetInfo], config: ProjectUploaderConfig,
+                                  app_settings: AppSettings):
+        self.config = config
+        self.upload_order = app_settings.upload_order
+
+        if asset_infos is None:
+            return
+
+        cloud_assets = await self.engine.call("edit", self.fetch_cloud_assets, asset_infos, app_settings)
+
+        if any(collection.exists_in_cloud is False for collection in config.collections):
+            logger.info("Creating collections")
+            await self.engine.call("edit", self.create_collections, config.collections)
+
+        self.match_cloud_assets(asset_infos, cloud_assets)
+        if len(self.matched_cloud_assets) > 0:
+            logger.info("Comparing existing assets with their cloud state")
+            await self.engine.map("edit", self.detect_changes, self.get_matched_assets(asset_infos))
+            self.log_detected_changes(asset_infos)
+
+        await self.engine.run_all("edit", self.get_creation_tasks(asset_infos))
+        cloud_cache.invalidate_assets(self.config.org_id, self.config.project_id)
+
+        # wait for the assets to be created with their dataset
+        await self.wait_for_backend_async(10)
+
+        logger.info("Setting asset dependencies")
+        await self.engine.map("edit", self.add_asset_reference, self.get_reference_edges(asset_infos))
+
+        # wait for the back-end to finish processing
+        await self.wait_for_backend_async(10)
+        logger.info("Setting collections")
+        await self.engine.call("edit", self.set_collections, config.collections)
+        await self.wait_for_backend_async(5)
+
+        self.check_file_update_support()
+        assets_to_upload = self.prepare_file_uploads(asset_infos)
+        self.start_read_scheduler(app_settings)
+        await asyncio.gather(*(self.upload_asset_files_async(asset) for asset, _ in
+                               order_assets(assets_to_upload, self.upload_order, self.content_index.get_file_size,
+                                            self.engine.limits["upload"])))
+        self.stop_read_scheduler()
+
+        logger.info("Setting tags and metadata for assets")
+        self.start_freeze_poller(app_settings)
+        await self.engine.map("edit", self.set_asset_decorations, [(asset,) for asset in asset_infos
+                                                                   if not asset.is_up_to_date])
+        await asyncio.get_running_loop().run_in_executor(None, self.wait_for_freezes)
+        logger.info(self.content_index.get_summary())
+        logger.info("Done uploading assets")
+
+    async def wait_for_backend_async(self, seconds: float):
+        # the wait goes through the same patchable time module as the thread based steps
+        await asyncio.get_running_loop().run_in_executor(None, self.wait_for_backend, seconds)
+
+    async def upload_asset_files_async(self, asset: AssetInfo):
+        try:
+            tasks = await self.engine.call("edit", self.get_file_upload_tasks, asset)
         except Exception as e:
-            print(f'Failed to remove assets', flush=True)
-            logger.exception(e)
+            self.on_asset_files_uploaded(asset, [e])
+            return
+
+        results = await asyncio.gather(*(self.engine.call("upload", task) for task in tasks), return_exceptions=True)
+        self.on_asset_files_uploaded(asset, [result for result in results if isinstance(result, Exception)])
 
 
 if __name__ == '__main__':
@@ -358,4 +1029,4 @@ if __name__ == '__main__':
         config.load_from_json(json.load(f))
 
     uploader = AssetUploader()
-    uploader.run(config)
\ No newline at end of file
+    uploader.run(config)
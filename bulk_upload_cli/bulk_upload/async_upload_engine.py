@@ -0,0 +1,58 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncUploadEngine(object):
+    """Runs the calls of the upload stage as coroutines on a single event loop.
+
+    Every class of operation (creation and edition, file upload, ...) has its own semaphore so that a slow class
+    doesn't hold the slots of the others. The SDK calls are blocking, they run on a bounded executor whose size caps
+    the number of threads regardless of the number of operations in flight.
+    """
+
+    def __init__(self, executor_size: int, limits: dict):
+        self.executor_size = max(1, executor_size)
+        self.limits = limits
+        self.semaphores = {}
+        self.executor = None
+        self.calls = {operation: 0 for operation in limits}
+        self.in_flight = {operation: 0 for operation in limits}
+        self.max_in_flight = {operation: 0 for operation in limits}
+
+    def run(self, coroutine):
+        with ThreadPoolExecutor(max_workers=self.executor_size, thread_name_prefix="async-upload") as executor:
+            self.executor = executor
+            try:
+                return asyncio.run(self._run(coroutine))
+            finally:
+                self.executor = None
+
+    async def call(self, operation: str, function, *args):
+        async with self.semaphores[operation]:
+            self.calls[operation] += 1
+            self.in_flight[operation] += 1
+            self.max_in_flight[operation] = max(self.max_in_flight[operation], self.in_flight[operation])
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+            finally:
+                self.in_flight[operation] -= 1
+
+    async def map(self, operation: str, function, arguments: list) -> list:
+        """Calls the function with every tuple of arguments, exceptions are returned in place of the results."""
+        return await asyncio.gather(*(self.call(operation, function, *args) for args in arguments),
+                                    return_exceptions=True)
+
+    async def run_all(self, operation: str, tasks: list) -> list:
+        """Calls every task without arguments, exceptions are returned in place of the results."""
+        return await asyncio.gather(*(self.call(operation, task) for task in tasks), return_exceptions=True)
+
+    def get_summary(self) -> str:
+        operations = ", ".join(f"{operation}: {self.calls[operation]} calls, at most {self.max_in_flight[operation]}"
+                               f"/{self.limits[operation]} in flight" for operation in self.limits)
+        return f"Async upload engine ({self.executor_size} executor threads): {operations}"
+
+    async def _run(self, coroutine):
+        # semaphores are bound to the loop running them
+        self.semaphores = {operation: asyncio.Semaphore(max(1, limit)) for operation, limit in self.limits.items()}
+        return await coroutine
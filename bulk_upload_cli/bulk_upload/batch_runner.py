@@ -0,0 +1,176 @@
+import csv
+import os
+import threading
+import time
+import traceback
+
+import unity_cloud as uc
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from shared.utils import log_error, log_ok, log_info, log_step, log_warning
+from bulk_upload.bulk_upload_pipeline import BulkUploadPipeline, version
+from bulk_upload.cloud_cache import cloud_cache
+from bulk_upload.concurrency_budget import concurrency_budget
+from bulk_upload.config_providers import FileConfigProvider
+from bulk_upload.models import AppSettings, ProjectUploaderConfig, Strategy
+from bulk_upload.sdk_session import initialize_sdk, login
+from bulk_upload.tracing import tracer
+
+
+class BatchRun(object):
+    def __init__(self, config_file: str, name: str):
+        self.config_file = config_file
+        self.name = name
+        self.config = None
+        self.complete = False
+        self.asset_count = 0
+        self.elapsed = 0
+
+
+class BatchUploadRunner(object):
+    """Runs several configuration files at the same time in a single process.
+
+    The SDK is initialized once and logged in once per set of credentials, the SDK session being global to the process.
+    The runs share the cloud listing cache, so runs targeting the same project list it once, and the concurrency
+    budget, which bounds the SDK calls in flight across every run.
+    """
+
+    def __init__(self, app_settings: AppSettings):
+        self.app_settings = app_settings
+        # runs extracting a .unitypackage share the extraction folder, they can't overlap
+        self.extraction_lock = threading.Lock()
+
+    def run(self, config_paths: [str]) -> bool:
+        BulkUploadPipeline.configure_logging(self.app_settings)
+        runs = self.load_runs(get_config_files(config_paths))
+        if len(runs) == 0:
+            log_warning("No configuration file to run")
+            return False
+
+        BulkUploadPipeline.set_environment_variables(self.app_settings)
+        cloud_cache.configure(self.app_settings.cloud_cache_ttl)
+        concurrency_budget.configure(self.app_settings.batch_concurrency_budget)
+        if self.app_settings.upload_processes > 1:
+            log_info("Batch runs upload from a single process to share the session, uploadProcesses is ignored")
+            self.app_settings.upload_processes = 1
+
+        uc.set_app_information("unity_cloud_python_cli_tool", ("unity_cloud_python_cli_tool", version))
+        initialize_sdk(self.app_settings)
+
+        # the metrics cover every run of the batch, the steps of concurrent runs are summed
+        metrics_reporter = BulkUploadPipeline.get_metrics_reporter(self.app_settings)
+        metrics_reporter.start()
+        tracer.start(self.app_settings.trace_file)
+        start = time.perf_counter()
+        try:
+            for credentials, credential_runs in group_by_credentials(runs).items():
+                try:
+                    login(*credentials)
+                except Exception as e:
+                    log_error(f"Failed to log in for {len(credential_runs)} configuration files: {type(e).__name__}")
+                    continue
+
+                log_ok(f"Running {len(credential_runs)} configuration files, "
+                       f"{self.app_settings.batch_concurrent_runs} at a time")
+                # a single progress display covers the uploads of every run
+                with BulkUploadPipeline.show_progress(self.app_settings), \
+                        ThreadPoolExecutor(max_workers=self.app_settings.batch_concurrent_runs,
+                                           thread_name_prefix="batch-run") as executor:
+                    for run in credential_runs:
+                        executor.submit(self.execute_run, run)
+        finally:
+            tracer.stop()
+            metrics_reporter.stop()
+
+        self.print_summary(runs, time.perf_counter() - start)
+        return all(run.complete for run in runs)
+
+    @staticmethod
+    def load_runs(config_files: [str]) -> [BatchRun]:
+        runs = []
+        names = set()
+        for config_file in config_files:
+            name = Path(config_file).stem
+            # configuration files with the same name in different folders must not share their output files
+            while name in names:
+                name = f"{name}_{len(runs)}"
+            names.add(name)
+
+            run = BatchRun(config_file, name)
+            try:
+                run.config = FileConfigProvider(config_file).get_config()
+            except Exception as e:
+                log_error(f"Failed to load {config_file}: {e}")
+            runs.append(run)
+        return runs
+
+    def execute_run(self, run: BatchRun):
+        if run.config is None:
+            return
+
+        start = time.perf_counter()
+        log_info(f"Starting {run.name}")
+        pipeline = BulkUploadPipeline()
+        try:
+            with tracer.span(run.name, "run", config_file=run.config_file):
+                if uses_extraction_folder(run.config):
+                    with self.extraction_lock:
+                        run.complete = pipeline.run_batch_config(run.config, self.app_settings, run.name)
+                else:
+                    run.complete = pipeline.run_batch_config(run.config, self.app_settings, run.name)
+
+            assets = pipeline.pipeline_states[pipeline.step].assets
+            run.asset_count = len(assets) if assets is not None else 0
+        except Exception as e:
+            log_error(f"{run.name} failed at step {pipeline.step + 1}: {type(e).__name__}")
+            log_error(traceback.format_exc())
+        run.elapsed = time.perf_counter() - start
+
+    @staticmethod
+    def print_summary(runs: [BatchRun], elapsed: float):
+        log_step(f"Batch done in {elapsed:.1f}s")
+        for run in runs:
+            status = "done" if run.complete else "failed"
+            log_info(f"  {run.name}: {status}, {run.asset_count} assets in {run.elapsed:.1f}s ({run.config_file})")
+        log_info(cloud_cache.get_summary())
+        log_info(concurrency_budget.get_summary())
+
+        failed = [run.name for run in runs if not run.complete]
+        if len(failed) > 0:
+            log_error(f"{len(failed)} of {len(runs)} configuration files failed: {', '.join(failed)}")
+
+
+def get_config_files(config_paths: [str]) -> [str]:
+    """Folders are replaced by the .json files they contain."""
+    config_files = []
+    for path in config_paths:
+        if os.path.isdir(path):
+            config_files.extend(sorted(str(file) for file in Path(path).glob("*.json")))
+        elif os.path.isfile(path):
+            config_files.append(path)
+        else:
+            log_warning(f"Configuration file not found: {path}")
+    return config_files
+
+
+def group_by_credentials(runs: [BatchRun]) -> dict:
+    groups = {}
+    for run in runs:
+        if run.config is not None:
+            groups.setdefault((run.config.key_id, run.config.key), []).append(run)
+    return groups
+
+
+def uses_extraction_folder(config: ProjectUploaderConfig) -> bool:
+    if config.strategy == Strategy.UNITY_PACKAGE:
+        return True
+    if config.strategy != Strategy.CSV_FILE:
+        return False
+
+    try:
+        with open(config.assets_path, "r", encoding="utf-8") as file:
+            input_row = next(csv.DictReader(file))
+            return input_row.get("Input", "").startswith(f"{Strategy.UNITY_PACKAGE.value}?")
+    except Exception:
+        return False
@@ -2,14 +2,19 @@ import unity_cloud as uc
 import os
 import traceback
 
+from contextlib import contextmanager
+
 import unity_cloud.errors
 
-from shared.utils import log_error, log_ok, log_warning, log_info, execute_prompt
+from shared.utils import log_error, log_step, log_warning, log_info, execute_prompt
+from shared.log_backend import log_backend
 from bulk_upload.config_providers import InteractiveConfigProvider, FileConfigProvider, SelectConfigProvider
-from bulk_upload.models import ProjectUploaderConfig, Strategy, DependencyStrategy, AppSettings, AssetInfo
+from bulk_upload.models import ProjectUploaderConfig, Strategy, DependencyStrategy, AppSettings, AssetInfo, \
+    UploadEngine
 from bulk_upload.asset_mappers import NameGroupingAssetMapper, FolderGroupingAssetMapper, UnityPackageAssetMapper, \
     UnityProjectAssetMapper, SingleFileAssetMapper, CsvAssetMapper, CloudAssetMapper
-from bulk_upload.assets_uploaders import AssetUploader, CloudAssetUploader
+from bulk_upload.assets_uploaders import AssetUploader, CloudAssetUploader, AsyncCloudAssetUploader
+from bulk_upload.upload_processes import MultiProcessCloudAssetUploader
 from bulk_upload.assets_customization_providers import AssetCustomizationProvider, InteractiveAssetCustomizer, \
     HeadlessAssetCustomizer, DefaultCustomizationProvider, CsvAssetCustomizer
 from bulk_upload.dependency_resolving import DependencyResolver, EmbeddedDependencyResolver, \
@@ -17,6 +22,14 @@ from bulk_upload.dependency_resolving import DependencyResolver, EmbeddedDepende
 from bulk_upload.validation_providers import ValidationProvider, InteractiveCSVValidationProvider, \
     HeadlessCSVValidationProvider
 from bulk_upload.file_explorers import FileExplorer, LocalFileExplorer, VcsFileExplorer
+from bulk_upload.cloud_cache import cloud_cache
+from bulk_upload.metrics import metrics, MetricsReporter
+from bulk_upload.tracing import tracer
+from bulk_upload.profiling import profiler
+from bulk_upload.progress_display import progress_display
+from bulk_upload.sdk_session import initialize_sdk, login
+from bulk_upload.sharding import Shard, select_shard_assets, iter_shard_assets, write_shard_manifest, \
+    get_manifest_path
 
 
 version = "0.7.0"
@@ -40,37 +53,40 @@ class BulkUploadPipeline:
         self.config_file = None
         self.select_config = False
         self.is_login = False
+        self.shard = None
+        self.validation_file = "validation.csv"
 
     def login(self, key_id=None, key=None):
         if self.is_login:
             return
 
-        if key is not None and key_id != "" and key_id is not None and key != "":
-            uc.identity.service_account.use(key_id, key)
-        else:
-            print("Logging in with user account in progress", flush=True)
-            BulkUploadPipeline.login_with_user_account()
-
+        login(key_id, key)
         self.is_login = True
 
-    @staticmethod
-    def login_with_user_account():
-        uc.identity.user_login.use()
-        auth_state = uc.identity.user_login.get_authentication_state()
-        if auth_state != uc.identity.user_login.Authentication_State.LOGGED_IN:
-            uc.identity.user_login.login()
-
-    def run(self, config_file=None, select_config=False):
+    def run(self, config_file=None, select_config=False, shard: Shard = None):
+        self.shard = shard
         self.app_settings.load_from_json()
+        self.configure_logging(self.app_settings)
         self.set_environment_variables(self.app_settings)
+        cloud_cache.configure(self.app_settings.cloud_cache_ttl)
         self.is_headless_run = config_file is not None or select_config
         self.config_file = config_file
         self.select_config = select_config
         uc.set_app_information("unity_cloud_python_cli_tool", ("unity_cloud_python_cli_tool", version))
         self.init_unity_cloud()
         self.is_login = not self.is_headless_run
-        complete = False
 
+        metrics_reporter = self.get_metrics_reporter(self.app_settings)
+        metrics_reporter.start()
+        tracer.start(self.app_settings.trace_file)
+        try:
+            self.run_with_retry()
+        finally:
+            tracer.stop()
+            metrics_reporter.stop()
+
+    def run_with_retry(self):
+        complete = False
         try:
             self.pipeline_states[self.step] = PipelineState()
             complete = self._execute_pipeline()
@@ -82,92 +98,176 @@ class BulkUploadPipeline:
                 log_warning("Please validate your credentials and restart.")
                 exit(1)
             else:
-                print(traceback.format_exc())
+                log_error(traceback.format_exc())
 
         if not self.is_headless_run and not complete:
             self.ask_for_retry()
 
+    def run_batch_config(self, config: ProjectUploaderConfig, app_settings: AppSettings, run_name: str) -> bool:
+        """Runs the steps 2 to 7 for a config of a batch, the SDK is initialized and logged in by the batch runner."""
+        self.app_settings = app_settings
+        self.is_headless_run = True
+        self.is_login = True
+        self.validation_file = f"validation_{run_name}.csv"
+        self.step = 1
+        self.pipeline_states[self.step] = PipelineState(config, None)
+        return self._execute_pipeline(self.pipeline_states[self.step])
+
     def _execute_pipeline(self, pipeline_state: PipelineState = PipelineState()):
         assets = pipeline_state.assets
         config = pipeline_state.config
 
         if self.step == 0:
             # Step 1: Get base the configuration
-            print("\n")
-            log_ok("Step 1: Get the base configuration")
+            with self.instrument_step("configuration"):
+                log_step("Step 1: Get the base configuration")
 
-            config_provider = self.get_config_provider(self.select_config, self.config_file, self.app_settings)
-            config = config_provider.get_config()
+                config_provider = self.get_config_provider(self.select_config, self.config_file, self.app_settings)
+                config = config_provider.get_config()
 
-            self.login(config.key_id, config.key)
+                self.login(config.key_id, config.key)
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
+
+        if self.step == 1 and self.is_streaming_run(config):
+            with self.instrument_step("streaming"):
+                asset_mapper = self._execute_streaming_pipeline(config)
 
         if self.step == 1:
             # Step 2: Map the assets and dependencies
-            print("\n")
-            log_ok("Step 2: Mapping the assets")
+            with self.instrument_step("mapping"):
+                log_step("Step 2: Mapping the assets")
 
-            asset_mapper = self.get_asset_mapper(config)
-            assets = asset_mapper.map_assets(config)
-            log_info(f"Total assets found: {len(assets)}")
+                asset_mapper = self.get_asset_mapper(config)
+                assets = asset_mapper.map_assets(config)
+                log_info(f"Total assets found: {len(assets)}")
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
 
         if self.step == 2:
             # Step 3: Dependencies Resolving
-            print("\n")
-            log_ok("Step 3: Resolving dependencies")
+            with self.instrument_step("dependencies"):
+                log_step("Step 3: Resolving dependencies")
+
+                dependency_resolver = self.get_dependency_resolver(config)
+                assets = dependency_resolver.resolve_dependencies(assets)
 
-            dependency_resolver = self.get_dependency_resolver(config)
-            assets = dependency_resolver.resolve_dependencies(assets)
+                if self.shard is not None:
+                    total_count = len(assets)
+                    assets = select_shard_assets(assets, self.shard, config)
+                    log_info(f"Shard {self.shard}: {len(assets)} of {total_count} assets")
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
 
         if self.step == 3:
             # Step 4: Customize ingestion
-            print("\n")
-            log_ok("Step 4: Customizing assets")
-            customization_provider = self.get_asset_customizer(self.is_headless_run, config)
-            assets = customization_provider.apply_asset_customization(assets, config)
+            with self.instrument_step("customization"):
+                log_step("Step 4: Customizing assets")
+                customization_provider = self.get_asset_customizer(self.is_headless_run, config)
+                assets = customization_provider.apply_asset_customization(assets, config)
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
 
         if self.step == 4:
             # Step 5: Validation
-            print("\n")
-            log_ok("Step 5: Validating assets")
-            if not self.is_headless_run:
-                self.write_config(config)
+            with self.instrument_step("validation"):
+                log_step("Step 5: Validating assets")
+                if not self.is_headless_run:
+                    self.write_config(config)
 
-            validation_provider = self.get_validation_provider(self.is_headless_run, config)
-            assets = validation_provider.validate_assets(assets, config)
+                validation_provider = self.get_validation_provider(self.is_headless_run, config, self.validation_file)
+                assets = validation_provider.validate_assets(assets, config)
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
 
         if self.step == 5:
             # Step 6: Upload
-            print("\n")
-            action = "Indexing" if config.vcs_integration is not None else "Uploading"
-            log_ok(f"Step 6: {action} assets")
+            with self.instrument_step("upload"):
+                action = "Indexing" if config.vcs_integration is not None else "Uploading"
+                log_step(f"Step 6: {action} assets")
 
-            asset_uploader = self.get_asset_uploader(config)
-            asset_uploader.upload_assets(assets, config, self.app_settings)
+                asset_uploader = self.get_asset_uploader(config, self.app_settings)
+                with self.show_progress(self.app_settings):
+                    asset_uploader.upload_assets(assets, config, self.app_settings)
 
-            self.step += 1
-            self.pipeline_states[self.step] = PipelineState(config, assets)
+                self.step += 1
+                self.pipeline_states[self.step] = PipelineState(config, assets)
 
         # Step 7: Post upload actions, Clean up
-        log_ok("Step 7: Post upload actions")
-        asset_mapper.clean_up()
+        with self.instrument_step("postUpload"):
+            log_step("Step 7: Post upload actions")
+            if self.shard is not None:
+                write_shard_manifest(get_manifest_path(self.shard), self.shard, config,
+                                     self.pipeline_states[self.step].assets)
+            asset_mapper.clean_up()
+            log_info(cloud_cache.get_summary())
 
         return True
 
+    @staticmethod
+    def configure_logging(app_settings: AppSettings):
+        log_backend.configure(app_settings.log_level, app_settings.log_format, app_settings.log_file,
+                              app_settings.log_progress_interval)
+
+    @contextmanager
+    def instrument_step(self, name: str):
+        with metrics.step(name), tracer.span(name, "step"), profiler.step(name):
+            yield
+
+    @staticmethod
+    @contextmanager
+    def show_progress(app_settings: AppSettings):
+        progress_display.start(app_settings.progress_mode, app_settings.progress_interval, app_settings.log_format)
+        try:
+            yield
+        finally:
+            progress_display.stop()
+
+    def is_streaming_run(self, config: ProjectUploaderConfig) -> bool:
+        return self.is_headless_run and self.app_settings.streaming_upload and config.vcs_integration is None
+
+    def _execute_streaming_pipeline(self, config: ProjectUploaderConfig):
+        """Runs the steps 2 to 6 as a stream: each asset goes to the upload as soon as it is mapped and customized.
+
+        Barrier steps need every asset before processing the first one, they hold the stream until the mapping is done.
+        """
+        log_step("Steps 2 to 6: Streaming the assets from mapping to upload")
+
+        asset_mapper = self.get_asset_mapper(config)
+        assets = asset_mapper.iter_assets(config)
+
+        dependency_resolver = self.get_dependency_resolver(config)
+        if dependency_resolver.is_barrier:
+            log_info("Resolving dependencies needs every asset, the upload starts once the mapping is done")
+            assets = dependency_resolver.resolve_dependencies(list(assets))
+            if self.shard is not None:
+                assets = select_shard_assets(assets, self.shard, config)
+        elif self.shard is not None:
+            assets = iter_shard_assets(assets, self.shard, config)
+
+        customization_provider = self.get_asset_customizer(self.is_headless_run, config)
+        if customization_provider.is_barrier(config):
+            log_info("Customizing assets needs every asset, the upload starts once the mapping is done")
+        assets = customization_provider.iter_asset_customization(assets, config)
+
+        asset_uploader = self.get_asset_uploader(config, self.app_settings)
+        with self.show_progress(self.app_settings):
+            assets = asset_uploader.upload_assets_streaming(assets, config, self.app_settings)
+        log_info(f"Total assets found: {len(assets)}")
+
+        # the validation file can only be written afterwards, it becomes a report of what was uploaded
+        validation_provider = self.get_validation_provider(self.is_headless_run, config, self.validation_file)
+        validation_provider.validate_assets(assets, config)
+
+        self.step = 6
+        self.pipeline_states[self.step] = PipelineState(config, assets)
+        return asset_mapper
+
     @staticmethod
     def set_environment_variables(app_settings: AppSettings):
         for key, value in app_settings.environment_variables.items():
@@ -175,11 +275,15 @@ class BulkUploadPipeline:
 
     def init_unity_cloud(self):
         try:
-            uc.initialize()
-            uc.set_timeout(self.app_settings.http_timeout)
+            initialize_sdk(self.app_settings)
         except Exception as e:
             pass
 
+    @staticmethod
+    def get_metrics_reporter(app_settings: AppSettings) -> MetricsReporter:
+        return MetricsReporter(metrics, app_settings.metrics_file, app_settings.prometheus_file,
+                               app_settings.metrics_interval)
+
     @staticmethod
     def get_config_provider(select_config=False, config_file=None, app_settings: AppSettings = None):
         if select_config:
@@ -211,13 +315,13 @@ class BulkUploadPipeline:
     @staticmethod
     def get_dependency_resolver(config: ProjectUploaderConfig):
         if config.dependency_strategy == DependencyStrategy.NONE:
-            print("No dependencies to resolve")
+            log_info("No dependencies to resolve")
             return DefaultDependencyResolver()
         elif config.dependency_strategy == DependencyStrategy.EMBEDDED:
-            print("Resolving embedded dependencies")
+            log_info("Resolving embedded dependencies")
             return EmbeddedDependencyResolver()
         elif config.dependency_strategy == DependencyStrategy.ASSET_REFERENCE:
-            print("Mapping asset references")
+            log_info("Mapping asset references")
             return AssetReferenceDependencyResolver()
         else:
             raise ValueError("Invalid dependency mapper")
@@ -234,13 +338,18 @@ class BulkUploadPipeline:
             return InteractiveAssetCustomizer()
 
     @staticmethod
-    def get_asset_uploader(config: ProjectUploaderConfig):
+    def get_asset_uploader(config: ProjectUploaderConfig, app_settings: AppSettings):
+        if app_settings.upload_processes > 1:
+            return MultiProcessCloudAssetUploader()
+        if app_settings.upload_engine == UploadEngine.ASYNCIO:
+            return AsyncCloudAssetUploader()
         return CloudAssetUploader()
 
     @staticmethod
-    def get_validation_provider(is_headless_run: bool, config: ProjectUploaderConfig):
+    def get_validation_provider(is_headless_run: bool, config: ProjectUploaderConfig,
+                                validation_file: str = "validation.csv"):
         if is_headless_run:
-            return HeadlessCSVValidationProvider()
+            return HeadlessCSVValidationProvider(validation_file)
         else:
             return InteractiveCSVValidationProvider()
 
@@ -262,9 +371,9 @@ class BulkUploadPipeline:
             file_name = config_name if config_name.endswith(".json") else config_name + ".json"
             with open(file_name, "w") as f:
                 f.write(config.to_json())
-            print("Configuration saved to", file_name)
+            log_info(f"Configuration saved to {file_name}")
         else:
-            print("Configuration not saved", flush=True)
+            log_info("Configuration not saved")
 
     def ask_for_retry(self):
         from InquirerPy import inquirer
@@ -277,7 +386,7 @@ class BulkUploadPipeline:
         selection = execute_prompt(inquirer.select(message="Choose the step to restart from:", choices=steps))
 
         if selection == steps[-1]:
-            print("Exiting the pipeline")
+            log_info("Exiting the pipeline")
             exit(1)
         else:
             if selection == steps[0]:
@@ -298,7 +407,7 @@ class BulkUploadPipeline:
                     log_warning("Please validate your credentials and restart.")
                     exit(1)
                 else:
-                    print(traceback.format_exc())
+                    log_error(traceback.format_exc())
 
             if not complete:
                 self.ask_for_retry()
\ No newline at end of file
@@ -0,0 +1,185 @@
+import threading
+import time
+
+from collections import OrderedDict
+from pathlib import PurePosixPath
+
+import unity_cloud as uc
+
+
+class TtlLruCache(object):
+    """Thread-safe cache where entries expire after a time to live and the least recently used entries are evicted."""
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.loading = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        """Concurrent callers missing the same key wait for a single load instead of loading it each."""
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+
+                loading = self.loading.get(key)
+                if loading is None:
+                    self.misses += 1
+                    loading = self.loading[key] = threading.Event()
+                    break
+
+            # the entry may still be missing if the load failed or was invalidated, in which case we load it ourselves
+            loading.wait()
+
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            with self.lock:
+                del self.loading[key]
+            loading.set()
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, key):
+        """Returns the value if it is cached and not expired, None otherwise, without loading it."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CollectionIndex(object):
+    """Set of the collections of a project keyed by (parent_path, name), kept up to date with the collections we create."""
+
+    def __init__(self, cloud_collections):
+        self.lock = threading.Lock()
+        self.keys = {(collection.parent_path, collection.name) for collection in cloud_collections}
+
+    def contains(self, parent_path: str, name: str) -> bool:
+        with self.lock:
+            return (parent_path, name) in self.keys
+
+    def contains_path(self, collection_path: str) -> bool:
+        return self.contains(*get_collection_key(collection_path))
+
+    def add(self, parent_path: str, name: str):
+        with self.lock:
+            self.keys.add((parent_path, name))
+
+
+class CloudListingCache(object):
+    """Cache around the listing calls of the SDK made several times for the same project or asset version during a run.
+
+    The writes made by the tool must invalidate the affected entries, see the invalidate_* methods.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 300):
+        self.cache = TtlLruCache(max_entries, ttl)
+        self.collection_indexes = {}
+        self.collection_indexes_lock = threading.Lock()
+        # size of the projects at their last listing, kept when the listing itself is invalidated
+        self.asset_counts = {}
+
+    def configure(self, ttl: float):
+        self.cache.ttl = ttl
+
+    def list_collections(self, org_id: str, project_id: str):
+        return self.cache.get_or_load(("collections", org_id, project_id),
+                                      lambda: uc.assets.list_collections(org_id, project_id))
+
+    def get_collection_index(self, org_id: str, project_id: str) -> CollectionIndex:
+        """The index is built once per run, call add_collection when creating a collection to keep it up to date."""
+        with self.collection_indexes_lock:
+            index = self.collection_indexes.get((org_id, project_id))
+            if index is None:
+                index = CollectionIndex(self.list_collections(org_id, project_id))
+                self.collection_indexes[(org_id, project_id)] = index
+            return index
+
+    def add_collection(self, org_id: str, project_id: str, parent_path: str, name: str):
+        self.invalidate_collections(org_id, project_id)
+        with self.collection_indexes_lock:
+            index = self.collection_indexes.get((org_id, project_id))
+        if index is not None:
+            index.add(parent_path, name)
+
+    def list_field_definitions(self, org_id: str, project_id: str):
+        return self.cache.get_or_load(("field_definitions", org_id, project_id),
+                                      lambda: uc.assets.list_field_definitions(org_id, project_id))
+
+    def get_asset_list(self, org_id: str, project_id: str):
+        assets = self.cache.get_or_load(("assets", org_id, project_id),
+                                        lambda: uc.assets.get_asset_list(org_id, project_id))
+        self.asset_counts[(org_id, project_id)] = len(assets)
+        return assets
+
+    def get_cached_asset_list(self, org_id: str, project_id: str):
+        """The listing of the project if it is cached, None otherwise."""
+        return self.cache.peek(("assets", org_id, project_id))
+
+    def get_known_asset_count(self, org_id: str, project_id: str):
+        """The number of assets of the project at its last listing in this process, None if it was never listed."""
+        return self.asset_counts.get((org_id, project_id))
+
+    def get_dataset_list(self, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        key = ("datasets", org_id, project_id, asset_id, asset_version)
+        datasets = self.cache.get_or_load(key,
+                                          lambda: uc.assets.get_dataset_list(org_id, project_id, asset_id, asset_version))
+        # datasets of a version being created might not be available yet
+        if len(datasets) == 0:
+            self.cache.invalidate(key)
+        return datasets
+
+    def invalidate_collections(self, org_id: str, project_id: str):
+        self.cache.invalidate(("collections", org_id, project_id))
+
+    def reset_collection_index(self, org_id: str, project_id: str):
+        self.invalidate_collections(org_id, project_id)
+        with self.collection_indexes_lock:
+            self.collection_indexes.pop((org_id, project_id), None)
+
+    def invalidate_assets(self, org_id: str, project_id: str):
+        self.cache.invalidate(("assets", org_id, project_id))
+
+    def invalidate_datasets(self, org_id: str, project_id: str, asset_id: str, asset_version: str):
+        self.cache.invalidate(("datasets", org_id, project_id, asset_id, asset_version))
+
+    def get_summary(self) -> str:
+        return (f"Cloud listing cache: {self.cache.hits} hits, {self.cache.misses} misses, "
+                f"{self.cache.evictions} evictions")
+
+
+def get_collection_key(collection_path: str) -> (str, str):
+    path = PurePosixPath(collection_path)
+    parent = path.parent.__str__()
+    return "" if parent == "." else parent, path.name
+
+
+cloud_cache = CloudListingCache()
@@ -0,0 +1,49 @@
+import threading
+
+from contextlib import contextmanager
+
+
+class ConcurrencyBudget(object):
+    """Bound on the number of SDK writes and uploads in flight in the process, whatever the run they belong to.
+
+    Unbounded until configured with a limit, so a single run is only bounded by its own parallel settings.
+    """
+
+    def __init__(self):
+        self.limit = 0
+        self.semaphore = None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.waits = 0
+
+    def configure(self, limit: int):
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    @contextmanager
+    def slot(self):
+        """Holds one call of the budget, waiting for a slot when the limit is reached."""
+        semaphore = self.semaphore
+        if semaphore is not None and not semaphore.acquire(blocking=False):
+            with self.lock:
+                self.waits += 1
+            semaphore.acquire()
+
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def get_summary(self) -> str:
+        limit = self.limit if self.limit > 0 else "unbounded"
+        return f"Concurrency budget: {limit}, peak {self.peak} calls in flight, {self.waits} calls waited"
+
+
+concurrency_budget = ConcurrencyBudget()
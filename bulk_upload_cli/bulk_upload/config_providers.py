@@ -3,7 +3,7 @@ import os
 
 from abc import ABC, abstractmethod
 from InquirerPy import inquirer
-from shared.utils import log_info, execute_prompt
+from shared.utils import log_error, log_info, log_warning, execute_prompt
 
 import unity_cloud as uc
 from bulk_upload.models import ProjectUploaderConfig, Strategy, DependencyStrategy, AppSettings, FeatureFlags, \
@@ -119,7 +119,7 @@ class InteractiveConfigProvider(ConfigProvider):
 
         organizations = uc.identity.get_organization_list()
         if len(organizations) == 0:
-            print("No organizations found. Please create an organization first. Application will exit.")
+            log_error("No organizations found. Please create an organization first. Application will exit.")
             exit(1)
 
         org_selected = self.execute_prompt_and_increment_step(
@@ -134,7 +134,7 @@ class InteractiveConfigProvider(ConfigProvider):
 
         projects = uc.identity.get_project_list(self.config.org_id)
         if len(projects) == 0:
-            print("No projects found in this organization. Please create a project first. Application will exit.")
+            log_error("No projects found in this organization. Please create a project first. Application will exit.")
             exit(1)
 
         selected_project = self.execute_prompt_and_increment_step(
@@ -185,7 +185,7 @@ class InteractiveConfigProvider(ConfigProvider):
                     "\'")
                 if not os.path.isdir(path):
                     self.last_step -= 1
-                    print("The path must point to a directory.")
+                    log_warning("The path must point to a directory.")
                     continue
 
                 self.config.assets_path = self.sanitize_string(path)
@@ -234,11 +234,11 @@ class InteractiveConfigProvider(ConfigProvider):
                 assets_path = self.execute_prompt_and_increment_step(
                     inquirer.filepath(message="Enter the path to the Unity package:")).strip('\"').strip("\'")
                 if not assets_path.endswith(".unitypackage"):
-                    print("The path must point to a .unitypackage file.")
+                    log_warning("The path must point to a .unitypackage file.")
                     self.last_step -= 1
                     continue
                 if not os.path.isfile(assets_path):
-                    print("The file does not exist.")
+                    log_warning("The file does not exist.")
                     self.last_step -= 1
                     continue
                 self.config.assets_path = self.sanitize_string(assets_path)
@@ -262,11 +262,11 @@ class InteractiveConfigProvider(ConfigProvider):
                     "\'")
                 if not csv_path.endswith(".csv"):
                     self.last_step -= 1
-                    print("The path must point to a .csv file.")
+                    log_warning("The path must point to a .csv file.")
                     continue
                 if not os.path.isfile(csv_path):
                     self.last_step -= 1
-                    print("The file does not exist.")
+                    log_warning("The file does not exist.")
                     continue
                 self.config.assets_path = self.sanitize_string(csv_path)
                 break
@@ -450,7 +450,7 @@ class InteractiveConfigProvider(ConfigProvider):
             uc.identity.service_account.use(key_id, key)
             self.using_service_account = True
         else:
-            print("Logging in with user account in progress", flush=True)
+            log_info("Logging in with user account in progress")
             InteractiveConfigProvider.login_with_user_account()
 
     @staticmethod
@@ -465,7 +465,7 @@ class SelectConfigProvider(ConfigProvider):
     def get_config(self) -> ProjectUploaderConfig:
         config_files = [f for f in os.listdir() if f.endswith(".json") and f != "app_settings.json"]
         if len(config_files) == 0:
-            print("No configuration files found in the current directory. Please create a configuration file first.")
+            log_error("No configuration files found in the current directory. Please create a configuration file first.")
             exit(1)
 
         config_file = execute_prompt(inquirer.select(message="Select a configuration file:", choices=config_files))
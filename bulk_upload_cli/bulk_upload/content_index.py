@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+
+from bulk_upload.models import AssetInfo, FileInfo
+from bulk_upload.upload_ordering import get_path_locality_key
+
+
+class ContentIndex(object):
+    """Finds identical file content listed several times in an asset so that it is uploaded only once.
+
+    Only the files sharing their cloud path with a file of another source path in the same asset can be skipped, and
+    only those with the same size are hashed. The content of every other file is never read before its upload.
+    Files referenced by several assets through the same path are counted as shared without being hashed: the SDK
+    can't copy a file between datasets, so they are still read and uploaded once per asset.
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sizes = {}
+        self._content_keys = {}
+        self.hashed_files = 0
+        self.hashed_bytes = 0
+        self.duplicate_files = 0
+        self.duplicate_bytes = 0
+        self.skipped_uploads = 0
+        self.skipped_upload_bytes = 0
+
+    def index_assets(self, assets: [AssetInfo]):
+        """Can be called concurrently, like the streaming upload does for every asset."""
+        occurrences = {}
+        paths_to_hash = set()
+        for asset in assets:
+            paths_by_cloud_path = {}
+            for file in asset.files:
+                occurrences.setdefault(str(file.path), []).append(file)
+                paths_by_cloud_path.setdefault(str(file.cloud_path), set()).add(str(file.path))
+            paths_to_hash.update(self._get_size_collisions(paths_by_cloud_path.values()))
+
+        # read the files in locality order to limit seeks on disks and network shares
+        for path in sorted((path for path in paths_to_hash if path not in self._content_keys),
+                           key=get_path_locality_key):
+            self._content_keys[path] = self._hash_file(path, self._sizes[path])
+
+        duplicate_files = 0
+        duplicate_bytes = 0
+        first_seen = set()
+        for path, files in occurrences.items():
+            size = self._sizes.get(path)
+            if size is None:
+                size = self._get_size(path)
+            if size is None:
+                continue
+            key = self._content_keys.get(path, f"path:{path}")
+            copies = len(files) if key in first_seen else len(files) - 1
+            first_seen.add(key)
+            duplicate_files += copies
+            duplicate_bytes += copies * size
+
+        with self._lock:
+            self.duplicate_files += duplicate_files
+            self.duplicate_bytes += duplicate_bytes
+
+    def get_unique_files(self, asset: AssetInfo) -> [FileInfo]:
+        """Returns the files of the asset without the entries pointing to already listed content at the same cloud path."""
+        unique_files = []
+        seen = set()
+        for file in asset.files:
+            key = (str(file.cloud_path), self._content_keys.get(str(file.path), f"path:{file.path}"))
+            if key in seen:
+                with self._lock:
+                    self.skipped_uploads += 1
+                    self.skipped_upload_bytes += self._sizes.get(str(file.path), 0)
+                continue
+            seen.add(key)
+            unique_files.append(file)
+        return unique_files
+
+    def get_file_size(self, file: FileInfo) -> int:
+        path = str(file.path)
+        size = self._sizes.get(path)
+        if size is None:
+            size = self._get_size(path)
+        return 0 if size is None else size
+
+    def get_summary(self) -> str:
+        return (f"Content deduplication: {self.skipped_uploads} redundant uploads within assets skipped "
+                f"({self.skipped_upload_bytes} bytes saved), {self.hashed_files} files hashed "
+                f"({self.hashed_bytes} bytes read), {self.duplicate_files} file references shared between assets "
+                f"still uploaded to each of them ({self.duplicate_bytes} bytes not saved)")
+
+    def _get_size_collisions(self, path_groups) -> [str]:
+        paths = []
+        for group in path_groups:
+            if len(group) < 2:
+                continue
+            paths_by_size = {}
+            for path in group:
+                size = self._get_size(path)
+                if size is not None:
+                    paths_by_size.setdefault(size, []).append(path)
+            paths.extend(path for same_size in paths_by_size.values() if len(same_size) > 1 for path in same_size)
+        return paths
+
+    def _get_size(self, path: str):
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return None
+        self._sizes[path] = size
+        return size
+
+    def _hash_file(self, path: str, size: int) -> str:
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        except OSError:
+            return f"path:{path}"
+
+        with self._lock:
+            self.hashed_files += 1
+            self.hashed_bytes += size
+        return f"sha256:{digest.hexdigest()}"
@@ -0,0 +1,93 @@
+from array import array
+
+from bulk_upload.models import AssetInfo
+
+
+class DependencyGraph(object):
+    """Compact dependency graph between assets.
+
+    Unity GUIDs are mapped to the dense index of their asset and edges are stored in compressed sparse row form:
+    the dependencies of node i are targets[offsets[i]:offsets[i + 1]], without duplicates nor self references.
+    """
+
+    def __init__(self, node_count: int, offsets: array, targets: array):
+        self.node_count = node_count
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_assets(cls, assets: [AssetInfo]) -> "DependencyGraph":
+        node_index = {asset.unity_id: i for i, asset in enumerate(assets)}
+
+        offsets = array("q", [0])
+        targets = array("i" if len(assets) < 2 ** 31 else "q")
+        get_node = node_index.get
+        for i, asset in enumerate(assets):
+            asset_targets = set(map(get_node, asset.unresolved_dependencies))
+            asset_targets.discard(None)
+            asset_targets.discard(i)
+            targets.extend(asset_targets)
+            offsets.append(len(targets))
+
+        return cls(len(assets), offsets, targets)
+
+    def get_dependencies(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def get_edge_count(self) -> int:
+        return len(self.targets)
+
+    def get_strongly_connected_components(self) -> ([[int]], array):
+        """Iterative Tarjan algorithm. Returns the components in reverse topological order and the component of each node."""
+        offsets = self.offsets
+        targets = self.targets
+        index = array("q", [-1]) * self.node_count
+        low_link = array("q", [0]) * self.node_count
+        on_stack = bytearray(self.node_count)
+        component_of = array("q", [-1]) * self.node_count
+        stack = []
+        components = []
+        next_index = 0
+
+        for root in range(self.node_count):
+            if index[root] != -1:
+                continue
+
+            work = [(root, offsets[root])]
+            while work:
+                node, edge_position = work.pop()
+                if edge_position == offsets[node] and index[node] == -1:
+                    index[node] = low_link[node] = next_index
+                    next_index += 1
+                    stack.append(node)
+                    on_stack[node] = 1
+
+                end = offsets[node + 1]
+                while edge_position < end:
+                    target = targets[edge_position]
+                    edge_position += 1
+                    if index[target] == -1:
+                        work.append((node, edge_position))
+                        work.append((target, offsets[target]))
+                        break
+                    if on_stack[target] and index[target] < low_link[node]:
+                        low_link[node] = index[target]
+                else:
+                    if low_link[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component_of[member] = len(components)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+
+                    if work:
+                        parent = work[-1][0]
+                        if low_link[node] < low_link[parent]:
+                            low_link[parent] = low_link[node]
+
+        return components, component_of
+
@@ -1,27 +1,47 @@
 import re
 from abc import ABC, abstractmethod
 from bulk_upload.models import AssetInfo, FileInfo
+from bulk_upload.dependency_graph import DependencyGraph
 
 
 class DependencyResolver(ABC):
+    # barrier resolvers need every asset before resolving the dependencies of the first one
+    is_barrier = True
+
     @abstractmethod
     def resolve_dependencies(self, assets: [AssetInfo]) -> [AssetInfo]:
         pass
 
 
 class EmbeddedDependencyResolver(DependencyResolver):
+    """Embeds the files of every asset reachable through dependencies, following the whole dependency chain.
+
+    The dependency graph is condensed into strongly connected components so that cycles are handled and the
+    closure of each component is computed only once, then reused by every asset depending on it.
+    """
+
     def resolve_dependencies(self, assets: [AssetInfo]) -> [AssetInfo]:
-        assets_dict = {asset.unity_id: asset for asset in assets}
+        graph = DependencyGraph.from_assets(assets)
+        components, component_of = graph.get_strongly_connected_components()
 
-        for asset in assets:
-            for unresolved_dependency in asset.unresolved_dependencies:
-                try:
-                    asset.dependencies.extend(assets_dict[unresolved_dependency].files)
-                except KeyError:
-                    pass
+        # components are produced in reverse topological order, every dependency closure is ready when needed
+        closures = []
+        for component in components:
+            closure = {}
+            for node in component:
+                for file in assets[node].files:
+                    closure.setdefault(get_file_key(file), file)
+            for node in component:
+                for target in graph.get_dependencies(node):
+                    target_component = component_of[target]
+                    if target_component != len(closures):
+                        for key, file in closures[target_component].items():
+                            closure.setdefault(key, file)
+            closures.append(closure)
 
-        for asset in assets:
-            asset.files.extend(asset.dependencies)
+        for i, asset in enumerate(assets):
+            own_files = {get_file_key(file) for file in asset.files}
+            asset.files.extend(file for key, file in closures[component_of[i]].items() if key not in own_files)
             asset.dependencies = []
 
         return assets
@@ -29,18 +49,21 @@ class EmbeddedDependencyResolver(DependencyResolver):
 
 class AssetReferenceDependencyResolver(DependencyResolver):
     def resolve_dependencies(self, assets: [AssetInfo]) -> [AssetInfo]:
-        asset_index = {}
-        for i in range(len(assets)):
-            asset_index[assets[i].unity_id] = i
+        graph = DependencyGraph.from_assets(assets)
 
-        for asset in assets:
-            for dependency in asset.unresolved_dependencies:
-                if dependency in asset_index:
-                    asset.dependencies.append(asset_index[dependency])
+        for i, asset in enumerate(assets):
+            asset.dependencies = list(graph.get_dependencies(i))
 
         return assets
 
 
 class DefaultDependencyResolver(DependencyResolver):
+    is_barrier = False
+
     def resolve_dependencies(self, assets: [AssetInfo]) -> [AssetInfo]:
-        return assets
\ No newline at end of file
+        return assets
+
+
+def get_file_key(file: FileInfo) -> (str, str):
+    return str(file.path), str(file.cloud_path)
+
@@ -0,0 +1,164 @@
+import logging
+import threading
+
+from collections import deque
+from bulk_upload.models import AssetInfo
+from bulk_upload.metrics import metrics
+from bulk_upload.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class AssetUploadTracker(object):
+    def __init__(self, asset: AssetInfo, on_complete):
+        self.asset = asset
+        self.on_complete = on_complete
+        self.remaining = 0
+        self.errors = []
+        # the asset span lasts from the submission to the completion of its last file
+        self.span_id = tracer.begin_async(asset.name, "asset")
+
+
+class FileUploadScheduler(object):
+    """Runs the file uploads of every asset on a single pool of workers.
+
+    An asset is submitted with a prepare function, run on a worker, returning the upload tasks of its files. Those
+    tasks are pushed on the deque of the worker which prepared the asset, and idle workers steal from the deque with
+    the most pending tasks, so a large asset is spread over every worker while small assets don't hold idle threads.
+    Once all the tasks of an asset are done, its on_complete function is called with the errors raised by the tasks.
+    """
+
+    def __init__(self, max_workers: int, max_pending_assets: int = 0):
+        self.max_workers = max(1, max_workers)
+        self.max_pending_assets = max_pending_assets
+        self.condition = threading.Condition()
+        self.injection_queue = deque()
+        self.worker_queues = [deque() for _ in range(self.max_workers)]
+        self.pending_assets = 0
+        self.stopping = False
+        self.tasks_run = 0
+        self.steals = 0
+        self.threads = [threading.Thread(target=self._work, args=(i,), name=f"file-upload-{i}", daemon=True)
+                        for i in range(self.max_workers)]
+
+    def start(self):
+        metrics.register_queue("file_upload_tasks", self.get_queued_tasks)
+        metrics.register_queue("file_upload_pending_assets", self.get_pending_assets)
+        for thread in self.threads:
+            thread.start()
+
+    def submit_asset(self, asset: AssetInfo, prepare, on_complete=None, worker: int = None):
+        """Blocks while max_pending_assets assets are already in progress, when a limit is set.
+
+        When a worker is given, the asset is queued on the deque of this worker instead of the shared queue.
+        """
+        tracker = AssetUploadTracker(asset, on_complete)
+        with self.condition:
+            while 0 < self.max_pending_assets <= self.pending_assets:
+                self.condition.wait()
+            self.pending_assets += 1
+            if worker is None:
+                self.injection_queue.append((tracker, prepare, True))
+            else:
+                self.worker_queues[worker % self.max_workers].append((tracker, prepare, True))
+            self.condition.notify()
+
+    def join(self):
+        """Waits for every submitted asset to complete, then stops the workers."""
+        with self.condition:
+            while self.pending_assets > 0:
+                self.condition.wait()
+            self.stopping = True
+            self.condition.notify_all()
+
+        for thread in self.threads:
+            thread.join()
+        metrics.unregister_queue("file_upload_tasks", self.get_queued_tasks)
+        metrics.unregister_queue("file_upload_pending_assets", self.get_pending_assets)
+
+    def get_queued_tasks(self) -> int:
+        with self.condition:
+            return len(self.injection_queue) + sum(len(worker_queue) for worker_queue in self.worker_queues)
+
+    def get_pending_assets(self) -> int:
+        return self.pending_assets
+
+    def get_summary(self) -> str:
+        return (f"File upload scheduler: {self.tasks_run} tasks run on {self.max_workers} workers, "
+                f"{self.steals} stolen")
+
+    def _next_task(self, worker: int):
+        """Must be called with the condition held."""
+        own_queue = self.worker_queues[worker]
+        if own_queue:
+            return own_queue.popleft()
+
+        if self.injection_queue:
+            return self.injection_queue.popleft()
+
+        victim = max(self.worker_queues, key=len)
+        if victim:
+            self.steals += 1
+            # take the next task in order so that the upload order is kept across workers
+            return victim.popleft()
+
+        return None
+
+    def _work(self, worker: int):
+        while True:
+            with self.condition:
+                task = self._next_task(worker)
+                while task is None:
+                    if self.stopping:
+                        return
+                    self.condition.wait()
+                    task = self._next_task(worker)
+                self.tasks_run += 1
+
+            tracker, function, is_prepare = task
+            with tracer.activate(tracker.span_id):
+                if is_prepare:
+                    self._prepare(worker, tracker, function)
+                else:
+                    self._run(tracker, function)
+
+    def _prepare(self, worker: int, tracker: AssetUploadTracker, prepare):
+        try:
+            tasks = prepare(tracker.asset) or []
+        except Exception as e:
+            tracker.errors.append(e)
+            tasks = []
+
+        if len(tasks) == 0:
+            self._complete(tracker)
+            return
+
+        with self.condition:
+            tracker.remaining = len(tasks)
+            self.worker_queues[worker].extend((tracker, task, False) for task in tasks)
+            self.condition.notify_all()
+
+    def _run(self, tracker: AssetUploadTracker, task):
+        try:
+            task()
+        except Exception as e:
+            tracker.errors.append(e)
+
+        with self.condition:
+            tracker.remaining -= 1
+            is_last = tracker.remaining == 0
+
+        if is_last:
+            self._complete(tracker)
+
+    def _complete(self, tracker: AssetUploadTracker):
+        try:
+            if tracker.on_complete is not None:
+                tracker.on_complete(tracker.asset, tracker.errors)
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            tracer.end_async(tracker.span_id, tracker.asset.name, "asset", errors=len(tracker.errors))
+            with self.condition:
+                self.pending_assets -= 1
+                self.condition.notify_all()
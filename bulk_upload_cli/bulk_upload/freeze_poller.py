@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from bulk_upload.models import AssetInfo
+from bulk_upload.metrics import metrics
+from shared.utils import log_progress
+
+logger = logging.getLogger(__name__)
+
+
+class FreezePoller(object):
+    """Tracks the pending freezes of asset versions in the background.
+
+    Decoration workers only request the freeze and return. The freeze call of the SDK blocks until the server-side
+    transformations complete, and there is no status to poll instead: the freezes run on a dedicated pool sized
+    independently of the creation and edition workers, each of them holding a thread and an HTTP call while it waits.
+    A single poller thread collects their completion in batches to report the latency of every asset.
+    """
+
+    def __init__(self, max_parallel_freezes: int, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_parallel_freezes)
+        self.pending = {}
+        self.latencies = []
+        self.failed_assets = []
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._poll, name="freeze-poller", daemon=True)
+
+    def start(self):
+        metrics.register_queue("pending_freezes", self.get_pending_count)
+        self.thread.start()
+
+    def request_freeze(self, asset: AssetInfo, freeze_function):
+        future = self.executor.submit(freeze_function, asset)
+        with self.lock:
+            self.pending[future] = (asset, time.monotonic())
+
+    def wait_for_completion(self):
+        logger.info(f"Waiting for {len(self.pending)} pending freezes")
+        self.stopping.set()
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+        metrics.unregister_queue("pending_freezes", self.get_pending_count)
+
+    def get_pending_count(self) -> int:
+        return len(self.pending)
+
+    def get_summary(self) -> str:
+        if len(self.latencies) == 0:
+            return f"No asset frozen, {len(self.failed_assets)} freezes failed"
+
+        latencies = sorted(self.latencies)
+        return (f"Frozen {len(latencies)} assets ({len(self.failed_assets)} failed). Freeze latency: "
+                f"median {latencies[len(latencies) // 2]:.1f}s, "
+                f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.1f}s, "
+                f"max {latencies[-1]:.1f}s")
+
+    def _poll(self):
+        while True:
+            with self.lock:
+                futures = list(self.pending.keys())
+
+            if len(futures) == 0:
+                if self.stopping.is_set():
+                    return
+                time.sleep(self.poll_interval)
+                continue
+
+            done, _ = wait(futures, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in done:
+                with self.lock:
+                    asset, requested_at = self.pending.pop(future)
+
+                latency = now - requested_at
+                if future.exception() is not None:
+                    self.failed_assets.append(asset)
+                    logger.error(f"Failed to freeze asset: {asset.name}: {future.exception()}")
+                else:
+                    self.latencies.append(latency)
+                    log_progress("assets frozen", f"Asset frozen: {asset.name} ({latency:.1f}s)", asset=asset.name,
+                                 latency=round(latency, 3))
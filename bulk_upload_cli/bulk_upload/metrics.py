@@ -0,0 +1,312 @@
+import bisect
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+
+import unity_cloud as uc
+
+from bulk_upload.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# upper bounds in seconds, from a cached read to a large upload
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+
+class Histogram(object):
+    """Counts of observations per bucket, the last count being the observations over the last bucket."""
+
+    def __init__(self, buckets: [float] = None):
+        self.buckets = buckets or LATENCY_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def get_quantile(self, quantile: float) -> float:
+        """Estimated by interpolating within the bucket holding the quantile, exact only at the bucket bounds."""
+        if self.count == 0:
+            return 0.0
+
+        rank = quantile * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count > 0 and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def to_json(self) -> dict:
+        return {
+            "count": self.count,
+            "sumSeconds": round(self.sum, 6),
+            "p50": round(self.get_quantile(0.5), 6),
+            "p95": round(self.get_quantile(0.95), 6),
+            "p99": round(self.get_quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class RunMetrics(object):
+    """Counters of a run, shared by every thread of the process.
+
+    Steps, SDK calls and counters are recorded as they happen. Queue depths are sampled from the functions registered
+    by the components owning the queues, the maximum depth being kept over the run.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.steps = {}
+        self.current_steps = Counter()
+        self.operations = {}
+        self.errors = Counter()
+        self.counters = Counter()
+        self.in_flight = 0
+        self.queue_sources = []
+        self.queue_depths = {}
+        self.max_queue_depths = Counter()
+
+    @contextmanager
+    def step(self, name: str):
+        """Times a step of the pipeline, the time of a step run several times is summed."""
+        start = time.perf_counter()
+        with self.lock:
+            self.current_steps[name] += 1
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.current_steps[name] -= 1
+                self.steps[name] = self.steps.get(name, 0.0) + elapsed
+
+    def start_call(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def observe_call(self, operation: str, seconds: float, error: BaseException = None):
+        with self.lock:
+            self.in_flight -= 1
+            histogram = self.operations.get(operation)
+            if histogram is None:
+                histogram = self.operations[operation] = Histogram()
+            histogram.observe(seconds)
+            if error is not None:
+                self.errors[(operation, type(error).__name__)] += 1
+
+    def increment(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] += value
+
+    def register_queue(self, name: str, get_depth):
+        """get_depth is sampled until the queue is unregistered, queues registered under the same name are summed."""
+        with self.lock:
+            self.queue_sources.append((name, get_depth))
+
+    def unregister_queue(self, name: str, get_depth):
+        self.sample_queues()
+        with self.lock:
+            if (name, get_depth) in self.queue_sources:
+                self.queue_sources.remove((name, get_depth))
+            if all(source_name != name for source_name, _ in self.queue_sources):
+                self.queue_depths[name] = 0
+
+    def sample_queues(self):
+        with self.lock:
+            sources = list(self.queue_sources)
+
+        depths = Counter()
+        for name, get_depth in sources:
+            try:
+                depths[name] += get_depth()
+            except Exception:
+                pass
+
+        with self.lock:
+            for name, depth in depths.items():
+                self.queue_depths[name] = depth
+                self.max_queue_depths[name] = max(self.max_queue_depths[name], depth)
+
+    def get_progress(self) -> (Counter, int, Counter):
+        """Copies of the counters, the SDK calls in flight and the errors per operation, read under a single lock."""
+        with self.lock:
+            errors = Counter()
+            for (operation, _), count in self.errors.items():
+                errors[operation] += count
+            return Counter(self.counters), self.in_flight, errors
+
+    def get_summary(self) -> dict:
+        with self.lock:
+            errors = {}
+            for (operation, error), count in self.errors.items():
+                errors.setdefault(operation, {})[error] = count
+
+            return {
+                "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started_at)),
+                "elapsedSeconds": round(time.perf_counter() - self.start, 3),
+                "currentSteps": sorted(name for name, count in self.current_steps.items() if count > 0),
+                "steps": {name: round(seconds, 3) for name, seconds in self.steps.items()},
+                "operations": {operation: dict(histogram.to_json(), errors=errors.get(operation, {}))
+                               for operation, histogram in sorted(self.operations.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "inFlightCalls": self.in_flight,
+                "queues": {name: {"depth": depth, "maxDepth": self.max_queue_depths[name]}
+                           for name, depth in sorted(self.queue_depths.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        """Text exposition format, for the textfile collector of the Prometheus node exporter."""
+        lines = []
+        with self.lock:
+            lines.extend(get_prometheus_header("bulk_upload_elapsed_seconds", "gauge",
+                                               "Time since the start of the run."))
+            lines.append(f"bulk_upload_elapsed_seconds {time.perf_counter() - self.start:.3f}")
+
+            lines.extend(get_prometheus_header("bulk_upload_step_seconds", "gauge",
+                                               "Wall time spent in each step of the pipeline."))
+            for name, seconds in sorted(self.steps.items()):
+                lines.append(f'bulk_upload_step_seconds{{step="{name}"}} {seconds:.3f}')
+
+            lines.extend(get_prometheus_header("bulk_upload_api_call_duration_seconds", "histogram",
+                                               "Latency of the SDK calls per operation."))
+            for operation, histogram in sorted(self.operations.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'bulk_upload_api_call_duration_seconds_bucket{{operation="{operation}",'
+                                 f'le="{bound}"}} {cumulative}')
+                lines.append(f'bulk_upload_api_call_duration_seconds_sum{{operation="{operation}"}} '
+                             f'{histogram.sum:.6f}')
+                lines.append(f'bulk_upload_api_call_duration_seconds_count{{operation="{operation}"}} '
+                             f'{histogram.count}')
+
+            lines.extend(get_prometheus_header("bulk_upload_api_call_errors_total", "counter",
+                                               "Failed SDK calls per operation and error type."))
+            for (operation, error), count in sorted(self.errors.items()):
+                lines.append(f'bulk_upload_api_call_errors_total{{operation="{operation}",error="{error}"}} {count}')
+
+            lines.extend(get_prometheus_header("bulk_upload_api_calls_in_flight", "gauge",
+                                               "SDK calls started and not returned yet."))
+            lines.append(f"bulk_upload_api_calls_in_flight {self.in_flight}")
+
+            for name, value in sorted(self.counters.items()):
+                lines.extend(get_prometheus_header(f"bulk_upload_{name}_total", "counter", None))
+                lines.append(f"bulk_upload_{name}_total {value}")
+
+            lines.extend(get_prometheus_header("bulk_upload_queue_depth", "gauge", "Items waiting in each queue."))
+            for name, depth in sorted(self.queue_depths.items()):
+                lines.append(f'bulk_upload_queue_depth{{queue="{name}"}} {depth}')
+            lines.extend(get_prometheus_header("bulk_upload_queue_max_depth", "gauge",
+                                               "Highest sampled depth of each queue."))
+            for name, depth in sorted(self.max_queue_depths.items()):
+                lines.append(f'bulk_upload_queue_max_depth{{queue="{name}"}} {depth}')
+
+        return "\n".join(lines) + "\n"
+
+
+def get_prometheus_header(name: str, metric_type: str, help_text: str = None) -> [str]:
+    header = [f"# HELP {name} {help_text}"] if help_text is not None else []
+    header.append(f"# TYPE {name} {metric_type}")
+    return header
+
+
+def write_atomically(path: str, content: str):
+    """Readers polling the file never see it half written."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temporary_path, path)
+
+
+class MetricsReporter(object):
+    """Samples the queues every second and writes the metrics every interval and once stopped.
+
+    An empty path disables the matching output, an interval of 0 only writes the metrics at the end of the run.
+    """
+
+    def __init__(self, run_metrics: RunMetrics, json_file: str, prometheus_file: str, interval: float,
+                 sample_interval: float = 1.0):
+        self.metrics = run_metrics
+        self.json_file = json_file
+        self.prometheus_file = prometheus_file
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._report, name="metrics-reporter", daemon=True)
+
+    def start(self):
+        instrument_sdk()
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        self.metrics.sample_queues()
+        self.write()
+
+    def write(self):
+        try:
+            if self.json_file:
+                write_atomically(self.json_file, json.dumps(self.metrics.get_summary(), indent=4) + "\n")
+            if self.prometheus_file:
+                write_atomically(self.prometheus_file, self.metrics.to_prometheus())
+        except OSError as e:
+            logger.warning(f"Failed to write the metrics: {e}")
+
+    def _report(self):
+        last_write = time.monotonic()
+        while not self.stopping.wait(self.sample_interval):
+            self.metrics.sample_queues()
+            if 0 < self.interval <= time.monotonic() - last_write:
+                self.write()
+                last_write = time.monotonic()
+
+
+def instrument_function(operation: str, function):
+    @functools.wraps(function)
+    def instrumented(*args, **kwargs):
+        metrics.start_call()
+        start = time.perf_counter()
+        try:
+            with tracer.span(operation, "sdk"):
+                result = function(*args, **kwargs)
+        except BaseException as e:
+            metrics.observe_call(operation, time.perf_counter() - start, e)
+            raise
+        metrics.observe_call(operation, time.perf_counter() - start)
+        return result
+
+    instrumented.instrumented_function = function
+    return instrumented
+
+
+def instrument_sdk(module=None):
+    """Times and traces every public function of the assets module of the SDK, whichever component calls it.
+
+    Functions already instrumented are left as is, so starting several runs in the process doesn't time them twice.
+    """
+    module = module if module is not None else uc.assets
+    for name, value in list(vars(module).items()):
+        if name.startswith("_") or not inspect.isroutine(value) or hasattr(value, "instrumented_function"):
+            continue
+        setattr(module, name, instrument_function(name, value))
+
+
+metrics = RunMetrics()
@@ -21,6 +21,26 @@ class DependencyStrategy(str, Enum):
     ASSET_REFERENCE = "reference"
 
 
+class UploadOrder(str, Enum):
+    MAPPER = "mapper"
+    LARGEST_FIRST = "largestFirst"
+    SMALLEST_FIRST = "smallestFirst"
+    BIN_PACKING = "binPacking"
+    LOCALITY = "locality"
+
+
+class UploadEngine(str, Enum):
+    THREADS = "threads"
+    ASYNCIO = "asyncio"
+
+
+class ProgressMode(str, Enum):
+    AUTO = "auto"
+    LIVE = "live"
+    LINES = "lines"
+    OFF = "off"
+
+
 class FileSource(str, Enum):
     LOCAL = "local"
     VCS = "vcs"
@@ -126,13 +146,61 @@ class AppSettings(object):
     DEFAULT_PARALLEL_CREATION_EDIT = 20
     DEFAULT_PARALLEL_ASSET_UPLOAD = 5
     DEFAULT_PARALLEL_FILE_UPLOAD_PER_ASSET = 5
+    DEFAULT_PARALLEL_FREEZE = 50
     DEFAULT_HTTP_TIMEOUT = 300
+    DEFAULT_CLOUD_CACHE_TTL = 300
+    DEFAULT_TARGETED_LOOKUP_MAX_ASSETS = 1000
+    DEFAULT_STREAMING_UPLOAD = False
+    DEFAULT_STREAMING_QUEUE_SIZE = 100
+    DEFAULT_UPLOAD_ORDER = UploadOrder.MAPPER
+    DEFAULT_LOCALITY_AWARE_READS = False
+    DEFAULT_MAX_READS_PER_DEVICE = 2
+    DEFAULT_PREFETCH_BUFFER_SIZE = 256
+    DEFAULT_UPLOAD_ENGINE = UploadEngine.THREADS
+    DEFAULT_ASYNC_EXECUTOR_SIZE = 64
+    DEFAULT_UPLOAD_PROCESSES = 1
+    DEFAULT_BATCH_CONCURRENT_RUNS = 4
+    DEFAULT_BATCH_CONCURRENCY_BUDGET = 50
+    DEFAULT_METRICS_FILE = ""
+    DEFAULT_PROMETHEUS_FILE = ""
+    DEFAULT_METRICS_INTERVAL = 30
+    DEFAULT_TRACE_FILE = ""
+    DEFAULT_LOG_LEVEL = "info"
+    DEFAULT_LOG_FORMAT = "text"
+    DEFAULT_LOG_FILE = ""
+    DEFAULT_LOG_PROGRESS_INTERVAL = 10
+    DEFAULT_PROGRESS_MODE = ProgressMode.AUTO
+    DEFAULT_PROGRESS_INTERVAL = 30
 
     def __init__(self):
         self.parallel_creation_edit = self.DEFAULT_PARALLEL_CREATION_EDIT
         self.parallel_asset_upload = self.DEFAULT_PARALLEL_ASSET_UPLOAD
         self.parallel_file_upload_per_asset = self.DEFAULT_PARALLEL_FILE_UPLOAD_PER_ASSET
+        self.parallel_freeze = self.DEFAULT_PARALLEL_FREEZE
         self.http_timeout = self.DEFAULT_HTTP_TIMEOUT
+        self.cloud_cache_ttl = self.DEFAULT_CLOUD_CACHE_TTL
+        self.targeted_lookup_max_assets = self.DEFAULT_TARGETED_LOOKUP_MAX_ASSETS
+        self.streaming_upload = self.DEFAULT_STREAMING_UPLOAD
+        self.streaming_queue_size = self.DEFAULT_STREAMING_QUEUE_SIZE
+        self.upload_order = self.DEFAULT_UPLOAD_ORDER
+        self.locality_aware_reads = self.DEFAULT_LOCALITY_AWARE_READS
+        self.max_reads_per_device = self.DEFAULT_MAX_READS_PER_DEVICE
+        self.prefetch_buffer_size = self.DEFAULT_PREFETCH_BUFFER_SIZE
+        self.upload_engine = self.DEFAULT_UPLOAD_ENGINE
+        self.async_executor_size = self.DEFAULT_ASYNC_EXECUTOR_SIZE
+        self.upload_processes = self.DEFAULT_UPLOAD_PROCESSES
+        self.batch_concurrent_runs = self.DEFAULT_BATCH_CONCURRENT_RUNS
+        self.batch_concurrency_budget = self.DEFAULT_BATCH_CONCURRENCY_BUDGET
+        self.metrics_file = self.DEFAULT_METRICS_FILE
+        self.prometheus_file = self.DEFAULT_PROMETHEUS_FILE
+        self.metrics_interval = self.DEFAULT_METRICS_INTERVAL
+        self.trace_file = self.DEFAULT_TRACE_FILE
+        self.log_level = self.DEFAULT_LOG_LEVEL
+        self.log_format = self.DEFAULT_LOG_FORMAT
+        self.log_file = self.DEFAULT_LOG_FILE
+        self.log_progress_interval = self.DEFAULT_LOG_PROGRESS_INTERVAL
+        self.progress_mode = self.DEFAULT_PROGRESS_MODE
+        self.progress_interval = self.DEFAULT_PROGRESS_INTERVAL
         self.environment_variables = {}
         self.feature_flags = []
 
@@ -147,9 +215,33 @@ class AppSettings(object):
             self.parallel_creation_edit = data.get("parallelCreationEdit", self.DEFAULT_PARALLEL_CREATION_EDIT)
             self.parallel_asset_upload = data.get("parallelAssetUpload", self.DEFAULT_PARALLEL_ASSET_UPLOAD)
             self.parallel_file_upload_per_asset = data.get("parallelFileUploadPerAsset", self.DEFAULT_PARALLEL_FILE_UPLOAD_PER_ASSET)
+            self.parallel_freeze = data.get("parallelFreeze", self.DEFAULT_PARALLEL_FREEZE)
             self.environment_variables = data.get("environmentVariables", {})
             self.feature_flags = data.get("featureFlags", [])
             self.http_timeout = data.get("httpTimeout", self.DEFAULT_HTTP_TIMEOUT)
+            self.cloud_cache_ttl = data.get("cloudCacheTtl", self.DEFAULT_CLOUD_CACHE_TTL)
+            self.targeted_lookup_max_assets = data.get("targetedLookupMaxAssets", self.DEFAULT_TARGETED_LOOKUP_MAX_ASSETS)
+            self.streaming_upload = data.get("streamingUpload", self.DEFAULT_STREAMING_UPLOAD)
+            self.streaming_queue_size = data.get("streamingQueueSize", self.DEFAULT_STREAMING_QUEUE_SIZE)
+            self.upload_order = UploadOrder(data.get("uploadOrder", self.DEFAULT_UPLOAD_ORDER))
+            self.locality_aware_reads = data.get("localityAwareReads", self.DEFAULT_LOCALITY_AWARE_READS)
+            self.max_reads_per_device = data.get("maxReadsPerDevice", self.DEFAULT_MAX_READS_PER_DEVICE)
+            self.prefetch_buffer_size = data.get("prefetchBufferSize", self.DEFAULT_PREFETCH_BUFFER_SIZE)
+            self.upload_engine = UploadEngine(data.get("uploadEngine", self.DEFAULT_UPLOAD_ENGINE))
+            self.async_executor_size = data.get("asyncExecutorSize", self.DEFAULT_ASYNC_EXECUTOR_SIZE)
+            self.upload_processes = data.get("uploadProcesses", self.DEFAULT_UPLOAD_PROCESSES)
+            self.batch_concurrent_runs = data.get("batchConcurrentRuns", self.DEFAULT_BATCH_CONCURRENT_RUNS)
+            self.batch_concurrency_budget = data.get("batchConcurrencyBudget", self.DEFAULT_BATCH_CONCURRENCY_BUDGET)
+            self.metrics_file = data.get("metricsFile", self.DEFAULT_METRICS_FILE)
+            self.prometheus_file = data.get("prometheusFile", self.DEFAULT_PROMETHEUS_FILE)
+            self.metrics_interval = data.get("metricsInterval", self.DEFAULT_METRICS_INTERVAL)
+            self.trace_file = data.get("traceFile", self.DEFAULT_TRACE_FILE)
+            self.log_level = data.get("logLevel", self.DEFAULT_LOG_LEVEL)
+            self.log_format = data.get("logFormat", self.DEFAULT_LOG_FORMAT)
+            self.log_file = data.get("logFile", self.DEFAULT_LOG_FILE)
+            self.log_progress_interval = data.get("logProgressInterval", self.DEFAULT_LOG_PROGRESS_INTERVAL)
+            self.progress_mode = ProgressMode(data.get("progressMode", self.DEFAULT_PROGRESS_MODE))
+            self.progress_interval = data.get("progressInterval", self.DEFAULT_PROGRESS_INTERVAL)
 
     def is_feature_flag_enabled(self, feature_flag: FeatureFlags):
         return feature_flag in self.feature_flags
@@ -159,6 +251,7 @@ class AppSettings(object):
     "parallelCreationEdit": {self.parallel_creation_edit},
     "parallelAssetUpload": {self.parallel_asset_upload},
     "parallelFileUploadPerAsset": {self.parallel_file_upload_per_asset},
+    "parallelFreeze": {self.parallel_freeze},
     "environmentVariables": {self.environment_variables},
     "featureFlags": {self.feature_flags}
 }}
@@ -187,6 +280,9 @@ class AssetInfo(object):
         self.preview_files = []
         self.is_frozen_in_cloud = False
         self.customization = AssetCustomization()
+        self.cloud_customization_signature = None
+        self.files_up_to_date = False
+        self.is_up_to_date = False
 
     def to_csv_row(self, metadata_columns: []) -> [str]:
         files_csv = "\n".join([f.to_csv() for f in self.files])
@@ -301,6 +397,28 @@ class AssetCustomization(object):
         self.description = ""
         self.collections = []
 
+    def get_signature(self) -> tuple:
+        """Comparable snapshot of the decorations sent to the cloud: tags, metadata and description."""
+        metadata = tuple(sorted((m.field_definition, repr(m.field_value)) for m in self.metadata))
+        return tuple(sorted(self.tags)), metadata, self.description if self.description is not None else ""
+
+    def is_applied_to(self, cloud_customization: "AssetCustomization") -> bool:
+        """Whether applying these decorations would leave the cloud decorations unchanged."""
+        if len(self.tags) > 0 and set(self.tags) != set(cloud_customization.tags):
+            return False
+
+        cloud_metadata = {m.field_definition: m.field_value for m in cloud_customization.metadata}
+        for metadata in self.metadata:
+            if metadata.field_definition not in cloud_metadata \
+                    or cloud_metadata[metadata.field_definition] != metadata.field_value:
+                return False
+
+        if self.description is not None and self.description != "" \
+                and self.description != cloud_customization.description:
+            return False
+
+        return True
+
 
 class Metadata(object):
     def __init__(self):
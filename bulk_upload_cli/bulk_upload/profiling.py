@@ -0,0 +1,168 @@
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from collections import Counter
+from contextlib import contextmanager
+
+TRACEMALLOC_FRAMES = 5
+
+logger = logging.getLogger(__name__)
+
+
+def get_thread_group(thread_name: str) -> str:
+    """Workers of the same pool are merged, file-upload-3 becomes file-upload."""
+    return re.sub(r"[-_]\d+$", "", thread_name) or thread_name
+
+
+class StackSampler(object):
+    """Samples the stacks of every thread at a fixed interval, from a thread of its own.
+
+    cProfile only follows the thread enabling it and slows down every call, the sampler covers the worker threads at a
+    cost independent of the number of calls. Threads are sampled whether they run or wait, so the time spent waiting
+    on the network shows up as well. The stacks are counted in the collapsed format read by flamegraph.pl and
+    speedscope, rooted at the name of the thread pool.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self.labels = {}
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def get_label(self, code) -> str:
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self):
+        own_thread = threading.get_ident()
+        while not self.stopping.wait(self.interval):
+            groups = {thread.ident: get_thread_group(thread.name) for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(self.get_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(groups.get(thread_id, "thread"))
+                self.counts[";".join(reversed(stack))] += 1
+
+            self.samples += 1
+
+
+class StepProfile(object):
+    def __init__(self, name: str, path_prefix: str):
+        self.name = name
+        self.path_prefix = path_prefix
+        self.elapsed = 0.0
+        self.peak_memory = 0
+        self.samples = 0
+
+
+class StepProfiler(object):
+    """Profiles each step of the pipeline separately while enabled.
+
+    For every step, writes a cProfile of the thread running the step (.pstats) and the sampled stacks of all the
+    threads (.collapsed). Tracing the memory allocations slows every allocation down, so it only runs in memory mode,
+    which also writes the peak memory of each step and a tracemalloc snapshot taken at its end (.tracemalloc).
+    A single step is profiled at a time, steps starting while another one is profiled run without profiling.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.folder = None
+        self.sample_interval = 0.01
+        self.memory = False
+        self.lock = threading.Lock()
+        self.started_tracemalloc = False
+        self.profiles = []
+
+    def start(self, folder: str, sample_interval: float = 0.01, memory: bool = False):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.sample_interval = sample_interval
+        self.memory = memory
+        self.profiles = []
+        self.started_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.enabled = True
+
+    def stop(self):
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        self.print_summary()
+
+    @contextmanager
+    def step(self, name: str):
+        if not self.enabled or not self.lock.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            profile = StepProfile(name, os.path.join(self.folder, f"{len(self.profiles) + 1:02d}_{name}"))
+            sampler = StackSampler(self.sample_interval)
+            call_profiler = cProfile.Profile()
+
+            if self.memory:
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            sampler.start()
+            call_profiler.enable()
+            try:
+                yield
+            finally:
+                call_profiler.disable()
+                sampler.stop()
+                profile.elapsed = time.perf_counter() - start
+                profile.samples = sampler.samples
+
+                call_profiler.dump_stats(f"{profile.path_prefix}.pstats")
+                sampler.write(f"{profile.path_prefix}.collapsed")
+                if self.memory:
+                    _, profile.peak_memory = tracemalloc.get_traced_memory()
+                    tracemalloc.take_snapshot().dump(f"{profile.path_prefix}.tracemalloc")
+                self.profiles.append(profile)
+        finally:
+            self.lock.release()
+
+    def print_summary(self):
+        logger.info(f"Profiles written to {self.folder}:")
+        for profile in self.profiles:
+            memory = f"peak memory {profile.peak_memory / 1024 ** 2:>8.1f} MiB, " if self.memory else ""
+            logger.info(f"  {os.path.basename(profile.path_prefix):<24} {profile.elapsed:>8.2f}s, "
+                        f"{memory}{profile.samples} stack samples")
+        logger.info("Read the .pstats files with python -m pstats or snakeviz and the .collapsed files with "
+                    "flamegraph.pl or speedscope.")
+        if self.memory:
+            logger.info("Read the .tracemalloc files with tracemalloc.Snapshot.load.")
+
+
+profiler = StepProfiler()
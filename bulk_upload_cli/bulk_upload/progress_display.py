@@ -0,0 +1,152 @@
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+
+from collections import Counter, deque
+
+from bulk_upload.metrics import RunMetrics, metrics
+from bulk_upload.models import ProgressMode
+from shared.log_backend import log_backend
+
+logger = logging.getLogger(__name__)
+
+# files looked up before their upload fail until they are uploaded, they are not errors of the run
+EXPECTED_ERROR_OPERATIONS = {"get_file"}
+
+
+def format_bytes(size: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ThroughputWindow(object):
+    """Rate of a growing count over the last window seconds, from samples taken at a regular interval."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.samples = deque()
+
+    def add(self, now: float, value: int):
+        self.samples.append((now, value))
+        # the oldest sample kept is the last one older than the window, so the rate always spans the window
+        while len(self.samples) > 2 and self.samples[1][0] <= now - self.window:
+            self.samples.popleft()
+
+    def get_rate(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        (first_time, first_value), (last_time, last_value) = self.samples[0], self.samples[-1]
+        return (last_value - first_value) / (last_time - first_time) if last_time > first_time else 0.0
+
+
+class ProgressDisplay(object):
+    """Shows the progress of the uploads, computed from the counters of the run metrics by a thread of its own.
+
+    The workers only increment the counters, the display reads them at a fixed rate. In a terminal the status line is
+    drawn below the messages twice a second. When the output is redirected, in CI or with JSON logs, a summary line is
+    logged every interval instead, an interval of 0 only logging it once stopped. Starting the display while it is
+    shown, like the runs of a batch do, only keeps it shown until the last of them stops it.
+    """
+
+    def __init__(self, run_metrics: RunMetrics, refresh_interval: float = 0.5, window: float = 30.0):
+        self.metrics = run_metrics
+        self.refresh_interval = refresh_interval
+        self.window = window
+        self.lock = threading.Lock()
+        self.users = 0
+        self.live = False
+        self.interval = 0.0
+        self.baseline = Counter()
+        self.baseline_errors = Counter()
+        self.start_time = 0.0
+        self.throughput = None
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self, mode: ProgressMode, interval: float, log_format: str = "text"):
+        with self.lock:
+            self.users += 1
+            if self.users > 1 or mode == ProgressMode.OFF:
+                return
+
+            self.live = mode == ProgressMode.LIVE or (mode == ProgressMode.AUTO and log_format == "text"
+                                                      and is_interactive_console())
+            self.interval = interval
+            # counters of previous runs of the process are not part of this one
+            self.baseline, _, self.baseline_errors = self.metrics.get_progress()
+            self.start_time = time.monotonic()
+            self.throughput = ThroughputWindow(self.window)
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._refresh, name="progress-display", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            self.users -= 1
+            if self.users > 0 or self.thread is None:
+                return
+
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+
+        if self.live:
+            log_backend.set_status("")
+        logger.info(self.get_status(time.monotonic()))
+
+    def get_status(self, now: float) -> str:
+        counters, in_flight, errors = self.metrics.get_progress()
+        counters.subtract(self.baseline)
+        errors.subtract(self.baseline_errors)
+
+        files_done = (counters["files_uploaded"] + counters["files_skipped"] + counters["files_failed"]
+                      + counters["files_deduplicated"])
+        bytes_done = (counters["bytes_uploaded"] + counters["bytes_skipped"] + counters["bytes_failed"]
+                      + counters["bytes_deduplicated"])
+        self.throughput.add(now, counters["bytes_uploaded"])
+        rate = self.throughput.get_rate()
+        error_count = sum(count for operation, count in errors.items() if operation not in EXPECTED_ERROR_OPERATIONS)
+
+        status = (f"Assets {counters['assets_uploaded']}/{counters['assets_to_upload']} | "
+                  f"Files {files_done}/{counters['files_to_upload']} | "
+                  f"{format_bytes(bytes_done)}/{format_bytes(counters['bytes_to_upload'])} | "
+                  f"{format_bytes(rate)}/s | {in_flight} in flight | "
+                  f"{counters['retries']} retries, {error_count} errors, {counters['files_failed']} files failed | "
+                  f"elapsed {format_duration(now - self.start_time)}")
+
+        remaining = counters["bytes_to_upload"] - bytes_done
+        if remaining > 0 and rate > 0:
+            status += f", ETA {format_duration(remaining / rate)}"
+        return status
+
+    def _refresh(self):
+        last_line = time.monotonic()
+        while not self.stopping.wait(self.refresh_interval):
+            now = time.monotonic()
+            # the window is sampled at the refresh rate, summary lines are only written every interval
+            status = self.get_status(now)
+            if self.live:
+                # a status line wrapped by the terminal can't be cleared
+                log_backend.set_status(status[:shutil.get_terminal_size().columns - 1])
+            elif 0 < self.interval <= now - last_line:
+                logger.info(status)
+                last_line = now
+
+
+def is_interactive_console() -> bool:
+    return sys.stdout.isatty() and not os.environ.get("CI") and os.environ.get("TERM") != "dumb"
+
+
+progress_display = ProgressDisplay(metrics)
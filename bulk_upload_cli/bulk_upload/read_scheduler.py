@@ -0,0 +1,141 @@
+import os
+import threading
+
+from collections import deque
+from bulk_upload.models import FileInfo
+from bulk_upload.metrics import metrics
+
+
+class LocalReadScheduler(object):
+    """Reads the local source files ahead of their upload, in the order they are queued.
+
+    The SDK reads the files itself from their path. Prefetching reads them once, sequentially and in locality order,
+    so that the upload reads are served by the operating system cache instead of seeking on a disk or waiting on a
+    network share. At most max_reads_per_device files are read at once from the same device, reads go through a fixed
+    pool of buffers, and no more than prefetch_bytes are read ahead of the uploads.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, max_reads_per_device: int = 2, prefetch_bytes: int = 256 * 1024 ** 2, workers: int = 4):
+        self.max_reads_per_device = max(1, max_reads_per_device)
+        self.prefetch_bytes = prefetch_bytes
+        self.condition = threading.Condition()
+        self.pending_files = deque()
+        self.device_semaphores = {}
+        self.prefetched_sizes = {}
+        self.prefetched_bytes = 0
+        self.released_paths = set()
+        self.buffers = deque(bytearray(self.CHUNK_SIZE) for _ in range(max(1, workers)))
+        self.stopping = False
+        self.files_read = 0
+        self.bytes_read = 0
+        self.threads = [threading.Thread(target=self._prefetch, name=f"read-prefetch-{i}", daemon=True)
+                        for i in range(max(1, workers))]
+
+    def start(self):
+        metrics.register_queue("read_prefetch_files", self.get_pending_count)
+        for thread in self.threads:
+            thread.start()
+
+    def prefetch(self, files: [FileInfo]):
+        with self.condition:
+            self.pending_files.extend(str(file.path) for file in files)
+            self.condition.notify_all()
+
+    def release(self, file: FileInfo):
+        """To be called once the file is uploaded or skipped, frees its place in the prefetch budget."""
+        path = str(file.path)
+        with self.condition:
+            size = self.prefetched_sizes.pop(path, None)
+            if size is None:
+                # not read yet, the prefetch is no longer needed
+                self.released_paths.add(path)
+            else:
+                self.prefetched_bytes -= size
+            self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.pending_files.clear()
+            self.condition.notify_all()
+
+        for thread in self.threads:
+            thread.join()
+        metrics.unregister_queue("read_prefetch_files", self.get_pending_count)
+
+    def get_pending_count(self) -> int:
+        return len(self.pending_files)
+
+    def get_summary(self) -> str:
+        return (f"Local read prefetch: {self.files_read} files read ahead ({self.bytes_read} bytes), "
+                f"at most {self.max_reads_per_device} reads per device")
+
+    def _next_file(self) -> (str, int):
+        while True:
+            with self.condition:
+                while not self.pending_files and not self.stopping:
+                    self.condition.wait()
+                if self.stopping:
+                    return None, 0
+                path = self.pending_files.popleft()
+                if path in self.released_paths:
+                    self.released_paths.discard(path)
+                    continue
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            with self.condition:
+                # a file larger than the budget is read alone
+                while not self.stopping and path not in self.released_paths and self.prefetched_bytes > 0 \
+                        and self.prefetched_bytes + stat.st_size > self.prefetch_bytes:
+                    self.condition.wait()
+                if self.stopping:
+                    return None, 0
+                if path in self.released_paths:
+                    self.released_paths.discard(path)
+                    continue
+                if path in self.prefetched_sizes:
+                    # the same file is used by several assets and was already read
+                    continue
+                self.prefetched_sizes[path] = stat.st_size
+                self.prefetched_bytes += stat.st_size
+                return path, stat.st_dev
+
+    def _get_device_semaphore(self, device: int) -> threading.Semaphore:
+        with self.condition:
+            semaphore = self.device_semaphores.get(device)
+            if semaphore is None:
+                semaphore = threading.Semaphore(self.max_reads_per_device)
+                self.device_semaphores[device] = semaphore
+            return semaphore
+
+    def _prefetch(self):
+        while True:
+            path, device = self._next_file()
+            if path is None:
+                return
+
+            with self._get_device_semaphore(device):
+                with self.condition:
+                    buffer = self.buffers.popleft()
+                try:
+                    read = 0
+                    with open(path, "rb", buffering=0) as f:
+                        while True:
+                            count = f.readinto(buffer)
+                            if not count:
+                                break
+                            read += count
+                    with self.condition:
+                        self.files_read += 1
+                        self.bytes_read += read
+                except OSError:
+                    pass
+                finally:
+                    with self.condition:
+                        self.buffers.append(buffer)
@@ -0,0 +1,25 @@
+import unity_cloud as uc
+
+from bulk_upload.models import AppSettings
+from shared.utils import log_info
+
+
+def initialize_sdk(app_settings: AppSettings):
+    uc.initialize()
+    uc.set_timeout(app_settings.http_timeout)
+
+
+def login(key_id: str, key: str):
+    """Uses the service account when its key is set, the user account otherwise."""
+    if key is not None and key_id != "" and key_id is not None and key != "":
+        uc.identity.service_account.use(key_id, key)
+    else:
+        log_info("Logging in with user account in progress")
+        login_with_user_account()
+
+
+def login_with_user_account():
+    uc.identity.user_login.use()
+    auth_state = uc.identity.user_login.get_authentication_state()
+    if auth_state != uc.identity.user_login.Authentication_State.LOGGED_IN:
+        uc.identity.user_login.login()
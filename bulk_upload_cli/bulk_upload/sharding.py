@@ -0,0 +1,199 @@
+import json
+import zlib
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+from bulk_upload.models import AssetInfo, ProjectUploaderConfig
+from shared.utils import log_info, log_warning
+
+# ratio of the largest shard to the average shard above which the sharding is reported as unbalanced
+IMBALANCE_WARNING_RATIO = 2.0
+
+
+class Shard(object):
+    """Part i of N of the assets of a run, written i/N on the command line with 0 <= i < N."""
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or index < 0 or index >= count:
+            raise ValueError(f"Invalid shard {index}/{count}, expected i/N with 0 <= i < N")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, value: str) -> "Shard":
+        try:
+            index, count = value.split("/")
+            return cls(int(index), int(count))
+        except ValueError as e:
+            raise ValueError(f"Invalid shard '{value}', expected i/N, for example 0/4") from e
+
+    def contains_key(self, key: str) -> bool:
+        return self.get_key_index(key) == self.index
+
+    def get_key_index(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.count
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def get_name_key(asset: AssetInfo, config: ProjectUploaderConfig) -> str:
+    return asset.name if config.case_sensitive else asset.name.lower()
+
+
+def get_shard_keys(assets: [AssetInfo], config: ProjectUploaderConfig) -> [str]:
+    """Assets referencing each other or sharing a name must be in the same shard: references are set between assets
+    of the same run, and assets with the same name are matched in order with the cloud assets of that name.
+    Such groups are keyed by the smallest name they contain, other assets by their own name."""
+    parents = list(range(len(assets)))
+
+    def find(node: int) -> int:
+        while parents[node] != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    def union(first: int, second: int):
+        first_root, second_root = find(first), find(second)
+        if first_root != second_root:
+            parents[max(first_root, second_root)] = min(first_root, second_root)
+
+    first_with_name = {}
+    for i, asset in enumerate(assets):
+        union(i, first_with_name.setdefault(get_name_key(asset, config), i))
+        for dependency in asset.dependencies:
+            union(i, dependency)
+
+    group_keys = {}
+    for i, asset in enumerate(assets):
+        root = find(i)
+        name_key = get_name_key(asset, config)
+        if root not in group_keys or name_key < group_keys[root]:
+            group_keys[root] = name_key
+
+    return [group_keys[find(i)] for i in range(len(assets))]
+
+
+def select_shard_assets(assets: [AssetInfo], shard: Shard, config: ProjectUploaderConfig) -> [AssetInfo]:
+    """Returns the assets of the shard with their dependencies pointing to their new index."""
+    keys = get_shard_keys(assets, config)
+    check_shard_balance(keys, shard)
+    selected_indices = [i for i in range(len(assets)) if shard.contains_key(keys[i])]
+    new_indices = {old_index: new_index for new_index, old_index in enumerate(selected_indices)}
+
+    selected_assets = []
+    for i in selected_indices:
+        asset = assets[i]
+        if len(asset.dependencies) > 0:
+            asset.dependencies = [new_indices[dependency] for dependency in asset.dependencies]
+        selected_assets.append(asset)
+    return selected_assets
+
+
+def check_shard_balance(keys: [str], shard: Shard):
+    """Every shard computes the keys of all the assets, so each of them can tell how the assets are spread."""
+    if shard.count < 2 or len(keys) == 0:
+        return
+
+    shard_sizes = Counter(shard.get_key_index(key) for key in keys)
+    largest_shard, largest_size = shard_sizes.most_common(1)[0]
+    average_size = len(keys) / shard.count
+    log_info(f"Shard {shard} has {shard_sizes[shard.index]} of {len(keys)} assets, "
+             f"the largest shard has {largest_size}")
+    if largest_size <= average_size * IMBALANCE_WARNING_RATIO:
+        return
+
+    largest_group_size = Counter(keys).most_common(1)[0][1]
+    log_warning(f"Unbalanced shards: shard {largest_shard}/{shard.count} has {largest_size} assets for an average of "
+                f"{average_size:.0f}. Assets that reference each other or share a name stay in the same shard, "
+                f"the largest such group has {largest_group_size} assets.")
+
+
+def iter_shard_assets(assets: Iterable[AssetInfo], shard: Shard, config: ProjectUploaderConfig) -> Iterator[AssetInfo]:
+    """Streaming version of select_shard_assets, for assets without dependencies."""
+    for asset in assets:
+        if shard.contains_key(get_name_key(asset, config)):
+            yield asset
+
+
+def get_manifest_path(shard: Shard) -> str:
+    return f"manifest_shard_{shard.index}_of_{shard.count}.json"
+
+
+def write_shard_manifest(path: str, shard: Shard, config: ProjectUploaderConfig, assets: [AssetInfo]):
+    manifest_assets = [{
+        "name": asset.name,
+        "assetId": asset.am_id,
+        "version": asset.version,
+        "alreadyInCloud": asset.already_in_cloud,
+        "upToDate": asset.is_up_to_date,
+        "files": len(asset.files),
+    } for asset in assets]
+
+    manifest = {
+        "shard": str(shard),
+        "organizationId": config.org_id,
+        "projectId": config.project_id,
+        "completedAt": datetime.now(timezone.utc).isoformat(),
+        "summary": get_manifest_summary(manifest_assets),
+        "assets": manifest_assets,
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    log_info(f"Shard manifest written to {path}")
+
+
+def get_manifest_summary(manifest_assets: [dict]) -> dict:
+    failed = len([asset for asset in manifest_assets if not asset["assetId"]])
+    up_to_date = len([asset for asset in manifest_assets if asset["assetId"] and asset["upToDate"]])
+    updated = len([asset for asset in manifest_assets if asset["assetId"] and asset["alreadyInCloud"]
+                   and not asset["upToDate"]])
+    return {
+        "assets": len(manifest_assets),
+        "created": len(manifest_assets) - failed - up_to_date - updated,
+        "updated": updated,
+        "upToDate": up_to_date,
+        "failed": failed,
+    }
+
+
+def merge_manifests(paths: [str], output_path: str) -> dict:
+    """Combines the manifests of the shards of a run, all of them must target the same project."""
+    manifests = []
+    for path in paths:
+        with open(path) as f:
+            manifests.append(json.load(f))
+
+    if len({(manifest["organizationId"], manifest["projectId"]) for manifest in manifests}) > 1:
+        raise ValueError("The manifests target different projects")
+
+    counts = {Shard.parse(manifest["shard"]).count for manifest in manifests}
+    if len(counts) > 1:
+        raise ValueError(f"The manifests come from runs with different shard counts: {sorted(counts)}")
+
+    shards = [Shard.parse(manifest["shard"]).index for manifest in manifests]
+    duplicates = sorted({index for index in shards if shards.count(index) > 1})
+    if len(duplicates) > 0:
+        raise ValueError(f"Shards listed more than once: {duplicates}")
+
+    count = counts.pop()
+    missing_shards = [index for index in range(count) if index not in shards]
+    assets = [asset for manifest in sorted(manifests, key=lambda m: Shard.parse(m["shard"]).index)
+              for asset in manifest["assets"]]
+
+    merged = {
+        "shards": f"{len(manifests)}/{count}",
+        "missingShards": missing_shards,
+        "organizationId": manifests[0]["organizationId"],
+        "projectId": manifests[0]["projectId"],
+        "summary": get_manifest_summary(assets),
+        "assets": assets,
+    }
+    with open(output_path, "w") as f:
+        json.dump(merged, f, indent=4)
+
+    log_info(f"Merged {len(manifests)} of {count} shards into {output_path}: {merged['summary']}")
+    if len(missing_shards) > 0:
+        log_warning(f"Missing shards: {missing_shards}")
+    return merged
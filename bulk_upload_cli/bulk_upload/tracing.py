@@ -0,0 +1,243 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+from bulk_upload.models import AssetInfo, FileInfo
+
+logger = logging.getLogger(__name__)
+
+
+class Span(object):
+    """A complete event of the trace, its parent is the innermost span open on the thread when it starts."""
+
+    __slots__ = ["tracer", "name", "category", "args", "id", "parent", "start"]
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, parent: int, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.id = None
+        self.parent = parent
+        self.start = 0
+
+    def __enter__(self):
+        stack = self.tracer.get_stack()
+        self.id = next(self.tracer.ids)
+        if self.parent is None:
+            self.parent = stack[-1] if len(stack) > 0 else self.tracer.get_step_span()
+        stack.append(self.id)
+        if self.category == "step":
+            self.tracer.step_spans.append(self.id)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        stack = self.tracer.get_stack()
+        if len(stack) > 0:
+            stack.pop()
+        if self.category == "step":
+            self.tracer.step_spans.remove(self.id)
+        args = dict(self.args, id=self.id, parent=self.parent)
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        self.tracer.add_event({"name": self.name, "cat": self.category, "ph": "X",
+                               "ts": self.tracer.get_timestamp(self.start), "dur": (end - self.start) / 1000,
+                               "tid": threading.get_ident(), "args": args})
+
+
+class Activation(object):
+    """Makes a span started on another thread the parent of the spans opened on this thread."""
+
+    __slots__ = ["tracer", "span_id"]
+
+    def __init__(self, tracer: "Tracer", span_id: int):
+        self.tracer = tracer
+        self.span_id = span_id
+
+    def __enter__(self):
+        self.tracer.get_stack().append(self.span_id)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        stack = self.tracer.get_stack()
+        if len(stack) > 0:
+            stack.pop()
+
+
+class NullSpan(object):
+    """Returned while tracing is disabled, so that a disabled tracer only costs a call."""
+
+    id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer(object):
+    """Records spans of the pipeline steps, assets, file uploads and SDK calls to a trace file.
+
+    The file uses the JSON array format of the Chrome trace events, opened by Perfetto and chrome://tracing. Events
+    are written by a background thread every second so that the memory used by the trace stays flat on long runs.
+    Spans opened on a thread without any open span, like the workers of a pool, are attached to the latest step.
+    Work outliving the function starting it, like the files of an asset, is recorded as an async span.
+    """
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.enabled = False
+        self.path = None
+        self.file = None
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.events = []
+        self.event_count = 0
+        self.local = threading.local()
+        self.ids = itertools.count(1)
+        self.step_spans = []
+        self.start_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self, path: str):
+        """Does nothing when path is empty, leaving tracing disabled."""
+        if not path or self.enabled:
+            return
+
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write("[")
+        self.events = []
+        self.event_count = 0
+        self.start_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.stopping.clear()
+        self.enabled = True
+        self.add_event({"name": "process_name", "ph": "M", "tid": 0, "args": {"name": "bulk upload"}})
+        self.thread = threading.Thread(target=self._flush_periodically, name="trace-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        self.stopping.set()
+        self.thread.join()
+        self.flush()
+        self.file.write("\n]\n")
+        self.file.close()
+        self.file = None
+        logger.info(f"Trace of {self.event_count} events written to {self.path}")
+
+    def span(self, name: str, category: str = "function", parent: int = None, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, parent, args)
+
+    def activate(self, span_id: int):
+        if not self.enabled or span_id is None:
+            return NULL_SPAN
+        return Activation(self, span_id)
+
+    def begin_async(self, name: str, category: str, **args) -> int:
+        if not self.enabled:
+            return None
+
+        stack = self.get_stack()
+        span_id = next(self.ids)
+        args["parent"] = stack[-1] if len(stack) > 0 else self.get_step_span()
+        self.add_event({"name": name, "cat": category, "ph": "b", "id": span_id, "ts": self.get_timestamp(),
+                        "tid": threading.get_ident(), "args": args})
+        return span_id
+
+    def end_async(self, span_id: int, name: str, category: str, **args):
+        if not self.enabled or span_id is None:
+            return
+
+        self.add_event({"name": name, "cat": category, "ph": "e", "id": span_id, "ts": self.get_timestamp(),
+                        "tid": threading.get_ident(), "args": args})
+
+    def get_stack(self) -> list:
+        stack = getattr(self.local, "stack", None)
+        # threads outliving a trace are named again in the next one
+        if stack is None or self.local.trace_start != self.start_ns:
+            stack = self.local.stack = []
+            self.local.trace_start = self.start_ns
+            thread = threading.current_thread()
+            self.add_event({"name": "thread_name", "ph": "M", "tid": thread.ident, "args": {"name": thread.name}})
+        return stack
+
+    def get_step_span(self) -> int:
+        step_spans = self.step_spans
+        return step_spans[-1] if len(step_spans) > 0 else None
+
+    def get_timestamp(self, perf_counter_ns: int = None) -> float:
+        """In microseconds since the start of the trace."""
+        if perf_counter_ns is None:
+            perf_counter_ns = time.perf_counter_ns()
+        return (perf_counter_ns - self.start_ns) / 1000
+
+    def add_event(self, event: dict):
+        event["pid"] = self.pid
+        with self.lock:
+            self.events.append(event)
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+
+        if len(events) == 0 or self.file is None:
+            return
+
+        separator = "\n" if self.event_count == 0 else ",\n"
+        self.file.write(separator + ",\n".join(json.dumps(event, separators=(",", ":")) for event in events))
+        self.file.flush()
+        self.event_count += len(events)
+
+    def _flush_periodically(self):
+        while not self.stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Failed to write the trace: {e}")
+
+
+def get_span_args(args: tuple) -> dict:
+    span_args = {}
+    for arg in args:
+        if isinstance(arg, AssetInfo):
+            span_args.setdefault("asset", arg.name)
+        elif isinstance(arg, FileInfo):
+            span_args.setdefault("file", str(arg.cloud_path))
+    return span_args
+
+
+def traced(category: str):
+    """Records a span named after the decorated function for each of its calls, with the asset and file it is called
+    with."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(function.__name__, category, **get_span_args(args)):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+tracer = Tracer()
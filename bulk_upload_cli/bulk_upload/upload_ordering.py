@@ -0,0 +1,66 @@
+import functools
+import heapq
+import os
+
+from bulk_upload.models import AssetInfo, FileInfo, UploadOrder
+
+
+def order_assets(assets: [AssetInfo], upload_order: UploadOrder, get_file_size, worker_count: int) -> [(AssetInfo, int)]:
+    """Returns the assets in submission order with the worker assigned to each of them, None when not assigned.
+
+    Bin packing assigns the assets from the largest to the least loaded worker (longest processing time first), so
+    that every worker ends up with about the same amount of bytes to upload.
+    """
+    if upload_order == UploadOrder.MAPPER:
+        return [(asset, None) for asset in assets]
+
+    if upload_order == UploadOrder.LOCALITY:
+        return [(asset, None) for asset in sorted(assets, key=get_asset_locality_key)]
+
+    sizes = [get_asset_size(asset, get_file_size) for asset in assets]
+    indices = sorted(range(len(assets)), key=lambda i: sizes[i], reverse=upload_order != UploadOrder.SMALLEST_FIRST)
+
+    if upload_order != UploadOrder.BIN_PACKING:
+        return [(assets[i], None) for i in indices]
+
+    loads = [(0, worker) for worker in range(max(1, worker_count))]
+    ordered_assets = []
+    for i in indices:
+        load, worker = heapq.heappop(loads)
+        ordered_assets.append((assets[i], worker))
+        heapq.heappush(loads, (load + sizes[i], worker))
+    return ordered_assets
+
+
+def order_files(files: [FileInfo], upload_order: UploadOrder, get_file_size) -> [FileInfo]:
+    if upload_order == UploadOrder.MAPPER:
+        return files
+
+    if upload_order == UploadOrder.LOCALITY:
+        return sorted(files, key=get_locality_key)
+
+    return sorted(files, key=get_file_size, reverse=upload_order != UploadOrder.SMALLEST_FIRST)
+
+
+def get_locality_key(file: FileInfo) -> (int, str, int):
+    """Files of the same device and directory are read one after the other, in the order of their inodes which
+    follows their position on disk on most file systems."""
+    return get_path_locality_key(str(file.path))
+
+
+def get_asset_locality_key(asset: AssetInfo) -> (bool, (int, str, int)):
+    # assets without files have nothing to read and go last
+    return len(asset.files) == 0, min((get_locality_key(file) for file in asset.files), default=(0, "", 0))
+
+
+@functools.lru_cache(maxsize=65536)
+def get_path_locality_key(path: str) -> (int, str, int):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, os.path.dirname(path), 0
+    return stat.st_dev, os.path.dirname(path), stat.st_ino
+
+
+def get_asset_size(asset: AssetInfo, get_file_size) -> int:
+    return sum(get_file_size(file) for file in asset.files)
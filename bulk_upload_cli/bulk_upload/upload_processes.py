@@ -0,0 +1,143 @@
+import copy
+import hashlib
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bulk_upload.assets_uploaders import CloudAssetUploader
+from bulk_upload.cloud_cache import cloud_cache
+from bulk_upload.models import AssetInfo, AppSettings, CollectionInfo, ProjectUploaderConfig
+from bulk_upload.sdk_session import initialize_sdk, login
+from shared.log_backend import log_backend
+
+logger = logging.getLogger(__name__)
+
+# state of the assets computed by the workers and needed by the parent for the following steps
+RESULT_ATTRIBUTES = ["am_id", "version", "already_in_cloud", "is_frozen_in_cloud", "files_up_to_date",
+                     "is_up_to_date", "cloud_customization_signature"]
+
+
+def get_worker_index(asset: AssetInfo, worker_count: int) -> int:
+    """Stable across runs and machines, assets with the same name go to the same worker, which knows the assets it
+    created when a creation timed out. The shards are split with the crc32 of the names, so the assets of a shard
+    share their crc32 modulo the shard count: any hash related to it, even of a salted name, would put them on a few
+    workers."""
+    digest = hashlib.sha256(asset.name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % worker_count
+
+
+def split_assets(asset_infos: [AssetInfo], worker_count: int) -> [[int]]:
+    indices = [[] for _ in range(worker_count)]
+    for i, asset in enumerate(asset_infos):
+        indices[get_worker_index(asset, worker_count)].append(i)
+    return indices
+
+
+def run_upload_worker(worker_index: int, indices: [int], assets: [AssetInfo], config: ProjectUploaderConfig,
+                      app_settings: AppSettings, listed_asset_ids: set) -> [(int, dict)]:
+    """Runs in a worker process with its own SDK session: creates the assets matched by the parent and uploads their
+    files."""
+    log_backend.configure(app_settings.log_level, app_settings.log_format, app_settings.log_file,
+                          app_settings.log_progress_interval)
+    try:
+        # a worker failing to log in fails on its own, the parent still finishes the assets of the other workers
+        initialize_sdk(app_settings)
+        login(config.key_id, config.key)
+        logger.info(f"Upload worker {worker_index} started with {len(assets)} assets")
+
+        uploader = CloudAssetUploader()
+        uploader.config = config
+        uploader.upload_order = app_settings.upload_order
+        uploader.listed_asset_ids = listed_asset_ids
+        uploader.create_matched_assets(assets, app_settings)
+        # allow the assets to be created with their dataset
+        uploader.wait_for_backend(10)
+        uploader.upload_files(assets, app_settings)
+        logger.info(uploader.content_index.get_summary())
+    finally:
+        # the worker process may be stopped before its exit handlers run
+        log_backend.stop()
+
+    return [(index, {attribute: getattr(asset, attribute) for attribute in RESULT_ATTRIBUTES})
+            for index, asset in zip(indices, assets)]
+
+
+class MultiProcessCloudAssetUploader(CloudAssetUploader):
+    """Splits the creation and file upload of the assets across worker processes, each with its own SDK session.
+
+    The parent looks the assets up in the cloud once and detects their changes, the workers only create and upload
+    them. The parent sets the references and the collections once every worker is done, then the tags and metadata.
+    Indexing with VCS integration and streaming runs stay in a single process.
+    """
+
+    def upload_assets(self, asset_infos: [AssetInfo], config: ProjectUploaderConfig, app_settings: AppSettings):
+        if config.vcs_integration is not None or asset_infos is None:
+            super().upload_assets(asset_infos, config, app_settings)
+            return
+
+        self.config = config
+        self.upload_order = app_settings.upload_order
+
+        if any(collection.exists_in_cloud is False for collection in config.collections):
+            logger.info("Creating collections")
+            self.create_collections(config.collections)
+
+        # a single lookup of the cloud assets, the workers get the id, version and state of the matched assets
+        self.match_assets(asset_infos, app_settings)
+
+        # collections reference every asset and are only needed by the parent
+        worker_config = copy.copy(config)
+        worker_config.collections = []
+
+        worker_count = app_settings.upload_processes
+        logger.info(f"Uploading assets with {worker_count} worker processes")
+        context = multiprocessing.get_context("spawn")
+        failed_indices = set()
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=context) as executor:
+            futures = {executor.submit(run_upload_worker, worker_index, indices, [asset_infos[i] for i in indices],
+                                       worker_config, app_settings, self.listed_asset_ids): (worker_index, indices)
+                       for worker_index, indices in enumerate(split_assets(asset_infos, worker_count))
+                       if len(indices) > 0}
+
+            for future in as_completed(futures):
+                worker_index, indices = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"Upload worker {worker_index} failed, its {len(indices)} assets are skipped: {e}")
+                    failed_indices.update(indices)
+                    continue
+
+                for index, result in results:
+                    for attribute, value in result.items():
+                        setattr(asset_infos[index], attribute, value)
+
+        # the assets were created by the workers
+        cloud_cache.invalidate_assets(self.config.org_id, self.config.project_id)
+
+        # the assets of a failed worker are left as they are, the following steps only apply to the others
+        done_assets = [asset for index, asset in enumerate(asset_infos) if index not in failed_indices]
+        done_ids = {id(asset) for asset in done_assets}
+
+        logger.info("Setting asset dependencies")
+        self.add_reference_edges([(source, target) for source, target in self.get_reference_edges(asset_infos)
+                                  if id(source) in done_ids], app_settings)
+
+        # sleep for 10 seconds to allow back-end to finish processing
+        self.wait_for_backend(10)
+        logger.info("Setting collections")
+        self.set_collections([self.get_collection_subset(collection, done_ids) for collection in config.collections])
+
+        # sleep for 5 seconds to allow back-end to finish processing
+        self.wait_for_backend(5)
+
+        self.decorate_assets(done_assets, app_settings)
+        if len(failed_indices) > 0:
+            raise RuntimeError(f"{len(failed_indices)} assets were not uploaded, their upload worker failed")
+        logger.info("Done uploading assets")
+
+    @staticmethod
+    def get_collection_subset(collection: CollectionInfo, asset_ids: {int}) -> CollectionInfo:
+        subset = copy.copy(collection)
+        subset.assets = [asset for asset in collection.assets if id(asset) in asset_ids]
+        return subset
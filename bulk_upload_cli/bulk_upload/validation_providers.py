@@ -4,7 +4,7 @@ import csv
 import subprocess
 import os
 import platform
-from shared.utils import execute_prompt
+from shared.utils import log_info, log_warning, execute_prompt
 
 
 class ValidationProvider(ABC):
@@ -52,8 +52,7 @@ class InteractiveCSVValidationProvider(ValidationProvider):
                 for asset in assets:
                     writer.writerow(asset.to_csv_row(metadata_columns))
         except Exception as e:
-            print("An error occurred while writing the .csv file, the program will skip it.")
-            print(e)
+            log_warning(f"An error occurred while writing the .csv file, the program will skip it: {e}")
             return assets
 
         validate_csv = execute_prompt(
@@ -66,7 +65,7 @@ class InteractiveCSVValidationProvider(ValidationProvider):
                                  mandatory_message="Cannot go back here."))
 
             if not validation_complete:
-                print("Bulk creation canceled. The program will exit.")
+                log_info("Bulk creation canceled. The program will exit.")
                 exit(0)
 
             # re-read csv file and update assets
@@ -88,15 +87,15 @@ class InteractiveCSVValidationProvider(ValidationProvider):
         from InquirerPy import inquirer
 
         if is_vcs_indexing:
-            print(f"You're about to index {len(assets)} assets.")
+            log_info(f"You're about to index {len(assets)} assets.")
         else:
             total_size = sum([asset.get_files_size() for asset in assets])
             total_assets = len(assets)
-            print(f"You're about to upload {total_assets} assets with a total size of {total_size} bytes.")
+            log_info(f"You're about to upload {total_assets} assets with a total size of {total_size} bytes.")
 
         proceed = execute_prompt(inquirer.confirm("Do you want to proceed?", mandatory_message="Cannot go back here."))
         if not proceed:
-            print("Bulk creation canceled. The program will exit.")
+            log_info("Bulk creation canceled. The program will exit.")
             exit(0)
 
     @staticmethod
@@ -110,6 +109,9 @@ class InteractiveCSVValidationProvider(ValidationProvider):
 
 
 class HeadlessCSVValidationProvider(ValidationProvider):
+    def __init__(self, file_path: str = "validation.csv"):
+        self.file_path = file_path
+
     def validate_assets(self, assets: [AssetInfo], config: ProjectUploaderConfig) -> [AssetInfo]:
         try:
             metadata_columns = []
@@ -118,7 +120,7 @@ class HeadlessCSVValidationProvider(ValidationProvider):
                     if metadata.field_definition not in metadata_columns:
                         metadata_columns.append(metadata.field_definition)
 
-            with open("validation.csv", mode="w", newline="") as file:
+            with open(self.file_path, mode="w", newline="") as file:
                 file.truncate(0)
                 writer = csv.writer(file)
 
@@ -141,7 +143,6 @@ class HeadlessCSVValidationProvider(ValidationProvider):
                 for asset in assets:
                     writer.writerow(asset.to_csv_row(metadata_columns))
         except Exception as e:
-            print("An error occurred while writing the .csv file, the program will skip it.")
-            print(e, flush=True)
+            log_warning(f"An error occurred while writing the .csv file, the program will skip it: {e}")
 
         return assets
\ No newline at end of file
@@ -0,0 +1,225 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+from collections import Counter
+
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+COLORS = {
+    "reset": "\x1b[0m",
+    "red": "\x1b[31m",
+    "green": "\033[4m\033[1m\x1b[32m",
+    "yellow": "\x1b[33m",
+    "cyan": "\x1b[36m",
+}
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record, with the fields passed in the extra fields of the record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The message alone, colored and prefixed when logged by the log_* helpers of shared.utils."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = getattr(record, "prefix", "") + super().format(record)
+        color = getattr(record, "color", None)
+        if color is not None:
+            message = COLORS[color] + message + COLORS["reset"]
+        if getattr(record, "section", False):
+            message = "\n\n" + message
+        return message
+
+
+CLEAR_LINE = "\r\x1b[K"
+
+
+class StatusLine(object):
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ConsoleHandler(logging.Handler):
+    """Writes to the current sys.stdout, which may be replaced after the handler is created.
+
+    The status line stays below the messages: it is cleared before writing a message and drawn again after it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.status = ""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            status = getattr(record, "status", None)
+            if status is not None:
+                self.set_status(status)
+            else:
+                message = self.format(record) + "\n"
+                if self.status:
+                    message = CLEAR_LINE + message + self.status
+                sys.stdout.write(message)
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def set_status(self, status: str):
+        sys.stdout.write(CLEAR_LINE + status if status or self.status else "")
+        self.status = status
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+def is_message(record: logging.LogRecord) -> bool:
+    """Filters out the status line records, only written to the console."""
+    return not hasattr(record, "status")
+
+
+class ProgressAggregator(object):
+    """Counts the per-file and per-asset events instead of logging a line for each of them.
+
+    A line with the counts of every event is logged every interval, from the thread adding the event due at that
+    time, and when flushed at the end of a step. An interval of 0 or less logs every event as it happens.
+    """
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.last_flush = time.monotonic()
+        self.logger = logging.getLogger("bulk_upload.progress")
+
+    def add(self, event: str):
+        with self.lock:
+            self.counts[event] += 1
+            if time.monotonic() - self.last_flush < self.interval:
+                return
+            counts = self._take_counts()
+
+        self._log(counts)
+
+    def flush(self):
+        with self.lock:
+            counts = self._take_counts()
+        self._log(counts)
+
+    def _take_counts(self) -> Counter:
+        """Must be called with the lock held."""
+        counts, self.counts = self.counts, Counter()
+        self.last_flush = time.monotonic()
+        return counts
+
+    def _log(self, counts: Counter):
+        if len(counts) == 0:
+            return
+        self.logger.info(", ".join(f"{count} {event}" for event, count in counts.items()),
+                         extra={"fields": {"progress": dict(counts)}})
+
+
+class LogBackend(object):
+    """Logging of every thread of the process through a queue and a single listener thread.
+
+    The calling threads only put the records of the tool's loggers on the queue. The listener writes them to the
+    console, as text or JSON lines, and to the log file as JSON lines. Nothing is logged through the backend until it
+    is configured by the entry point of the tool, and the loggers of the libraries keep their own level and handlers.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.console = None
+        self.handlers = []
+        self.listener = None
+        self.lock = threading.Lock()
+        self.progress = ProgressAggregator()
+        self.exit_registered = False
+
+    def configure(self, level: str = "info", log_format: str = "text", log_file: str = "",
+                  progress_interval: float = 10.0):
+        with self.lock:
+            self._stop_listener()
+            if sys.platform == "win32" and os.name == "nt":
+                # enables the color codes of the console
+                os.system("color")
+
+            self.console = ConsoleHandler()
+            self.console.setFormatter(JsonLineFormatter() if log_format == "json" else ConsoleFormatter())
+            self.handlers = [self.console]
+            if log_file:
+                file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+                file_handler.setFormatter(JsonLineFormatter())
+                file_handler.addFilter(is_message)
+                self.handlers.append(file_handler)
+
+            tool_logger = logging.getLogger("bulk_upload")
+            if self.queue_handler not in tool_logger.handlers:
+                tool_logger.addHandler(self.queue_handler)
+            tool_logger.setLevel(LOG_LEVELS.get(level, logging.INFO))
+            # the messages are only written by the backend, not again by the handlers of an application above
+            tool_logger.propagate = False
+            self.progress.interval = progress_interval
+
+            self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self.listener.start()
+            if not self.exit_registered:
+                atexit.register(self.stop)
+                self.exit_registered = True
+
+    def set_status(self, status: str):
+        """Shows a line below the messages on the console, replacing the previous one. An empty status removes it."""
+        record = logging.makeLogRecord({"name": "bulk_upload", "levelno": logging.INFO, "levelname": "INFO",
+                                        "status": status})
+        self.queue.put_nowait(record)
+
+    def flush(self):
+        """Waits for the records logged so far to be written, for example before prompting the user."""
+        if self.listener is not None:
+            self.queue.join()
+
+    def stop(self):
+        self.progress.flush()
+        with self.lock:
+            self._stop_listener()
+
+    def _stop_listener(self):
+        """Must be called with the lock held. The records already queued are written before the listener stops."""
+        if self.listener is None:
+            return
+
+        self.listener.stop()
+        self.listener = None
+        if self.console.status:
+            self.console.set_status("")
+        for handler in self.handlers:
+            handler.close()
+
+
+log_backend = LogBackend()
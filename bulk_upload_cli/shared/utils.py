@@ -1,9 +1,12 @@
+import logging
 import os.path
 import sys
 import re
 import subprocess
 from enum import Enum
 
+from shared.log_backend import log_backend
+
 
 class OperationSystem(Enum):
     windows = 'windows'
@@ -23,45 +26,43 @@ def get_platform_name(system: str, machine: str) -> str:
         raise Exception(f"Unsupported configuration: {system}-{machine}")
     return name
 
-colors = {
-    "reset": "\x1b[0m",
-    "red": "\x1b[31m",
-    "green": "\033[4m\033[1m\x1b[32m",
-    "yellow": "\x1b[33m",
-    "cyan": "\x1b[36m",
-}
-
-
-def __log(color: str, msg: str):
-    print(f"{__c(color, msg)}")
+logger = logging.getLogger("bulk_upload")
+progress_logger = logging.getLogger("bulk_upload.progress")
 
 
-def __is_windows():
-    return sys.platform == "win32" and os.name == "nt"
-
-
-def __c(color: str, msg: str) -> str:
-    if __is_windows():
-        os.system('color')
-        return colors[color] + msg + colors["reset"]
-    else:
-        return colors[color] + msg + colors["reset"]
+def log_ok(msg: str):
+    logger.info(msg, extra={"color": "green"})
 
 
-def log_ok(msg: str):
-    __log("green", msg)
+def log_step(msg: str):
+    """Starts a step of the pipeline, after the counts of the per-file messages of the previous one."""
+    log_backend.progress.flush()
+    logger.info(msg, extra={"color": "green", "section": True})
 
 
 def log_warning(msg: str):
-    __log("yellow", f"WARNING: {msg}")
+    logger.warning(msg, extra={"color": "yellow", "prefix": "WARNING: "})
 
 
 def log_error(msg: str):
-    __log("red", f"ERROR: {msg}")
+    logger.error(msg, extra={"color": "red", "prefix": "ERROR: "})
 
 
 def log_info(msg: str):
-    __log("cyan", msg)
+    logger.info(msg, extra={"color": "cyan"})
+
+
+def log_progress(event: str, msg: str, **fields):
+    """Per-file and per-asset messages, only counted under the event unless logging at the debug level.
+
+    The fields, like the asset or the file, are added to the JSON lines of the message.
+    """
+    if log_backend.progress.interval <= 0:
+        progress_logger.info(msg, extra={"fields": fields})
+    elif progress_logger.isEnabledFor(logging.DEBUG):
+        progress_logger.debug(msg, extra={"fields": fields})
+    else:
+        log_backend.progress.add(event)
 
 
 def pip_install_requirements():
@@ -94,4 +95,6 @@ def execute_prompt(prompt, force_mandatory=False):
         prompt._mandatory = False
         prompt._handle_skip(event)
         exit(1)
-    return prompt.execute()
\ No newline at end of file
+    # the messages logged before the prompt are written before it shows
+    log_backend.flush()
+    return prompt.execute()
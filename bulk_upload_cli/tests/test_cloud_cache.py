@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from bulk_upload import cloud_cache as cloud_cache_module
+from bulk_upload.cloud_cache import TtlLruCache
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cloud_cache_module, "time", clock)
+    return clock
+
+
+def test_cached_value_is_reused_until_it_expires(clock: FakeClock):
+    cache = TtlLruCache(ttl=10)
+    loads = []
+
+    def load():
+        loads.append(clock.now)
+        return len(loads)
+
+    assert cache.get_or_load("key", load) == 1
+    clock.now += 9
+    assert cache.get_or_load("key", load) == 1
+    clock.now += 1
+    assert cache.get_or_load("key", load) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted(clock: FakeClock):
+    cache = TtlLruCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get_or_load("a", lambda: -1) == 1
+    cache.set("c", 3)
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.peek("c") == 3
+    assert cache.evictions == 1
+
+
+def test_peek_does_not_load(clock: FakeClock):
+    cache = TtlLruCache(ttl=10)
+    assert cache.peek("key") is None
+    cache.set("key", "value")
+    clock.now += 10
+    assert cache.peek("key") is None
+    assert cache.misses == 0
+
+
+def test_invalidated_entry_is_loaded_again(clock: FakeClock):
+    cache = TtlLruCache()
+    cache.set("key", 1)
+    cache.invalidate("key")
+    assert cache.get_or_load("key", lambda: 2) == 2
+
+
+def test_concurrent_misses_load_once():
+    cache = TtlLruCache()
+    loads = []
+    started = threading.Event()
+
+    def load():
+        loads.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(loads) == 1
+
+
+def test_failed_load_is_retried_by_the_next_caller(clock: FakeClock):
+    cache = TtlLruCache()
+
+    def fail():
+        raise RuntimeError("listing failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("key", fail)
+    assert cache.get_or_load("key", lambda: "value") == "value"
@@ -0,0 +1,65 @@
+import random
+
+from bulk_upload.dependency_graph import DependencyGraph
+from bulk_upload.models import AssetInfo
+
+
+def create_assets(edges: {int: [int]}, node_count: int) -> [AssetInfo]:
+    assets = []
+    for i in range(node_count):
+        asset = AssetInfo(f"asset_{i}")
+        asset.unity_id = f"guid_{i}"
+        asset.unresolved_dependencies = [f"guid_{target}" for target in edges.get(i, [])]
+        assets.append(asset)
+    return assets
+
+
+def get_reachable(graph: DependencyGraph, node: int) -> {int}:
+    reachable = {node}
+    pending = [node]
+    while pending:
+        for target in graph.get_dependencies(pending.pop()):
+            if target not in reachable:
+                reachable.add(target)
+                pending.append(target)
+    return reachable
+
+
+def test_unknown_duplicated_and_self_references_are_dropped():
+    assets = create_assets({0: [1, 1, 0], 1: [2]}, 3)
+    assets[1].unresolved_dependencies.append("guid_outside_of_the_run")
+    graph = DependencyGraph.from_assets(assets)
+
+    assert list(graph.get_dependencies(0)) == [1]
+    assert list(graph.get_dependencies(1)) == [2]
+    assert list(graph.get_dependencies(2)) == []
+    assert graph.get_edge_count() == 2
+
+
+def test_cycles_form_a_single_component():
+    graph = DependencyGraph.from_assets(create_assets({0: [1], 1: [2], 2: [0], 3: [0]}, 4))
+    components, component_of = graph.get_strongly_connected_components()
+
+    assert sorted(sorted(component) for component in components) == [[0, 1, 2], [3]]
+    assert component_of[0] == component_of[1] == component_of[2] != component_of[3]
+
+
+def test_components_match_mutual_reachability():
+    generator = random.Random(0)
+    for _ in range(50):
+        node_count = generator.randint(1, 30)
+        edges = {i: [generator.randrange(node_count) for _ in range(generator.randint(0, 3))]
+                 for i in range(node_count)}
+        graph = DependencyGraph.from_assets(create_assets(edges, node_count))
+        components, component_of = graph.get_strongly_connected_components()
+
+        reachable = [get_reachable(graph, node) for node in range(node_count)]
+        for first in range(node_count):
+            for second in range(node_count):
+                mutual = second in reachable[first] and first in reachable[second]
+                assert (component_of[first] == component_of[second]) == mutual
+
+        # reverse topological order: the dependencies of a component come before it
+        for node in range(node_count):
+            for target in graph.get_dependencies(node):
+                assert component_of[target] <= component_of[node]
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from bulk_upload.models import AssetInfo, ProjectUploaderConfig
+from bulk_upload.sharding import Shard, get_shard_keys, merge_manifests, select_shard_assets
+from bulk_upload.upload_processes import split_assets
+
+# largest part allowed, relative to the average part, for the splits of the synthetic assets below
+MAX_SPLIT_RATIO = 1.2
+
+
+def create_assets(count: int) -> [AssetInfo]:
+    return [AssetInfo(f"group_{i % 97}/asset_{i}.fbx") for i in range(count)]
+
+
+def test_parse_shard():
+    shard = Shard.parse("1/4")
+    assert (shard.index, shard.count) == (1, 4)
+    assert str(shard) == "1/4"
+
+
+@pytest.mark.parametrize("value", ["4/4", "-1/4", "0/0", "1", "a/b"])
+def test_parse_invalid_shard(value: str):
+    with pytest.raises(ValueError):
+        Shard.parse(value)
+
+
+def test_shards_cover_every_asset_once():
+    config = ProjectUploaderConfig()
+    selected = [asset.name for index in range(4)
+                for asset in select_shard_assets(create_assets(1000), Shard(index, 4), config)]
+    assert sorted(selected) == sorted(asset.name for asset in create_assets(1000))
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 4, 8])
+@pytest.mark.parametrize("worker_count", [2, 3, 4, 8])
+def test_shard_worker_split_is_balanced(shard_count: int, worker_count: int):
+    config = ProjectUploaderConfig()
+    for index in range(shard_count):
+        shard_assets = select_shard_assets(create_assets(10000), Shard(index, shard_count), config)
+        worker_sizes = [len(indices) for indices in split_assets(shard_assets, worker_count)]
+        assert max(worker_sizes) <= len(shard_assets) / worker_count * MAX_SPLIT_RATIO, worker_sizes
+
+
+def test_same_name_assets_share_a_key():
+    config = ProjectUploaderConfig()
+    config.case_sensitive = False
+    assets = [AssetInfo("Wall"), AssetInfo("wall"), AssetInfo("door")]
+    keys = get_shard_keys(assets, config)
+    assert keys[0] == keys[1] == "wall"
+    assert keys[2] == "door"
+
+
+def test_referencing_assets_share_a_key():
+    config = ProjectUploaderConfig()
+    assets = [AssetInfo(name) for name in ["c", "b", "a", "d"]]
+    assets[0].dependencies = [1]
+    assets[1].dependencies = [2]
+    assert get_shard_keys(assets, config) == ["a", "a", "a", "d"]
+
+
+def test_selected_assets_keep_their_references():
+    config = ProjectUploaderConfig()
+    assets = [AssetInfo(name) for name in ["d", "c", "b", "a"]]
+    assets[1].dependencies = [2]
+    assets[2].dependencies = [3]
+    # "d" falls in the other shard, the indices of the group of "a" are shifted by one
+    assert Shard(0, 2).get_key_index("a") != Shard(0, 2).get_key_index("d")
+    selected = select_shard_assets(assets, Shard(Shard(0, 2).get_key_index("a"), 2), config)
+    assert [asset.name for asset in selected] == ["c", "b", "a"]
+    assert [asset.dependencies for asset in selected] == [[1], [2], []]
+
+
+def write_manifest(folder, shard: str, assets: [dict], project_id: str = "project") -> str:
+    path = str(folder / f"manifest_{shard.replace('/', '_of_')}.json")
+    with open(path, "w") as f:
+        json.dump({"shard": shard, "organizationId": "organization", "projectId": project_id, "assets": assets}, f)
+    return path
+
+
+def get_manifest_asset(name: str, asset_id: str = "id", already_in_cloud: bool = False,
+                       up_to_date: bool = False) -> dict:
+    return {"name": name, "assetId": asset_id, "version": "1", "alreadyInCloud": already_in_cloud,
+            "upToDate": up_to_date, "files": 1}
+
+
+def test_merge_manifests(tmp_path):
+    paths = [
+        write_manifest(tmp_path, "2/3", [get_manifest_asset("c", already_in_cloud=True)]),
+        write_manifest(tmp_path, "0/3", [get_manifest_asset("a"), get_manifest_asset("b", asset_id="")]),
+    ]
+    merged = merge_manifests(paths, str(tmp_path / "merged.json"))
+
+    assert merged["shards"] == "2/3"
+    assert merged["missingShards"] == [1]
+    assert [asset["name"] for asset in merged["assets"]] == ["a", "b", "c"]
+    assert merged["summary"] == {"assets": 3, "created": 1, "updated": 1, "upToDate": 0, "failed": 1}
+    with open(tmp_path / "merged.json") as f:
+        assert json.load(f) == merged
+
+
+@pytest.mark.parametrize("second_shard, project_id", [("0/2", "project"), ("1/3", "project"), ("1/2", "other")])
+def test_merge_inconsistent_manifests(tmp_path, second_shard: str, project_id: str):
+    # the manifests of the same shard are written to different folders
+    (tmp_path / "first").mkdir()
+    paths = [write_manifest(tmp_path / "first", "0/2", []), write_manifest(tmp_path, second_shard, [], project_id)]
+    with pytest.raises(ValueError):
+        merge_manifests(paths, str(tmp_path / "merged.json"))
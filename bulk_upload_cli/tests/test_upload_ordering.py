@@ -0,0 +1,48 @@
+from pathlib import PurePath, PurePosixPath
+
+from bulk_upload.models import AssetInfo, FileInfo, UploadOrder
+from bulk_upload.upload_ordering import order_assets, order_files
+
+SIZES = {"a": 10, "b": 40, "c": 20, "d": 30, "e": 5}
+
+
+def get_file_size(file: FileInfo) -> int:
+    return SIZES[file.path.stem]
+
+
+def create_asset(name: str) -> AssetInfo:
+    asset = AssetInfo(name)
+    asset.files = [FileInfo(PurePath(f"/data/{name}.bin"), PurePosixPath(f"{name}.bin"))]
+    return asset
+
+
+def get_names(ordered_assets: [(AssetInfo, int)]) -> [str]:
+    return [asset.name for asset, _ in ordered_assets]
+
+
+def test_mapper_order_is_kept():
+    assets = [create_asset(name) for name in "abcde"]
+    assert get_names(order_assets(assets, UploadOrder.MAPPER, get_file_size, 2)) == list("abcde")
+
+
+def test_assets_are_ordered_by_size():
+    assets = [create_asset(name) for name in "abcde"]
+    assert get_names(order_assets(assets, UploadOrder.LARGEST_FIRST, get_file_size, 2)) == list("bdcae")
+    assert get_names(order_assets(assets, UploadOrder.SMALLEST_FIRST, get_file_size, 2)) == list("eacdb")
+
+
+def test_bin_packing_balances_the_workers():
+    assets = [create_asset(name) for name in "abcde"]
+    ordered_assets = order_assets(assets, UploadOrder.BIN_PACKING, get_file_size, 2)
+
+    loads = [0, 0]
+    for asset, worker in ordered_assets:
+        loads[worker] += get_file_size(asset.files[0])
+    assert get_names(ordered_assets) == list("bdcae")
+    assert sorted(loads) == [50, 55]
+
+
+def test_files_are_ordered_by_size():
+    files = [create_asset(name).files[0] for name in "abc"]
+    assert [file.path.stem for file in order_files(files, UploadOrder.LARGEST_FIRST, get_file_size)] == list("bca")
+    assert order_files(files, UploadOrder.MAPPER, get_file_size) is files